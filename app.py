@@ -4,9 +4,16 @@ import logging
 import signal
 import sys
 import json
+import hashlib
+import re
+from functools import lru_cache
+from itertools import islice
+from urllib.parse import urlparse
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from threading import Thread
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, make_response, stream_with_context, g
+from flask.json.provider import DefaultJSONProvider
+from threading import Thread, Lock, current_thread, main_thread
+from cachetools import TTLCache
 
 # Create application directory if it doesn't exist
 os.makedirs('instance', exist_ok=True)
@@ -30,13 +37,68 @@ from llm_processor import LLMProcessor
 # Import the new ArXiv extractor
 from arxiv_extractor import ArXivExtractor
 
+# Serialize JSON with orjson when it's installed, falling back to the stdlib encoder
+try:
+    import orjson
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson."""
+
+        def _dumps_bytes(self, obj, sort_keys=None, indent=None):
+            """Serialize obj to JSON bytes."""
+            # Pass dates through to Flask's default handler so output matches the stdlib provider
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys if sort_keys is None else sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option)
+
+        def dumps(self, obj, **kwargs):
+            """Serialize obj to a JSON string."""
+            return self._dumps_bytes(obj, kwargs.get('sort_keys'), kwargs.get('indent')).decode('utf-8')
+
+        def response(self, *args, **kwargs):
+            """Build a JSON response from orjson's bytes without a round trip through str."""
+            obj = self._prepare_response_obj(args, kwargs)
+            # Pretty-print in debug mode, like the default provider
+            indent = self.compact is False or (self.compact is None and self._app.debug)
+            body = self._dumps_bytes(obj, indent=indent) + b"\n"
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+        def loads(self, s, **kwargs):
+            """Deserialize a JSON string or bytes."""
+            return orjson.loads(s)
+except ImportError:
+    OrjsonProvider = None
+
+# Compress responses with brotli/gzip when flask-compress is installed
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+# Parse feed imports incrementally when ijson is installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Initialize Flask app
 app = Flask(__name__)
-app.secret_key = os.urandom(24)  # For flash messages
+if OrjsonProvider:
+    app.json = OrjsonProvider(app)
+# Reject oversized uploads before they are read
+app.config['MAX_CONTENT_LENGTH'] = 25 * 1024 * 1024
+if Compress:
+    Compress(app)
 
 # Initialize configuration
 config = Config()
 
+# Sign flash messages with the configured key so all workers and restarts agree
+app.secret_key = config.secret_key
+
 # Initialize database
 db = Database(config.database_path)
 
@@ -55,10 +117,15 @@ except Exception as e:
     logger.error(f"Error initializing LLM processor: {e}")
     # Create a dummy LLM processor that doesn't do anything
     class DummyLLMProcessor:
+        processing = False
         async def start_processing(self):
             logger.info("Dummy LLM processor - no processing will be done")
         def stop_processing(self):
             pass
+        def kick(self):
+            pass
+        async def close(self):
+            pass
     llm_processor = DummyLLMProcessor()
 
 # Initialize ArXiv extractor after the existing initializations
@@ -69,79 +136,214 @@ except Exception as e:
     logger.error(f"Error initializing ArXiv extractor: {e}")
     # Create a dummy extractor
     class DummyArXivExtractor:
-        async def start_extraction(self):
+        extracting = False
+        async def start_extraction(self, batch_size=100, continuous=False):
             logger.info("Dummy ArXiv extractor - no extraction will be done")
         async def close(self):
             pass
     arxiv_extractor = DummyArXivExtractor()
 
-# Initialize asyncio loop and tasks
-loop = asyncio.new_event_loop()
+# Cache of pagination counts keyed by route and filters. Entries expire after
+# 30 seconds and the whole cache is cleared whenever articles are added or removed.
+count_cache = TTLCache(maxsize=512, ttl=30)
+count_cache_lock = Lock()
+
+def _get_cached(cache, lock, key, compute):
+    """Return the cached value for key, computing and storing it on a miss."""
+    with lock:
+        if key in cache:
+            return cache[key]
+
+    value = compute()
+
+    with lock:
+        cache[key] = value
+    return value
+
+def get_cached_count(key, compute):
+    """Return the cached count for key, computing and storing it on a miss."""
+    return _get_cached(count_cache, count_cache_lock, key, compute)
+
+def clear_count_cache():
+    """Invalidate all cached pagination counts."""
+    with count_cache_lock:
+        count_cache.clear()
+
+# Dashboard statistics are polled every few seconds but change slowly
+stats_cache = TTLCache(maxsize=16, ttl=15)
+stats_cache_lock = Lock()
+
+def get_cached_stats(key, compute):
+    """Return the cached statistics for key, computing and storing them on a miss."""
+    return _get_cached(stats_cache, stats_cache_lock, key, compute)
+
+def clear_stats_cache():
+    """Invalidate all cached statistics."""
+    with stats_cache_lock:
+        stats_cache.clear()
+
+# The feed list rarely changes, so keep it for a minute and drop it when feeds are edited
+feeds_cache = TTLCache(maxsize=1, ttl=60)
+feeds_cache_lock = Lock()
+
+def get_feeds_cached():
+    """Return all feeds, reusing the list within a request and across requests."""
+    if 'feeds' not in g:
+        with feeds_cache_lock:
+            feeds = feeds_cache.get('feeds')
+        if feeds is None:
+            feeds = db.get_feeds(enabled_only=False)
+            with feeds_cache_lock:
+                feeds_cache['feeds'] = feeds
+        g.feeds = feeds
+    return g.feeds
+
+def clear_feeds_cache():
+    """Invalidate the cached feed list."""
+    with feeds_cache_lock:
+        feeds_cache.clear()
+
+# Drop cached counts whenever the feed reader stores new articles
+feed_reader.on_new_articles.append(clear_count_cache)
+# Wake the LLM processor as soon as there are new articles, rather than at its next check
+feed_reader.on_new_articles.append(llm_processor.kick)
+
+# Use uvloop for the background event loop when it's installed (not available on Windows)
+if sys.platform != 'win32':
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        logger.info("uvloop not installed, using default asyncio event loop")
+
+# Asyncio loop (created by start_background_thread) and tasks
+loop = None
+async_thread = None
 feed_poller_task = None
 llm_processor_task = None
 arxiv_extractor_task = None
+maintenance_task = None
+# Whether this process runs the periodic tasks; under gunicorn only one worker does
+runs_background_tasks = False
+
+# Run database maintenance once a day
+MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+async def run_maintenance():
+    """Periodically drop orphaned keywords, merge full-text index segments and refresh planner statistics."""
+    try:
+        while True:
+            await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+            # Deleted articles and feeds leave keywords behind
+            db.clean_orphaned_keywords()
+            # A bounded merge rather than a full optimize, which rewrites the whole index
+            db.maintain_fts()
+            db.maybe_optimize()
+    except asyncio.CancelledError:
+        logger.info("Maintenance task cancelled")
 
 def start_background_tasks():
-    """Start background tasks for feed polling, LLM processing, and ArXiv extraction."""
-    global feed_poller_task, llm_processor_task, arxiv_extractor_task
+    """Start background tasks for feed polling, LLM processing, ArXiv extraction, and maintenance."""
+    global feed_poller_task, llm_processor_task, arxiv_extractor_task, maintenance_task
 
     try:
         # Create tasks
         feed_poller_task = loop.create_task(feed_reader.start_polling())
         llm_processor_task = loop.create_task(llm_processor.start_processing())
         arxiv_extractor_task = loop.create_task(arxiv_extractor.start_extraction())
+        maintenance_task = loop.create_task(run_maintenance())
 
         logger.info("Background tasks started")
     except Exception as e:
         logger.error(f"Error starting background tasks: {e}")
 
-def run_async_loop():
+def run_async_loop(with_background_tasks=True):
     """Run the asyncio event loop in a separate thread."""
     asyncio.set_event_loop(loop)
-    start_background_tasks()
+    if with_background_tasks:
+        start_background_tasks()
 
     try:
         loop.run_forever()
     except Exception as e:
         logger.error(f"Error in asyncio loop: {e}")
 
-# Start asyncio loop in a separate thread
-async_thread = Thread(target=run_async_loop, daemon=True)
-async_thread.start()
+def run_in_background(coro):
+    """Submit a coroutine to the background event loop from a request thread."""
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+# On-demand jobs submitted by API requests, so shutdown can cancel any still running
+background_jobs = set()
+
+def submit_background_job(coro):
+    """Run a fire-and-forget coroutine on the background loop, tracking it until it finishes."""
+    future = run_in_background(coro)
+    background_jobs.add(future)
+    future.add_done_callback(background_jobs.discard)
+    return future
+
+def start_background_thread(with_background_tasks=True):
+    """Start the asyncio loop thread, optionally with the periodic background tasks."""
+    global loop, async_thread, runs_background_tasks
+
+    runs_background_tasks = with_background_tasks
+    loop = asyncio.new_event_loop()
+    async_thread = Thread(target=run_async_loop, args=(with_background_tasks,), daemon=True)
+    async_thread.start()
+
+# Start asyncio loop in a separate thread. Under gunicorn (see gunicorn.conf.py) the
+# workers start it themselves after forking so only one of them runs the feed poller.
+if os.environ.get('APP_WORKER_MAIN', '1') == '1':
+    start_background_thread()
 
 # Handle graceful shutdown
+async def _async_shutdown():
+    """Cancel background tasks and close HTTP sessions from inside the event loop."""
+    tasks = [task for task in (feed_poller_task, llm_processor_task, arxiv_extractor_task, maintenance_task) if task]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Close the HTTP sessions concurrently; a failure in one shouldn't skip the others
+    results = await asyncio.gather(
+        feed_reader.close(), arxiv_extractor.close(), llm_processor.close(), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Error closing session during shutdown: {result}")
+
 def shutdown_handler(signum, frame):
     """Handle shutdown signals by stopping tasks and closing connections."""
     logger.info(f"Received signal {signum}, shutting down...")
 
-    # Cancel tasks
-    if feed_poller_task:
-        feed_poller_task.cancel()
-    if llm_processor_task:
-        llm_processor_task.cancel()
-    if arxiv_extractor_task:
-        arxiv_extractor_task.cancel()
+    # Run the async cleanup on the loop thread and wait for it before touching the database
+    if loop and loop.is_running():
+        # Cancelling the concurrent future cancels the task on the loop as well
+        for future in list(background_jobs):
+            future.cancel()
+
+        try:
+            run_in_background(_async_shutdown()).result(timeout=10)
+        except Exception as e:
+            logger.error(f"Error shutting down background tasks: {e}")
 
-    # Close sessions
-    if not loop.is_closed():
-        loop.call_soon_threadsafe(lambda: loop.create_task(feed_reader.close()))
-        loop.call_soon_threadsafe(lambda: loop.create_task(arxiv_extractor.close()))
+        # Stop the event loop
+        loop.call_soon_threadsafe(loop.stop)
 
     # Close database connection
     db.close()
 
-    # Stop the event loop
-    loop.call_soon_threadsafe(loop.stop)
-
     logger.info("Shutdown complete")
 
     # Only exit if this was called as a signal handler
     if signum in (signal.SIGINT, signal.SIGTERM):
         sys.exit(0)
 
-# Register signal handlers
-signal.signal(signal.SIGINT, shutdown_handler)
-signal.signal(signal.SIGTERM, shutdown_handler)
+# Register signal handlers (Python only allows this from the main thread)
+if current_thread() is main_thread():
+    signal.signal(signal.SIGINT, shutdown_handler)
+    signal.signal(signal.SIGTERM, shutdown_handler)
 
 # Add default feeds if none exist
 try:
@@ -158,16 +360,51 @@ try:
             }
         ]
 
-        # Add each feed
-        for i, feed in enumerate(default_feeds):
-            feed_id = db.add_feed(feed["url"], feed["name"])
-            # Update additional properties with higher default
-            db.update_feed(feed_id, polling_interval=30, max_articles=5000, display_order=i+1)
+        # Insert them in one transaction with higher defaults
+        db.add_feeds([
+            dict(feed, polling_interval=30, max_articles=5000, display_order=i+1)
+            for i, feed in enumerate(default_feeds)
+        ])
 
         logger.info(f"Added {len(default_feeds)} default feeds")
 except Exception as e:
     logger.error(f"Error adding default feeds: {e}")
 
+# User-Agent substrings that identify mobile browsers
+MOBILE_UA_RE = re.compile(r'mobile|android|iphone', re.IGNORECASE)
+
+def is_mobile_request():
+    """Check whether the current request comes from a mobile browser."""
+    return bool(MOBILE_UA_RE.search(request.headers.get('User-Agent', '')))
+
+def compute_etag(*parts):
+    """Build a short ETag from the values a response is rendered from."""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+def not_modified_response(etag):
+    """Return a 304 response if the client already has this version, otherwise None."""
+    # Pending flash messages are rendered into the page, so always send a fresh copy
+    if '_flashes' in session:
+        return None
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+def etag_response(body, etag):
+    """Wrap a rendered body in a response that browsers revalidate with its ETag."""
+    response = make_response(body)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def public_cache(response, max_age=15):
+    """Let browsers and proxies reuse a response for max_age seconds."""
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
 # Flask routes
 @app.route('/')
 def index():
@@ -182,52 +419,64 @@ def index():
     sort_by = request.args.get('sort_by', 'date_desc')
 
     # Check if request is from mobile (used for initial side panel visibility)
-    user_agent = request.headers.get('User-Agent', '').lower()
-    is_mobile = 'mobile' in user_agent or 'android' in user_agent or 'iphone' in user_agent
+    is_mobile = is_mobile_request()
 
     try:
         articles = db.get_articles(limit=per_page, offset=offset, feed_id=feed_id, keyword=keyword, sort_by=sort_by)
-        feeds = db.get_feeds(enabled_only=False)
-
-        # Count query for pagination
-        count_query = "SELECT COUNT(*) FROM articles a"
-        params = []
-
-        where_clauses = []
-        if feed_id:
-            where_clauses.append("a.feed_id = ?")
-            params.append(feed_id)
-
-        if keyword:
-            keyword_clause = """
-                (
-                    a.id IN (
-                        SELECT article_id
-                        FROM article_keywords
-                        WHERE keyword_id IN (
-                            SELECT id
-                            FROM keywords
-                            WHERE keyword_text LIKE ?
+        feeds = get_feeds_cached()
+
+        def count_articles():
+            # Count query for pagination
+            count_query = "SELECT COUNT(*) FROM articles a"
+            params = []
+
+            where_clauses = []
+            if feed_id:
+                where_clauses.append("a.feed_id = ?")
+                params.append(feed_id)
+
+            if keyword:
+                # Same filter as db.get_articles: FTS match or an exact keyword tag
+                keyword_clause = """
+                    (
+                        a.id IN (
+                            SELECT rowid
+                            FROM articles_fts
+                            WHERE articles_fts MATCH ?
+                        )
+                        OR a.id IN (
+                            SELECT article_id
+                            FROM article_keywords
+                            WHERE keyword_id IN (
+                                SELECT id
+                                FROM keywords
+                                WHERE keyword_text = ?
+                            )
                         )
                     )
-                    OR a.title LIKE ?
-                    OR a.summary LIKE ?
-                    OR a.raw_content LIKE ?
-                )
-            """
-            where_clauses.append(keyword_clause)
+                """
+                where_clauses.append(keyword_clause)
+                params.extend([db.to_fts_query(keyword), keyword])
 
-            keyword_pattern = f"%{keyword}%"
-            params.extend([keyword_pattern, keyword_pattern, keyword_pattern, keyword_pattern])
+            if where_clauses:
+                count_query += " WHERE " + " AND ".join(where_clauses)
 
-        if where_clauses:
-            count_query += " WHERE " + " AND ".join(where_clauses)
+            cursor = db.execute(count_query, params)
+            return cursor.fetchone()[0]
 
-        cursor = db.execute(count_query, params)
-        total_count = cursor.fetchone()[0]
+        # Sort order doesn't affect the count, so it isn't part of the key
+        total_count = get_cached_count(('index', feed_id, keyword), count_articles)
         total_pages = (total_count + per_page - 1) // per_page
 
-        return render_template(
+        # Skip rendering when the client already has this exact page
+        etag = compute_etag(
+            'index', articles, feeds, page, total_pages, feed_id, keyword, sort_by, per_page, is_mobile
+        )
+        cached = not_modified_response(etag)
+        if cached:
+            return cached
+
+        return etag_response(render_template(
             'index.html',
             articles=articles,
             feeds=feeds,
@@ -238,7 +487,7 @@ def index():
             sort_by=sort_by,
             per_page=per_page,
             is_mobile=is_mobile
-        )
+        ), etag)
     except Exception as e:
         logger.error(f"Error in index route: {e}")
         flash(f"An error occurred: {str(e)}", "error")
@@ -285,22 +534,7 @@ def search():
         # Search articles
         results = db.search_articles(query, limit=per_page, offset=offset)
 
-        # Count total results for pagination
-        # Use same query structure for consistency
-        count_query = """
-            SELECT COUNT(*) FROM (
-                SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?
-                UNION
-                SELECT id FROM articles WHERE title LIKE ? OR summary LIKE ? OR raw_content LIKE ?
-                UNION
-                SELECT article_id FROM article_keywords
-                JOIN keywords ON article_keywords.keyword_id = keywords.id
-                WHERE keyword_text LIKE ?
-            )
-        """
-        pattern = f"%{query}%"
-        cursor = db.execute(count_query, (query, pattern, pattern, pattern, pattern))
-        total_count = cursor.fetchone()[0]
+        total_count = get_cached_count(('search', query), lambda: db.count_search_results(query))
         total_pages = (total_count + per_page - 1) // per_page
 
         return render_template(
@@ -317,6 +551,8 @@ def search():
         return redirect(url_for('index'))
 
 # Helper function for date formatting (moved to top-level)
+# Results are cached since list pages format the same timestamps over and over
+@lru_cache(maxsize=4096)
 def format_date(date_str):
     """Format ISO date string to readable format."""
     if not date_str:
@@ -334,16 +570,12 @@ def format_date(date_str):
 def api_article(article_id):
     """API endpoint to get article data with ArXiv information."""
     try:
-        # Updated query to include new fields
+        # Fetch the article row and its keywords separately to avoid a GROUP BY over the join
         cursor = db.execute(
-            """SELECT a.*, f.name as feed_name,
-                      GROUP_CONCAT(k.keyword_text) as keywords
+            """SELECT a.*, f.name as feed_name
                FROM articles a
                JOIN feeds f ON a.feed_id = f.id
-               LEFT JOIN article_keywords ak ON a.id = ak.article_id
-               LEFT JOIN keywords k ON ak.keyword_id = k.id
-               WHERE a.id = ?
-               GROUP BY a.id""",
+               WHERE a.id = ?""",
             (article_id,)
         )
 
@@ -353,11 +585,15 @@ def api_article(article_id):
 
         # Convert to dictionary
         article_dict = dict(article_data)
+        keywords = db.get_article_keywords(article_id)
+        # Keep the comma-joined field for existing API consumers
+        article_dict['keywords'] = ','.join(keywords) if keywords else None
 
-        # Parse keywords string if it exists
-        keywords = []
-        if article_dict.get('keywords'):
-            keywords = [k.strip() for k in article_dict['keywords'].split(',')]
+        # The response is derived entirely from the row, so its contents identify the version
+        etag = compute_etag('api_article', article_dict, keywords)
+        cached = not_modified_response(etag)
+        if cached:
+            return cached
 
         # Format dates for JSON
         date_fields = ['published_date', 'fetched_date', 'llm_processed_date',
@@ -377,11 +613,11 @@ def api_article(article_id):
             'deep_summary_status': article_dict.get('deep_summary_status', 'not_requested'),
         }
 
-        return jsonify({
+        return etag_response(jsonify({
             "article": article_dict,
             "keywords": keywords,
             "arxiv_info": arxiv_info
-        })
+        }), etag)
 
     except Exception as e:
         logger.error(f"Error in API article route: {e}")
@@ -410,6 +646,7 @@ def update_max_articles(feed_id):
 
         # Update the feed
         if db.update_feed(feed_id=feed_id, max_articles=max_articles):
+            clear_feeds_cache()
             return jsonify({'success': True, 'max_articles': max_articles})
         else:
             return jsonify({'success': False, 'error': 'Feed not found or no changes made'}), 404
@@ -433,7 +670,6 @@ def add_feed():
         if not name:
             # Extract domain as name if not provided
             try:
-                from urllib.parse import urlparse
                 parsed_url = urlparse(url)
                 name = parsed_url.netloc
             except:
@@ -443,6 +679,8 @@ def add_feed():
         feed_id = db.add_feed(url, name)
 
         if feed_id:
+            clear_count_cache()
+            clear_feeds_cache()
             flash(f'Feed "{name}" added successfully', 'success')
         else:
             flash('Feed already exists or could not be added', 'error')
@@ -488,6 +726,7 @@ def edit_feed(feed_id):
                 polling_interval=polling_interval,
                 max_articles=max_articles
             ):
+                clear_feeds_cache()
                 flash('Feed updated successfully', 'success')
             else:
                 flash('No changes made to feed', 'info')
@@ -505,6 +744,8 @@ def delete_feed(feed_id):
     """Delete a feed and all its articles."""
     try:
         if db.delete_feed(feed_id):
+            clear_count_cache()
+            clear_feeds_cache()
             flash('Feed and all its articles deleted successfully', 'success')
         else:
             flash('Error deleting feed', 'error')
@@ -519,6 +760,7 @@ def delete_article(article_id):
     """Delete a specific article."""
     try:
         if db.delete_article(article_id):
+            clear_count_cache()
             flash('Article deleted successfully', 'success')
         else:
             flash('Error deleting article', 'error')
@@ -533,6 +775,7 @@ def toggle_feed_status(feed_id):
     """Toggle feed enabled/disabled status."""
     try:
         if db.toggle_feed(feed_id):
+            clear_feeds_cache()
             flash('Feed status toggled successfully', 'success')
         else:
             flash('Error toggling feed status', 'error')
@@ -546,11 +789,19 @@ def toggle_feed_status(feed_id):
 def export_feeds():
     """Export feeds to JSON."""
     try:
-        feeds_json = db.export_feeds_to_json()
+        feeds_iter = db.iter_feeds_for_export()
+
+        def generate():
+            # Write the {"feeds": [...]} document one feed at a time so it is never held in memory whole
+            yield '{"feeds": [\n'
+            for i, feed in enumerate(feeds_iter):
+                if i:
+                    yield ',\n'
+                yield app.json.dumps(feed)
+            yield '\n]}\n'
 
-        # Convert to JSON and create a response
         response = app.response_class(
-            response=json.dumps(feeds_json, indent=2),
+            stream_with_context(generate()),
             status=200,
             mimetype='application/json'
         )
@@ -564,6 +815,19 @@ def export_feeds():
         flash(f'Error exporting feeds: {str(e)}', 'error')
         return redirect(url_for('feeds'))
 
+# Upload types accepted for feed imports
+IMPORT_MIMETYPES = {'application/json', 'text/json', 'text/plain', 'application/octet-stream', ''}
+IMPORT_BATCH_SIZE = 500
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
 @app.route('/feeds/import', methods=['GET', 'POST'])
 def import_feeds():
     """Import feeds from JSON."""
@@ -586,18 +850,44 @@ def import_feeds():
                 flash('Only JSON files are allowed', 'error')
                 return redirect(request.url)
 
-            # Read and parse the file
-            try:
-                json_data = json.load(file)
-            except json.JSONDecodeError:
-                flash('Invalid JSON file', 'error')
+            # Browsers send .json files as application/json or as a generic type
+            if file.mimetype not in IMPORT_MIMETYPES:
+                flash('Only JSON files are allowed', 'error')
                 return redirect(request.url)
 
             # Get overwrite option
             overwrite = request.form.get('overwrite') == 'on'
 
-            # Import feeds
-            result = db.import_feeds_from_json(json_data, overwrite)
+            if ijson:
+                # Stream feed records out of the upload and import them in batches
+                result = None
+                try:
+                    feed_items = ijson.items(file.stream, 'feeds.item', use_float=True)
+                    for batch in chunked(feed_items, IMPORT_BATCH_SIZE):
+                        result = db.import_feeds_batch(batch, overwrite, result)
+                except ijson.JSONError:
+                    clear_feeds_cache()
+                    if result is None:
+                        flash('Invalid JSON file', 'error')
+                    else:
+                        # Batches before the error were already committed; say what was imported
+                        flash(f"Invalid JSON file; import stopped after {result['added']} added, "
+                              f"{result['updated']} updated, {result['skipped']} skipped, "
+                              f"{result['errors']} errors", 'error')
+                    return redirect(request.url)
+                if result is None:
+                    result = {"added": 0, "updated": 0, "skipped": 0, "errors": 0}
+            else:
+                # Read and parse the file
+                try:
+                    json_data = app.json.loads(file.read())
+                except json.JSONDecodeError:
+                    flash('Invalid JSON file', 'error')
+                    return redirect(request.url)
+
+                # Import feeds
+                result = db.import_feeds_from_json(json_data, overwrite)
+            clear_feeds_cache()
 
             # Show results
             flash(f"Import complete: {result['added']} added, {result['updated']} updated, "
@@ -616,7 +906,7 @@ def poll_now():
     """Manually trigger feed polling."""
     try:
         # Schedule polling in the event loop
-        loop.call_soon_threadsafe(lambda: loop.create_task(feed_reader.poll_all_feeds()))
+        run_in_background(feed_reader.poll_all_feeds())
         flash('Feed polling started', 'success')
     except Exception as e:
         logger.error(f"Error starting manual polling: {e}")
@@ -628,8 +918,16 @@ def poll_now():
 def process_pending():
     """Manually process pending articles with LLM."""
     try:
-        # Schedule LLM processing
-        loop.call_soon_threadsafe(lambda: loop.create_task(llm_processor.start_processing()))
+        if not runs_background_tasks:
+            # Another worker runs the processor; a second loop here would take the same
+            # pending articles and pay for each one twice
+            flash('LLM processing runs on the background worker; pending articles will be picked up there', 'info')
+            return redirect(url_for('index'))
+        if llm_processor.processing:
+            # Wake the running processor instead of starting a second one
+            loop.call_soon_threadsafe(llm_processor.kick)
+        else:
+            run_in_background(llm_processor.start_processing())
         flash('LLM processing started', 'success')
     except Exception as e:
         logger.error(f"Error starting LLM processing: {e}")
@@ -654,12 +952,13 @@ def extract_arxiv():
         # Limit batch size to reasonable values
         batch_size = max(10, min(batch_size, 1000))
 
+        # Don't start a second extraction over the same pending articles
+        if arxiv_extractor.extracting:
+            flash('ArXiv content extraction is already running', 'info')
+            return redirect(url_for('index'))
+
         # Start extraction with parameters
-        loop.call_soon_threadsafe(
-            lambda: loop.create_task(
-                arxiv_extractor.start_extraction(batch_size=batch_size, continuous=continuous)
-            )
-        )
+        run_in_background(arxiv_extractor.start_extraction(batch_size=batch_size, continuous=continuous))
 
         if continuous:
             flash(f'ArXiv content extraction started in continuous mode with batch size {batch_size}', 'success')
@@ -703,18 +1002,28 @@ def favorites():
     sort_by = request.args.get('sort_by', 'date_desc')
 
     # Check if request is from mobile
-    user_agent = request.headers.get('User-Agent', '').lower()
-    is_mobile = 'mobile' in user_agent or 'android' in user_agent or 'iphone' in user_agent
+    is_mobile = is_mobile_request()
 
     try:
         favorites = db.get_favorites(limit=per_page, offset=offset, tag_filter=tag_filter, sort_by=sort_by)
         all_tags = db.get_favorite_tags()
 
         # Get total count for pagination
-        total_count = db.get_favorites_count(tag_filter=tag_filter)
+        total_count = get_cached_count(
+            ('favorites', tag_filter),
+            lambda: db.get_favorites_count(tag_filter=tag_filter)
+        )
         total_pages = (total_count + per_page - 1) // per_page
 
-        return render_template(
+        # Skip rendering when the client already has this exact page
+        etag = compute_etag(
+            'favorites', favorites, all_tags, page, total_pages, tag_filter, sort_by, per_page, is_mobile
+        )
+        cached = not_modified_response(etag)
+        if cached:
+            return cached
+
+        return etag_response(render_template(
             'favorites.html',
             favorites=favorites,
             all_tags=all_tags,
@@ -725,7 +1034,7 @@ def favorites():
             per_page=per_page,
             is_mobile=is_mobile,
             total_count=total_count
-        )
+        ), etag)
     except Exception as e:
         logger.error(f"Error in favorites route: {e}")
         flash(f"An error occurred: {str(e)}", "error")
@@ -744,6 +1053,8 @@ def api_add_favorite(article_id):
         success = db.add_favorite(article_id, notes, tags)
 
         if success:
+            clear_count_cache()
+            clear_stats_cache()
             return jsonify({'success': True, 'message': 'Article added to favorites'})
         else:
             return jsonify({'success': False, 'error': 'Failed to add to favorites'}), 500
@@ -758,6 +1069,8 @@ def api_remove_favorite(article_id):
         success = db.remove_favorite(article_id)
 
         if success:
+            clear_count_cache()
+            clear_stats_cache()
             return jsonify({'success': True, 'message': 'Article removed from favorites'})
         else:
             return jsonify({'success': False, 'error': 'Article not in favorites'}), 404
@@ -776,6 +1089,8 @@ def api_update_favorite(article_id):
         success = db.update_favorite(article_id, notes, tags)
 
         if success:
+            clear_count_cache()
+            clear_stats_cache()
             return jsonify({'success': True, 'message': 'Favorite updated'})
         else:
             return jsonify({'success': False, 'error': 'Favorite not found'}), 404
@@ -787,24 +1102,22 @@ def api_update_favorite(article_id):
 def api_favorite_status(article_id):
     """Get favorite status for an article."""
     try:
-        is_fav = db.is_favorite(article_id)
+        # A single lookup answers both whether it's a favorite and its details
+        cursor = db.execute(
+            "SELECT notes, tags, added_date FROM favorites WHERE article_id = ?",
+            (article_id,)
+        )
+        result = cursor.fetchone()
 
-        if is_fav:
-            # Get favorite details
-            cursor = db.execute(
-                "SELECT notes, tags, added_date FROM favorites WHERE article_id = ?",
-                (article_id,)
-            )
-            result = cursor.fetchone()
-
-            return jsonify({
-                'is_favorite': True,
-                'notes': result[0] if result else '',
-                'tags': result[1] if result else '',
-                'added_date': result[2] if result else ''
-            })
-        else:
+        if result is None:
             return jsonify({'is_favorite': False})
+
+        return jsonify({
+            'is_favorite': True,
+            'notes': result[0] or '',
+            'tags': result[1] or '',
+            'added_date': result[2] or ''
+        })
     except Exception as e:
         logger.error(f"Error getting favorite status: {e}")
         return jsonify({'error': str(e)}), 500
@@ -813,7 +1126,7 @@ def api_favorite_status(article_id):
 def api_favorite_tags():
     """Get all favorite tags for autocomplete."""
     try:
-        tags = db.get_favorite_tags()
+        tags = get_cached_stats('favorite_tags', db.get_favorite_tags)
         return jsonify({'tags': tags})
     except Exception as e:
         logger.error(f"Error getting favorite tags: {e}")
@@ -823,8 +1136,8 @@ def api_favorite_tags():
 def api_arxiv_feed_breakdown():
     """Get ArXiv article breakdown by feed."""
     try:
-        breakdown = db.get_feed_arxiv_breakdown()
-        return jsonify(breakdown)
+        breakdown = get_cached_stats('arxiv_feed_breakdown', db.get_feed_arxiv_breakdown)
+        return public_cache(jsonify(breakdown))
     except Exception as e:
         logger.error(f"Error getting ArXiv feed breakdown: {e}")
         return jsonify({'error': str(e)}), 500
@@ -833,8 +1146,8 @@ def api_arxiv_feed_breakdown():
 def api_arxiv_stats():
     """Get ArXiv processing statistics."""
     try:
-        stats = db.get_arxiv_statistics()
-        return jsonify(stats)
+        stats = get_cached_stats('arxiv_stats', db.get_arxiv_statistics)
+        return public_cache(jsonify(stats))
     except Exception as e:
         logger.error(f"Error getting ArXiv stats: {e}")
         return jsonify({'error': str(e)}), 500
@@ -843,21 +1156,19 @@ def api_arxiv_stats():
 def api_arxiv_processing_status():
     """Get current ArXiv processing status."""
     try:
-        # Get pending extraction count
-        cursor = db.execute(
-            """SELECT COUNT(*) FROM articles
-               WHERE arxiv_id IS NOT NULL
-               AND full_content_status = 'pending'"""
-        )
-        pending_extraction = cursor.fetchone()[0]
-
-        # Get currently processing count (estimate based on recent activity)
-        cursor = db.execute(
-            """SELECT COUNT(*) FROM articles
-               WHERE full_content_extracted_date > datetime('now', '-5 minutes')
-               OR deep_summary_date > datetime('now', '-5 minutes')"""
-        )
-        currently_processing = cursor.fetchone()[0]
+        # Fetch both counts in one round trip; each subquery can use its own index
+        with db.reader() as conn:
+            cursor = conn.execute(
+                """SELECT
+                       (SELECT COUNT(*) FROM articles
+                        WHERE full_content_status = 'pending'
+                        AND arxiv_id IS NOT NULL),
+                       -- Currently processing (estimate based on recent activity)
+                       (SELECT COUNT(*) FROM articles
+                        WHERE full_content_extracted_date > datetime('now', '-5 minutes')
+                        OR deep_summary_date > datetime('now', '-5 minutes'))"""
+            )
+            pending_extraction, currently_processing = cursor.fetchone()
 
         return jsonify({
             'pending_extraction': pending_extraction,
@@ -871,12 +1182,18 @@ def api_arxiv_processing_status():
 def api_request_deep_summary(article_id):
     """Request deep summary generation for an article."""
     try:
-        # Check if article has full content
-        cursor = db.execute(
-            "SELECT full_content_status, deep_summary_status FROM articles WHERE id = ?",
-            (article_id,)
-        )
-        result = cursor.fetchone()
+        # Mark it pending in one statement, provided it has full content and isn't already pending
+        if db.request_deep_summary(article_id, only_if_ready=True):
+            # Trigger processing
+            submit_background_job(llm_processor.generate_deep_summary_for_article(article_id))
+            return jsonify({'success': True, 'message': 'Deep summary requested'})
+
+        # Only look up the reason when the request was refused
+        with db.reader() as conn:
+            result = conn.execute(
+                "SELECT full_content_status, deep_summary_status FROM articles WHERE id = ?",
+                (article_id,)
+            ).fetchone()
 
         if not result:
             return jsonify({'success': False, 'error': 'Article not found'}), 404
@@ -889,19 +1206,7 @@ def api_request_deep_summary(article_id):
         if deep_summary_status == 'pending':
             return jsonify({'success': False, 'error': 'Deep summary already pending'}), 400
 
-        # Request deep summary
-        success = db.request_deep_summary(article_id)
-
-        if success:
-            # Trigger processing
-            loop.call_soon_threadsafe(
-                lambda: loop.create_task(
-                    llm_processor.generate_deep_summary_for_article(article_id)
-                )
-            )
-            return jsonify({'success': True, 'message': 'Deep summary requested'})
-        else:
-            return jsonify({'success': False, 'error': 'Failed to request deep summary'}), 500
+        return jsonify({'success': False, 'error': 'Failed to request deep summary'}), 500
 
     except Exception as e:
         logger.error(f"Error requesting deep summary: {e}")
@@ -911,21 +1216,19 @@ def api_request_deep_summary(article_id):
 def api_extract_arxiv_content(article_id):
     """Manually extract ArXiv content for a specific article."""
     try:
-        # Get the article
-        cursor = db.execute(
-            "SELECT id, title, link, guid FROM articles WHERE id = ?",
-            (article_id,)
-        )
-        article = cursor.fetchone()
+        # Get the article and whether it links to ArXiv in one query
+        with db.reader() as conn:
+            article = conn.execute(
+                """SELECT id, title, link, guid,
+                          (link LIKE '%arxiv.org%' OR guid LIKE '%arxiv.org%') AS is_arxiv
+                   FROM articles WHERE id = ?""",
+                (article_id,)
+            ).fetchone()
 
         if not article:
             return jsonify({'success': False, 'error': 'Article not found'}), 404
 
-        # Check if it's an ArXiv article
-        link = article[2] or ''
-        guid = article[3] or ''
-
-        if 'arxiv.org' not in link.lower() and 'arxiv.org' not in guid.lower():
+        if not article['is_arxiv']:
             return jsonify({'success': False, 'error': 'Not an ArXiv article'}), 400
 
         # Trigger extraction for this specific article
@@ -936,11 +1239,7 @@ def api_extract_arxiv_content(article_id):
             'guid': article[3]
         }
 
-        loop.call_soon_threadsafe(
-            lambda: loop.create_task(
-                arxiv_extractor.process_article(article_dict)
-            )
-        )
+        submit_background_job(arxiv_extractor.process_article(article_dict))
 
         return jsonify({'success': True, 'message': 'ArXiv extraction started'})
 
@@ -2,12 +2,34 @@
 
 import asyncio
 import aiohttp
+import functools
 import logging
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from urllib.parse import quote
 import re
 
+from ratelimit import RateLimiter
+
+# Parse ArXiv API responses with lxml when it's installed, falling back to ElementTree
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Parse paper HTML with selectolax when it's installed, falling back to BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Resolve hostnames with aiodns (c-ares) when it's installed, instead of getaddrinfo
+# in the default thread pool
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -15,6 +37,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Match ArXiv IDs with RE2's linear-time DFA engine when it's installed
+try:
+    import re2 as arxiv_re
+except ImportError:
+    arxiv_re = re
+
+# ArXiv IDs in abs/pdf URLs and OAI GUIDs (like oai:arXiv.org:2502.13767v3), both
+# new-style (2502.13767) and old-style (hep-th/9901001). Compiled once for all articles;
+# written without verbose mode or flags so RE2 and re accept the same pattern.
+ARXIV_ID_RE = arxiv_re.compile(
+    r'(?i)(?:arxiv\.org/abs/|oai:arxiv\.org:)(?P<abs>[0-9]{4}\.[0-9]{4,5}v?[0-9]*|[a-z-]+/[0-9]{7}v?[0-9]*)'
+    r'|arxiv\.org/pdf/(?P<pdf>[0-9]{4}\.[0-9]{4,5}|[a-z-]+/[0-9]{7})'
+)
+ARXIV_VERSION_RE = re.compile(r'v[0-9]+$')
+
+# Largest paper HTML page we'll download and parse
+MAX_HTML_BYTES = 10 * 1024 * 1024
+
+# Most IDs the ArXiv API returns for a single id_list query
+API_BATCH_SIZE = 100
+
+ATOM_NS = {'atom': 'http://www.w3.org/2005/Atom'}
+
 class ArXivExtractor:
     def __init__(self, database, config):
         """Initialize ArXiv extractor with database and config."""
@@ -22,22 +67,34 @@ class ArXivExtractor:
         self.config = config
         self.session = None
         self.base_url = "http://export.arxiv.org/api/query"
+        # Number of articles fetched from arxiv.org at the same time
+        self.concurrency = max(1, int(config.get('arxiv_concurrency', 4)))
+        # Requests per second to arxiv.org, shared by all concurrent fetches
+        self.limiter = RateLimiter(config.get('arxiv_rps', 2))
+        # True while a batch or bulk extraction is running
+        self.extracting = False
         
     async def start_extraction(self, batch_size=100, continuous=False):
         """Start extracting ArXiv content for applicable articles."""
-        if not self.session or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        if self.extracting:
+            logger.warning("ArXiv extraction already in progress")
+            return 0
         
-        if continuous:
-            return await self.start_bulk_extraction(batch_size)
-        else:
-            return await self.start_single_batch(batch_size)
+        self.extracting = True
+        try:
+            self._ensure_session()
+            
+            if continuous:
+                return await self.start_bulk_extraction(batch_size)
+            else:
+                return await self.start_single_batch(batch_size)
+        finally:
+            self.extracting = False
     
     async def start_single_batch(self, batch_size=100):
         """Process a single batch of ArXiv articles."""
         try:
-            articles = self.db.get_articles_for_arxiv_extraction(limit=batch_size)
+            articles = self.db.claim_articles_for_arxiv_extraction(limit=batch_size)
             
             if not articles:
                 logger.info("No articles found for ArXiv extraction")
@@ -45,15 +102,7 @@ class ArXivExtractor:
             
             logger.info(f"Processing {len(articles)} articles for ArXiv content (batch size: {batch_size})")
             
-            processed = 0
-            for article in articles:
-                try:
-                    await self.process_article(article)
-                    processed += 1
-                    # Configurable delay
-                    await asyncio.sleep(0.5)
-                except Exception as e:
-                    logger.error(f"Error processing article {article['id']}: {e}")
+            processed = await self.process_batch(articles)
             
             logger.info(f"Completed batch processing: {processed} articles processed")
             return processed
@@ -62,46 +111,32 @@ class ArXivExtractor:
             logger.error(f"Error in ArXiv extraction: {e}")
             return 0
 
-    async def start_bulk_extraction(self, batch_size=100, delay_between_articles=0.3, delay_between_batches=2):
+    async def start_bulk_extraction(self, batch_size=100, delay_between_batches=2):
         """Process ALL pending ArXiv articles until complete."""
-        if not self.session or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        self._ensure_session()
         
         total_processed = 0
         batch_count = 0
         
         try:
-            logger.info(f"Starting bulk ArXiv extraction with batch_size={batch_size}, delays={delay_between_articles}s/{delay_between_batches}s")
+            logger.info(f"Starting bulk ArXiv extraction with batch_size={batch_size}, {self.limiter.rate} requests/s, {delay_between_batches}s between batches")
             
             while True:
                 batch_count += 1
                 
                 # Get next batch
-                articles = self.db.get_articles_for_arxiv_extraction(limit=batch_size)
+                articles = self.db.claim_articles_for_arxiv_extraction(limit=batch_size)
                 
                 if not articles:
                     logger.info(f"Bulk ArXiv extraction complete! Processed {total_processed} total articles in {batch_count-1} batches")
+                    logger.debug(f"ArXiv ID cache: {self.extract_arxiv_id.cache_info()}")
                     break
                 
                 logger.info(f"Processing batch #{batch_count} of {len(articles)} articles (total processed so far: {total_processed})")
                 
                 # Process this batch
-                batch_processed = 0
-                for article in articles:
-                    try:
-                        await self.process_article(article)
-                        total_processed += 1
-                        batch_processed += 1
-                        
-                        # Log progress every 50 articles
-                        if total_processed % 50 == 0:
-                            logger.info(f"Progress: {total_processed} articles processed")
-                        
-                        # Configurable delay between articles
-                        await asyncio.sleep(delay_between_articles)
-                    except Exception as e:
-                        logger.error(f"Error processing article {article['id']}: {e}")
+                batch_processed = await self.process_batch(articles)
+                total_processed += batch_processed
                 
                 logger.info(f"Batch #{batch_count} complete: {batch_processed} articles processed")
                 
@@ -114,73 +149,134 @@ class ArXivExtractor:
             
         return total_processed
     
+    def _ensure_session(self):
+        """Create the aiohttp session if there isn't an open one."""
+        # Creation doesn't await, so concurrent callers on the loop can't race here.
+        # The session then lives until close() is called at shutdown.
+        if not self.session or self.session.closed:
+            timeout = aiohttp.ClientTimeout(total=30, connect=5)
+            # Keep connections to arxiv.org alive across articles and batches
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=self.concurrency,
+                resolver=aiohttp.AsyncResolver() if aiodns is not None else None,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+    
+    async def process_batch(self, articles):
+        """Process articles concurrently, at most self.concurrency at a time, and save them together."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def process_one(article):
+            async with semaphore:
+                return await self.extract_article(article, api_fallback=False)
+        
+        results = await asyncio.gather(*(process_one(article) for article in articles), return_exceptions=True)
+        
+        completed = []
+        unprocessed = []
+        for article, result in zip(articles, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing article {article['id']}: {result}")
+                unprocessed.append(article['id'])
+            else:
+                completed.append(result)
+        
+        # Let a later batch retry the failures rather than waiting out their claims
+        if unprocessed:
+            self.db.release_arxiv_claims(unprocessed)
+        
+        # Papers without HTML fall back to the API, looked up together rather than one request each
+        fallback = [result for result in completed if result['arxiv_id'] and not result['full_content']]
+        if fallback:
+            await self._fill_from_api(fallback)
+        
+        # Write the whole batch in one transaction
+        if completed and not self.db.bulk_update_arxiv_results(completed):
+            return 0
+        return len(completed)
+    
     async def process_article(self, article):
         """Process a single article for ArXiv content."""
+        result = await self.extract_article(article)
+        self.db.bulk_update_arxiv_results([result])
+    
+    async def _fill_from_api(self, results):
+        """Fill in API metadata for results whose HTML fetch came back empty."""
+        for start in range(0, len(results), API_BATCH_SIZE):
+            chunk = results[start:start + API_BATCH_SIZE]
+            contents = await self.fetch_arxiv_api_batch([result['arxiv_id'] for result in chunk])
+            
+            for result in chunk:
+                full_content = contents.get(result['arxiv_id'])
+                if full_content:
+                    result['status'] = 'extracted'
+                    result['full_content'] = full_content
+                    logger.info(f"Successfully extracted ArXiv API content for article {result['id']}")
+                else:
+                    logger.warning(f"Failed to extract ArXiv content for article {result['id']}")
+    
+    async def extract_article(self, article, api_fallback=True):
+        """Fetch ArXiv content for an article and return the result to store, without writing it.
+        
+        With api_fallback=False a missing HTML version is left as 'failed' so the caller can
+        batch the API lookups itself.
+        """
+        # Single-article requests from the API can arrive before any batch has opened a session
+        self._ensure_session()
         article_id = article['id']
         link = article.get('link', '')
         guid = article.get('guid', '')
         
         # Extract ArXiv ID from URL or GUID
-        arxiv_id = self.extract_arxiv_id(link) or self.extract_arxiv_id(guid)
+        # One scan over both; IDs can't span the newline, and the link wins when both match
+        arxiv_id = self.extract_arxiv_id(f"{link or ''}\n{guid or ''}")
+        
+        result = {'id': article_id, 'arxiv_id': arxiv_id, 'status': 'failed', 'full_content': None}
         
         if not arxiv_id:
-            # Not an ArXiv article, mark as not applicable
-            self.db.update_article_arxiv_status(article_id, status='not_applicable')
-            return
+            # Candidates already link to arxiv.org; without a paper ID there's nothing to fetch.
+            # 'unavailable' (not the 'not_applicable' default) keeps it from being selected again.
+            result['status'] = 'unavailable'
+            return result
         
         logger.info(f"Found ArXiv ID {arxiv_id} for article {article_id}")
         
-        # Update with ArXiv ID and pending status
-        self.db.update_article_arxiv_status(article_id, arxiv_id=arxiv_id, status='pending')
-        
         try:
             # Fetch full content from ArXiv HTML or API
-            full_content = await self.fetch_arxiv_content(arxiv_id)
+            full_content = await self.fetch_arxiv_content(arxiv_id, api_fallback)
             
             if full_content:
-                # Update article with full content
-                self.db.update_article_full_content(article_id, full_content, status='extracted')
+                result['status'] = 'extracted'
+                result['full_content'] = full_content
                 logger.info(f"Successfully extracted ArXiv content for article {article_id}")
-            else:
-                self.db.update_article_arxiv_status(article_id, arxiv_id=arxiv_id, status='failed')
+            elif api_fallback:
                 logger.warning(f"Failed to extract ArXiv content for article {article_id}")
                 
         except Exception as e:
             logger.error(f"Error fetching ArXiv content for {arxiv_id}: {e}")
-            self.db.update_article_arxiv_status(article_id, arxiv_id=arxiv_id, status='failed')
+        
+        return result
     
-    def extract_arxiv_id(self, url):
-        """Extract ArXiv ID from URL or GUID."""
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def extract_arxiv_id(url):
+        """Extract ArXiv ID from URL or GUID, memoized since the same entries recur across feeds."""
         if not url:
             return None
             
-        patterns = [
-            # Standard ArXiv URLs
-            r'arxiv\.org/abs/([0-9]{4}\.[0-9]{4,5}v?[0-9]*)',
-            r'arxiv\.org/abs/([a-z-]+/[0-9]{7}v?[0-9]*)',
-            r'arxiv\.org/pdf/([0-9]{4}\.[0-9]{4,5})',
-            r'arxiv\.org/pdf/([a-z-]+/[0-9]{7})',
-            
-            # OAI GUID format (like oai:arXiv.org:2502.13767v3)
-            r'oai:arXiv\.org:([0-9]{4}\.[0-9]{4,5}v?[0-9]*)',
-            r'oai:arXiv\.org:([a-z-]+/[0-9]{7}v?[0-9]*)',
-            
-            # Case variations
-            r'arXiv\.org/abs/([0-9]{4}\.[0-9]{4,5}v?[0-9]*)',
-            r'arXiv\.org/abs/([a-z-]+/[0-9]{7}v?[0-9]*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url, re.IGNORECASE)
-            if match:
-                arxiv_id = match.group(1)
-                # Remove version number if present
-                arxiv_id = re.sub(r'v[0-9]+$', '', arxiv_id)
-                return arxiv_id
+        match = ARXIV_ID_RE.search(url)
+        if match:
+            arxiv_id = match.group('abs') or match.group('pdf')
+            # Remove version number if present
+            return ARXIV_VERSION_RE.sub('', arxiv_id)
         
         return None
     
-    async def fetch_arxiv_content(self, arxiv_id):
+    async def fetch_arxiv_content(self, arxiv_id, api_fallback=True):
         """Fetch full content from ArXiv HTML or API fallback."""
         try:
             # First try to get full HTML content (for papers after Dec 2023)
@@ -191,6 +287,8 @@ class ArXivExtractor:
             
             # Fallback to API for metadata (older papers or failed HTML)
             logger.info(f"HTML not available for {arxiv_id}, falling back to API")
+            if not api_fallback:
+                return None
             return await self.fetch_arxiv_api(arxiv_id)
                 
         except Exception as e:
@@ -206,9 +304,11 @@ class ArXivExtractor:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                # Paper pages compress well; aiohttp decodes these transparently (br needs Brotli)
+                'Accept-Encoding': 'br, gzip, deflate',
             }
             
-            async with self.session.get(html_url, headers=headers) as response:
+            async with self.limiter, self.session.get(html_url, headers=headers) as response:
                 if response.status == 404:
                     logger.info(f"HTML not available for {arxiv_id} (404)")
                     return None
@@ -216,59 +316,70 @@ class ArXivExtractor:
                     logger.warning(f"HTML fetch failed for {arxiv_id}, status: {response.status}")
                     return None
                 
-                html_content = await response.text()
-                
-                # Parse HTML content
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
+                logger.debug(f"HTML for {arxiv_id} sent with Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
                 
-                # Extract paper content
-                return self.extract_content_from_html(soup, arxiv_id)
+                html_bytes = await self._read_limited(response, MAX_HTML_BYTES)
+                if html_bytes is None:
+                    logger.warning(f"HTML for {arxiv_id} exceeds {MAX_HTML_BYTES} bytes, skipping")
+                    return None
+                encoding = response.charset or 'utf-8'
+            
+            # Parse in a worker thread, after the connection is released, so the event
+            # loop keeps driving the other fetches while this CPU-bound step runs
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self.extract_content_from_html, html_bytes, arxiv_id, encoding
+            )
                 
         except Exception as e:
             logger.error(f"Error fetching HTML for {arxiv_id}: {e}")
             return None
     
-    def extract_content_from_html(self, soup, arxiv_id):
-        """Extract and format content from ArXiv HTML."""
+    async def _read_limited(self, response, max_bytes):
+        """Read a response body as bytes in chunks, returning None as soon as it exceeds max_bytes."""
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            return None
+        
+        chunks = []
+        total = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            total += len(chunk)
+            if total > max_bytes:
+                return None
+            chunks.append(chunk)
+        
+        return b''.join(chunks)
+    
+    def extract_content_from_html(self, html_bytes, arxiv_id, encoding='utf-8'):
+        """Extract and format content from raw ArXiv HTML; safe to run in a worker thread."""
         try:
-            content_parts = []
+            html_content = html_bytes.decode(encoding, errors='replace')
             
-            # Try to find the main content area
-            main_content = soup.find('main') or soup.find('article') or soup.find('body')
+            if HTMLParser:
+                parsed = self._parse_html_selectolax(html_content)
+            else:
+                parsed = self._parse_html_bs4(html_content)
             
-            if not main_content:
+            if not parsed:
                 logger.warning(f"Could not find main content area for {arxiv_id}")
                 return None
             
-            # Remove unwanted elements
-            for element in main_content.find_all(['nav', 'header', 'footer', 'aside', 'script', 'style']):
-                element.decompose()
-            
-            # Extract title
-            title_elem = main_content.find('h1') or soup.find('title')
-            if title_elem:
-                title = title_elem.get_text().strip()
-                content_parts.append(f"Title: {title}")
+            title, paragraphs = parsed
+            title_line = f"Title: {title}" if title else None
             
-            # Add ArXiv metadata
-            content_parts.append(f"ArXiv ID: {arxiv_id}")
-            content_parts.append(f"ArXiv URL: https://arxiv.org/abs/{arxiv_id}")
-            content_parts.append(f"HTML URL: https://arxiv.org/html/{arxiv_id}")
+            # ArXiv metadata
+            header = (
+                f"ArXiv ID: {arxiv_id}\n"
+                f"ArXiv URL: https://arxiv.org/abs/{arxiv_id}\n"
+                f"HTML URL: https://arxiv.org/html/{arxiv_id}"
+            )
             
-            # Extract all paragraph text
-            paragraphs = main_content.find_all('p')
-            if paragraphs:
-                paper_text = []
-                for p in paragraphs:
-                    text = p.get_text().strip()
-                    if text and len(text) > 20:
-                        paper_text.append(text)
-                
-                if paper_text:
-                    content_parts.append(f"\nFull Text:\n" + '\n\n'.join(paper_text))
+            # Keep paragraphs with real text
+            paper_text = '\n\n'.join(text for text in paragraphs if len(text) > 20)
+            full_text = f"\nFull Text:\n{paper_text}" if paper_text else None
             
-            full_content = '\n'.join(content_parts)
+            full_content = '\n'.join(filter(None, (title_line, header, full_text)))
             
             # Validate we got substantial content
             if len(full_content) < 500:
@@ -282,63 +393,112 @@ class ArXivExtractor:
             logger.error(f"Error extracting HTML content for {arxiv_id}: {e}")
             return None
     
+    def _parse_html_selectolax(self, html_content):
+        """Return the title and paragraph texts of a paper page, or None without a content area."""
+        tree = HTMLParser(html_content)
+        
+        # Try to find the main content area
+        main_content = tree.css_first('main') or tree.css_first('article') or tree.body
+        if not main_content:
+            return None
+        
+        # Remove unwanted elements
+        for element in main_content.css('nav, header, footer, aside, script, style'):
+            element.decompose()
+        
+        title_elem = main_content.css_first('h1') or tree.css_first('title')
+        title = title_elem.text().strip() if title_elem else None
+        
+        paragraphs = [p.text().strip() for p in main_content.css('p')]
+        return title, paragraphs
+    
+    def _parse_html_bs4(self, html_content):
+        """Return the title and paragraph texts of a paper page using BeautifulSoup."""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # Try to find the main content area
+        main_content = soup.find('main') or soup.find('article') or soup.find('body')
+        if not main_content:
+            return None
+        
+        # Remove unwanted elements
+        for element in main_content.find_all(['nav', 'header', 'footer', 'aside', 'script', 'style']):
+            element.decompose()
+        
+        title_elem = main_content.find('h1') or soup.find('title')
+        title = title_elem.get_text().strip() if title_elem else None
+        
+        paragraphs = [p.get_text().strip() for p in main_content.find_all('p')]
+        return title, paragraphs
+    
     async def fetch_arxiv_api(self, arxiv_id):
         """Fetch content from ArXiv API (fallback method)."""
+        contents = await self.fetch_arxiv_api_batch([arxiv_id])
+        return contents.get(arxiv_id)
+    
+    async def fetch_arxiv_api_batch(self, arxiv_ids):
+        """Fetch API metadata for up to API_BATCH_SIZE IDs in one request, keyed by ArXiv ID."""
+        contents = {}
         try:
-            # Construct API URL
-            url = f"{self.base_url}?id_list={quote(arxiv_id)}&max_results=1"
+            # POST the id_list so a full batch of IDs doesn't have to fit in the URL
+            data = {'id_list': ','.join(arxiv_ids), 'max_results': str(len(arxiv_ids))}
             
-            async with self.session.get(url) as response:
+            async with self.limiter, self.session.post(self.base_url, data=data) as response:
                 if response.status != 200:
-                    logger.error(f"ArXiv API returned status {response.status} for {arxiv_id}")
-                    return None
-                
-                xml_content = await response.text()
-                
-                # Parse XML response
-                root = ET.fromstring(xml_content)
-                
-                # Find the entry
-                namespace = {'atom': 'http://www.w3.org/2005/Atom'}
-                entries = root.findall('atom:entry', namespace)
-                
-                if not entries:
-                    logger.warning(f"No entry found for ArXiv ID {arxiv_id}")
-                    return None
-                
-                entry = entries[0]
-                
-                # Extract information
-                title = self.get_text_from_element(entry.find('atom:title', namespace))
-                summary = self.get_text_from_element(entry.find('atom:summary', namespace))
-                
-                # Get authors
-                authors = []
-                for author in entry.findall('atom:author', namespace):
-                    name = self.get_text_from_element(author.find('atom:name', namespace))
-                    if name:
-                        authors.append(name)
-                
-                # Construct content (API fallback version)
-                content_parts = []
-                
-                if title:
-                    content_parts.append(f"Title: {title}")
+                    logger.error(f"ArXiv API returned status {response.status} for {len(arxiv_ids)} IDs")
+                    return contents
                 
-                if authors:
-                    content_parts.append(f"Authors: {', '.join(authors)}")
-                
-                content_parts.append(f"ArXiv ID: {arxiv_id}")
-                content_parts.append(f"ArXiv URL: https://arxiv.org/abs/{arxiv_id}")
-                
-                if summary:
-                    content_parts.append(f"\nAbstract:\n{summary}")
-                
-                return '\n'.join(content_parts)
+                # Parse the raw bytes so the XML encoding declaration is honoured
+                xml_content = await response.read()
+            
+            # Parse XML response
+            root = etree.fromstring(xml_content) if etree is not None else ET.fromstring(xml_content)
+            
+            for entry in root.findall('atom:entry', ATOM_NS):
+                # Entry IDs are versioned abs URLs; map them back to the IDs we asked for
+                arxiv_id = self.extract_arxiv_id(self.get_text_from_element(entry.find('atom:id', ATOM_NS)))
+                if arxiv_id:
+                    contents[arxiv_id] = self._format_api_entry(entry, arxiv_id)
+            
+            missing = len(set(arxiv_ids) - contents.keys())
+            if missing:
+                logger.warning(f"No entry found for {missing} of {len(arxiv_ids)} ArXiv IDs")
                 
         except Exception as e:
-            logger.error(f"Error fetching ArXiv API content for {arxiv_id}: {e}")
-            return None
+            logger.error(f"Error fetching ArXiv API content for {len(arxiv_ids)} IDs: {e}")
+        
+        return contents
+    
+    def _format_api_entry(self, entry, arxiv_id):
+        """Build the stored content for one API Atom entry."""
+        # Extract information
+        title = self.get_text_from_element(entry.find('atom:title', ATOM_NS))
+        summary = self.get_text_from_element(entry.find('atom:summary', ATOM_NS))
+        
+        # Get authors
+        authors = []
+        for author in entry.findall('atom:author', ATOM_NS):
+            name = self.get_text_from_element(author.find('atom:name', ATOM_NS))
+            if name:
+                authors.append(name)
+        
+        # Construct content (API fallback version)
+        content_parts = []
+        
+        if title:
+            content_parts.append(f"Title: {title}")
+        
+        if authors:
+            content_parts.append(f"Authors: {', '.join(authors)}")
+        
+        content_parts.append(f"ArXiv ID: {arxiv_id}")
+        content_parts.append(f"ArXiv URL: https://arxiv.org/abs/{arxiv_id}")
+        
+        if summary:
+            content_parts.append(f"\nAbstract:\n{summary}")
+        
+        return '\n'.join(content_parts)
     
     def get_text_from_element(self, element):
         """Safely extract text from XML element."""
@@ -1,8 +1,16 @@
 import os
 import json
 import logging
+import secrets
+from functools import lru_cache
 from dotenv import load_dotenv
 
+# Use orjson for reading and writing the config file when it's installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -10,6 +18,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=8)
+def _read_config_file(config_path, mtime):
+    """Parse a config file; cached per path and modification time."""
+    with open(config_path, 'rb') as f:
+        data = f.read()
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class Config:
     def __init__(self, config_path='config.json', env_path='.env'):
         """Initialize configuration from config.json and .env files."""
@@ -19,6 +36,8 @@ class Config:
         self.config = self._load_config(config_path)
         self.api_key = os.getenv('OPENAI_API_KEY')
         self.database_path = os.getenv('DATABASE_PATH', 'instance/aiml_news.db')
+        # Shared by every worker process so signed session cookies survive restarts
+        self.secret_key = os.getenv('SECRET_KEY') or self._load_secret_key()
         
         # Ensure required environment variables are set
         if not self.api_key and self.config.get('store_content_level') != 'none':
@@ -31,8 +50,9 @@ class Config:
                 logger.warning(f"Config file not found: {config_path}. Using default values.")
                 return self._get_default_config()
                 
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            # Reuse the parsed file until it changes on disk
+            mtime = os.stat(config_path).st_mtime
+            config = dict(_read_config_file(config_path, mtime))
                 
             logger.info(f"Loaded configuration from: {config_path}")
             return config
@@ -43,14 +63,51 @@ class Config:
             logger.error(f"Error loading config: {e}. Using default values.")
             return self._get_default_config()
     
+    def _load_secret_key(self, key_path='instance/secret_key'):
+        """Load the persisted session secret key, generating it on first run."""
+        try:
+            os.makedirs(os.path.dirname(key_path), exist_ok=True)
+            try:
+                # O_EXCL makes sure only one process creates the key when workers start together
+                fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(secrets.token_hex(32))
+                logger.info(f"Generated new secret key in: {key_path}")
+            except FileExistsError:
+                pass
+
+            with open(key_path, 'r') as f:
+                secret_key = f.read().strip()
+            if secret_key:
+                return secret_key
+            logger.warning(f"Secret key file is empty: {key_path}")
+        except Exception as e:
+            logger.error(f"Error loading secret key: {e}")
+
+        # Fall back to a per-process key; sessions won't survive restarts
+        return secrets.token_hex(32)
+
     def _get_default_config(self):
         """Return default configuration values."""
         return {
             "polling_interval_minutes": 30,
             "max_concurrent_feeds": 5,
+            "per_feed_concurrency": 4,
+            "per_host_rps": 1,
             "store_content_level": "summary_only",
             "openai_model": "gpt-4o",
-            "summary_max_tokens": 150
+            "summary_max_tokens": 150,
+            "llm_batch_size": 100,
+            "llm_min_concurrency": 2,
+            "llm_max_concurrency": 20,
+            "llm_rpm": 500,
+            "llm_tpm": 30000,
+            "use_batch_api": True,
+            "batch_api_threshold": 50,
+            "llm_cache_ttl_days": 30,
+            "llm_request_timeout": 60,
+            "arxiv_concurrency": 4,
+            "arxiv_rps": 2
         }
     
     def get(self, key, default=None):
@@ -60,8 +117,12 @@ class Config:
     def save_config(self, config_path='config.json'):
         """Save current configuration to file."""
         try:
-            with open(config_path, 'w') as f:
-                json.dump(self.config, f, indent=4)
+            if orjson:
+                with open(config_path, 'wb') as f:
+                    f.write(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(config_path, 'w') as f:
+                    json.dump(self.config, f, indent=4)
             logger.info(f"Saved configuration to: {config_path}")
         except Exception as e:
             logger.error(f"Error saving config: {e}")
\ No newline at end of file
@@ -1,8 +1,13 @@
 import sqlite3
 import os
+import functools
 import json
+import queue
+import re
 import threading
-from datetime import datetime
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 import logging
 
 # Set up logging
@@ -12,15 +17,67 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ORDER BY clauses for the get_articles sort options
+ARTICLE_SORT_ORDERS = {
+    'date_asc': 'a.published_date ASC',
+    'date_desc': 'a.published_date DESC',
+    'title_asc': 'a.title ASC',
+    'title_desc': 'a.title DESC',
+    'feed_asc': 'f.name ASC',
+    'feed_desc': 'f.name DESC',
+}
+
+# Article columns for list views; the large text columns are only read on request
+ARTICLE_LIST_COLUMNS = (
+    'id', 'feed_id', 'guid', 'link', 'title', 'published_date', 'fetched_date', 'summary',
+    'llm_model_used', 'llm_processed_date', 'processing_status', 'arxiv_id',
+    'full_content_status', 'full_content_extracted_date', 'deep_summary_status', 'deep_summary_date'
+)
+ARTICLE_FULL_COLUMNS = ('raw_content', 'full_content', 'deep_summary')
+
+# Bump when create_tables gains a migration step; stored in PRAGMA user_version
+SCHEMA_VERSION = 8
+
+# Word characters in a search box query; FTS5 operators and punctuation are dropped
+FTS_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# How long the background writer waits to gather queued writes into one transaction,
+# and the most it applies at once
+WRITE_BATCH_WINDOW = 0.05
+WRITE_BATCH_MAX = 256
+
+# Read connections kept open per process; matches gunicorn's threads per worker
+READ_POOL_SIZE = 8
+
+# How long an ArXiv extraction claim holds before another worker may take the article
+# over, e.g. after the claiming process died mid-batch
+ARXIV_CLAIM_TIMEOUT_MINUTES = 30
+
 class Database:
-    def __init__(self, db_path):
+    def __init__(self, db_path, read_pool_size=READ_POOL_SIZE):
         """Initialize database connection and create tables if they don't exist."""
         # Ensure directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
         self.db_path = db_path
         self._local = threading.local()  # Thread-local storage for connections
-        self._lock = threading.Lock()    # Lock for thread-safe operations
+        self._thread_conns = []          # (pid, connection) for every thread-local connection
+        self._generation = 0             # Bumped by close() to retire other threads' connections
+        self._lock = threading.Lock()    # Serializes writers within this process
+
+        # One shared write connection plus a bounded pool of read-only connections,
+        # so short-lived request threads don't each open their own
+        self._write_conn = None
+        self._read_pool_size = read_pool_size
+        self._read_pool = queue.LifoQueue(maxsize=read_pool_size)
+        self._read_conns = []
+        self._pool_lock = threading.Lock()
+
+        # Fire-and-forget writes are applied in batches by a background thread,
+        # started on first use in each process
+        self._write_queue = None
+        self._write_thread = None
+        self._write_thread_pid = None
 
         # Initialize the database in the main thread
         self._init_db()
@@ -29,34 +86,233 @@ class Database:
         """Initialize the database schema."""
         conn = self._get_connection()
         try:
+            # WAL lets readers proceed while the background tasks are writing. The mode is
+            # stored in the database file, so switch it once here rather than per connection.
+            with self._lock:
+                journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if journal_mode != 'wal':
+                # e.g. network filesystems without shared memory support
+                logger.warning(f"WAL mode unavailable, using journal_mode={journal_mode}")
             self.create_tables(conn)
+            # Seed planner statistics on fresh databases
+            conn.execute("PRAGMA optimize")
             logger.info("Database initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             raise
 
     def _get_connection(self):
-        """Get a thread-local database connection."""
-        if not hasattr(self._local, 'conn') or self._local.conn is None:
+        """Get a thread-local database connection, opened once per thread and kept until close()."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.generation != self._generation:
             try:
-                self._local.conn = sqlite3.connect(self.db_path)
-                self._local.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+                conn = self._open_connection()
             except sqlite3.Error as e:
                 logger.error(f"Database connection error: {e}")
                 raise
-        return self._local.conn
+            self._local.conn = conn
+            self._local.generation = self._generation
+            # Registered so close() can reach the connections of other threads too
+            with self._pool_lock:
+                self._thread_conns.append((os.getpid(), conn))
+        return conn
+
+    @staticmethod
+    def _rows_to_dicts(cursor):
+        """Fetch the remaining rows as dicts, reading the column names once rather than per row."""
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def _open_connection(self):
+        """Open a configured connection that any thread may use."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        self._configure_connection(conn)
+        return conn
+
+    def _acquire_reader(self):
+        """Take a read connection from the pool, opening one if the pool isn't full yet."""
+        try:
+            return self._read_pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if len(self._read_conns) < self._read_pool_size:
+                conn = self._open_connection()
+                conn.execute("PRAGMA query_only=1")
+                self._read_conns.append(conn)
+                return conn
+        # Every connection is in use; wait for one to be returned
+        return self._read_pool.get()
+
+    def _configure_connection(self, conn):
+        """Apply per-connection PRAGMAs for concurrent access."""
+        # WAL itself is persistent in the file and set once in _init_db; with it,
+        # NORMAL only fsyncs at checkpoints rather than on every commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Wait for other processes' write locks instead of failing with 'database is locked'
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        conn.execute("PRAGMA cache_size=-65536")    # 64 MiB
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # Enforce the schema's REFERENCES clauses (e.g. favorites' ON DELETE CASCADE)
+        conn.execute("PRAGMA foreign_keys=ON")
+
+    @contextmanager
+    def reader(self):
+        """Yield a pooled read-only connection; under WAL these never wait on writers."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Yield a connection inside a write transaction, committing on success and rolling back on error."""
+        with self._lock:
+            if self._write_conn is None:
+                self._write_conn = self._open_connection()
+            conn = self._write_conn
+            # Finish any implicit transaction left open before starting our own
+            if conn.in_transaction:
+                conn.commit()
+            # Take the write lock up front so the transaction can't fail upgrading from a read
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _enqueue_write(self, sql, params=()):
+        """Queue a write for the background writer; returns a Future for its row count."""
+        future = Future()
+        with self._pool_lock:
+            # Threads don't survive a fork, so each process starts its own writer
+            if self._write_thread is None or self._write_thread_pid != os.getpid():
+                self._write_queue = queue.Queue()
+                self._write_thread = threading.Thread(
+                    target=self._run_write_queue, args=(self._write_queue,), daemon=True
+                )
+                self._write_thread_pid = os.getpid()
+                self._write_thread.start()
+            self._write_queue.put((sql, params, future))
+        return future
+
+    def _run_write_queue(self, write_queue):
+        """Apply queued writes, gathering those that arrive close together into one transaction."""
+        while True:
+            item = write_queue.get()
+            if item is None:
+                write_queue.task_done()
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW
+            while len(batch) < WRITE_BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = write_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._apply_writes(batch)
+            for _ in batch:
+                write_queue.task_done()
+            if stop:
+                write_queue.task_done()
+                return
+
+    def _apply_writes(self, batch):
+        """Run a batch of queued writes in one transaction, falling back to one at a time on error."""
+        try:
+            with self.writer() as conn:
+                rowcounts = [conn.execute(sql, params).rowcount for sql, params, _ in batch]
+        except sqlite3.Error as e:
+            logger.error(f"Error applying {len(batch)} queued writes, retrying individually: {e}")
+            for sql, params, future in batch:
+                try:
+                    with self.writer() as conn:
+                        future.set_result(conn.execute(sql, params).rowcount)
+                except sqlite3.Error as e:
+                    logger.error(f"Error applying queued write: {e}")
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), rowcount in zip(batch, rowcounts):
+            future.set_result(rowcount)
+
+    def flush_writes(self):
+        """Block until every queued write has been applied."""
+        if self._write_thread is not None and self._write_thread_pid == os.getpid():
+            self._write_queue.join()
+
+    def _stop_write_queue(self):
+        """Apply any queued writes and stop the background writer."""
+        with self._pool_lock:
+            thread, write_queue = self._write_thread, self._write_queue
+            self._write_thread = None
+        if thread is not None and self._write_thread_pid == os.getpid():
+            write_queue.put(None)
+            thread.join(timeout=10)
+
+    def _optimize_and_close(self, conn):
+        """Refresh planner statistics for tables this connection queried heavily, then close it."""
+        try:
+            conn.execute("PRAGMA query_only=0")
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.error(f"Error optimizing database on close: {e}")
+        conn.close()
 
     def close(self):
         """Close all database connections."""
-        if hasattr(self._local, 'conn') and self._local.conn is not None:
-            self._local.conn.close()
-            self._local.conn = None
-            logger.info("Database connection closed")
+        self._stop_write_queue()
+
+        # Connections inherited across a fork belong to the parent and must not be
+        # touched, so only this process's own are closed
+        with self._pool_lock:
+            pid = os.getpid()
+            for owner_pid, conn in self._thread_conns:
+                if owner_pid == pid:
+                    self._optimize_and_close(conn)
+            self._thread_conns = []
+            self._generation += 1
+        self._local.conn = None
+        logger.info("Database connection closed")
+
+        # The pool and write connection are shared, so this is only safe once no
+        # other thread is using them (at shutdown, or in the master before forking)
+        with self._pool_lock:
+            for conn in self._read_conns:
+                self._optimize_and_close(conn)
+            self._read_conns = []
+            self._read_pool = queue.LifoQueue(maxsize=self._read_pool_size)
+        with self._lock:
+            if self._write_conn is not None:
+                self._optimize_and_close(self._write_conn)
+                self._write_conn = None
 
     def create_tables(self, conn):
-        """Create necessary tables if they don't exist."""
+        """Create necessary tables if they don't exist and migrate older schemas."""
         try:
-            cursor = conn.cursor()
+            # Hold the write lock for the whole setup so concurrent processes can't
+            # both run the same migration
+            if conn.in_transaction:
+                conn.commit()
+            # Table rebuilds must not trigger cascades; this pragma is a no-op inside a transaction
+            conn.execute("PRAGMA foreign_keys = OFF")
+            cursor = conn.execute("BEGIN IMMEDIATE")
+            schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
 
             # Feeds table with extended fields
             cursor.execute('''
@@ -91,7 +347,7 @@ class Database:
                 llm_model_used TEXT,
                 llm_processed_date DATETIME,
                 processing_status TEXT,
-                FOREIGN KEY (feed_id) REFERENCES feeds (id)
+                FOREIGN KEY (feed_id) REFERENCES feeds (id) ON DELETE CASCADE
             )
             ''')
 
@@ -109,7 +365,7 @@ class Database:
                 article_id INTEGER,
                 keyword_id INTEGER,
                 PRIMARY KEY (article_id, keyword_id),
-                FOREIGN KEY (article_id) REFERENCES articles (id),
+                FOREIGN KEY (article_id) REFERENCES articles (id) ON DELETE CASCADE,
                 FOREIGN KEY (keyword_id) REFERENCES keywords (id)
             )
             ''')
@@ -127,453 +383,743 @@ class Database:
             )
             ''')
 
-            # Create FTS5 virtual table for full-text search
+            # One row per favorite tag, so tag filters are index lookups. favorites.tags
+            # keeps the comma-separated string for display.
             cursor.execute('''
-            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
-                title,
-                summary,
-                raw_content,
-                content=articles,
-                content_rowid=id
+            CREATE TABLE IF NOT EXISTS favorite_tags (
+                article_id INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (article_id, tag),
+                FOREIGN KEY (article_id) REFERENCES favorites (article_id) ON DELETE CASCADE
             )
             ''')
 
-            # Create triggers to keep FTS table in sync
-            cursor.execute('''
-            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
-                INSERT INTO articles_fts(rowid, title, summary, raw_content)
-                VALUES (new.id, new.title, new.summary, new.raw_content);
-            END;
-            ''')
-
+            # LLM responses keyed by operation, model and input hash, so identical
+            # requests aren't paid for twice
             cursor.execute('''
-            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
-                INSERT INTO articles_fts(articles_fts, rowid, title, summary, raw_content)
-                VALUES('delete', old.id, old.title, old.summary, old.raw_content);
-            END;
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at DATETIME
+            ) WITHOUT ROWID
             ''')
 
+            # Rebuild the FTS index if it predates the keywords column
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'articles_fts'")
+            fts_table = cursor.fetchone()
+            rebuild_fts = fts_table is not None and 'keywords' not in fts_table[0]
+            if rebuild_fts:
+                for trigger in ('articles_ai', 'articles_ad', 'articles_au'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                cursor.execute("DROP TABLE articles_fts")
+
+            # Create FTS5 virtual table for full-text search. It stores its own
+            # copy of the text so LLM keywords can be indexed alongside the
+            # article columns and a single MATCH covers everything.
             cursor.execute('''
-            CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
-                INSERT INTO articles_fts(articles_fts, rowid, title, summary, raw_content)
-                VALUES('delete', old.id, old.title, old.summary, old.raw_content);
-                INSERT INTO articles_fts(rowid, title, summary, raw_content)
-                VALUES (new.id, new.title, new.summary, new.raw_content);
-            END;
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title,
+                summary,
+                raw_content,
+                keywords
+            )
             ''')
 
-            # Check if columns exist and add them if needed
-            cursor.execute("PRAGMA table_info(feeds)")
-            columns = {col[1] for col in cursor.fetchall()}
-
-            # Add new columns if they don't exist - without defaults
-            if 'polling_interval' not in columns:
-                cursor.execute("ALTER TABLE feeds ADD COLUMN polling_interval INTEGER")
-                cursor.execute("UPDATE feeds SET polling_interval = 30 WHERE polling_interval IS NULL")
-
-            if 'max_articles' not in columns:
-                cursor.execute("ALTER TABLE feeds ADD COLUMN max_articles INTEGER")
-                cursor.execute("UPDATE feeds SET max_articles = 100 WHERE max_articles IS NULL")
-
-            if 'created_at' not in columns:
-                cursor.execute("ALTER TABLE feeds ADD COLUMN created_at DATETIME")
-                cursor.execute("UPDATE feeds SET created_at = datetime('now') WHERE created_at IS NULL")
-
-            if 'last_modified' not in columns:
-                cursor.execute("ALTER TABLE feeds ADD COLUMN last_modified DATETIME")
-                cursor.execute("UPDATE feeds SET last_modified = datetime('now') WHERE last_modified IS NULL")
-
-            if 'display_order' not in columns:
-                cursor.execute("ALTER TABLE feeds ADD COLUMN display_order INTEGER")
-                cursor.execute("UPDATE feeds SET display_order = id WHERE display_order IS NULL")
-
-            # Check if new columns exist and add them if needed
-            cursor.execute("PRAGMA table_info(articles)")
-            columns = {col[1] for col in cursor.fetchall()}
-
-            # Add ArXiv-related columns
-            if 'arxiv_id' not in columns:
-                cursor.execute("ALTER TABLE articles ADD COLUMN arxiv_id TEXT")
-
-            if 'full_content_status' not in columns:
-                cursor.execute("ALTER TABLE articles ADD COLUMN full_content_status TEXT DEFAULT 'not_applicable'")
-                # Possible values: 'not_applicable', 'pending', 'extracted', 'failed', 'unavailable'
-
-            if 'full_content' not in columns:
-                cursor.execute("ALTER TABLE articles ADD COLUMN full_content TEXT")
-
-            if 'full_content_extracted_date' not in columns:
-                cursor.execute("ALTER TABLE articles ADD COLUMN full_content_extracted_date DATETIME")
-
-            if 'deep_summary_status' not in columns:
-                cursor.execute("ALTER TABLE articles ADD COLUMN deep_summary_status TEXT DEFAULT 'not_requested'")
-                # Possible values: 'not_requested', 'pending', 'completed', 'failed'
-
-            if 'deep_summary' not in columns:
-                cursor.execute("ALTER TABLE articles ADD COLUMN deep_summary TEXT")
-
-            if 'deep_summary_date' not in columns:
-                cursor.execute("ALTER TABLE articles ADD COLUMN deep_summary_date DATETIME")
-
+            if rebuild_fts:
+                cursor.execute('''
+                INSERT INTO articles_fts(rowid, title, summary, raw_content, keywords)
+                SELECT a.id, a.title, a.summary, a.raw_content,
+                       (SELECT GROUP_CONCAT(k.keyword_text, ' ')
+                        FROM article_keywords ak
+                        JOIN keywords k ON ak.keyword_id = k.id
+                        WHERE ak.article_id = a.id)
+                FROM articles a
+                ''')
+                # Compact the freshly bulk-loaded index into a single segment
+                cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES('optimize')")
+                logger.info("Rebuilt full-text search index with keywords")
+
+            if schema_version < 1:
+                self._migrate_columns(cursor)
+            if schema_version < 2:
+                self._migrate_cascade_deletes(cursor)
+            if schema_version < 3:
+                self._migrate_favorite_tags(cursor)
+            if schema_version < 4:
+                # Schema version 4: when a worker claimed the article for ArXiv extraction
+                cursor.execute("ALTER TABLE articles ADD COLUMN arxiv_claimed_at DATETIME")
+            if schema_version < 5:
+                # Schema version 5: HTTP cache validators for conditional feed polling
+                cursor.execute("ALTER TABLE feeds ADD COLUMN http_etag TEXT")
+                cursor.execute("ALTER TABLE feeds ADD COLUMN http_last_modified TEXT")
+            if schema_version < 6:
+                # Schema version 6: moving average of how often a feed's own content sufficed
+                cursor.execute("ALTER TABLE feeds ADD COLUMN content_in_feed_ratio REAL DEFAULT 0")
+            if schema_version < 7:
+                # Schema version 7: the OpenAI batch a pending deep summary was submitted in
+                cursor.execute("ALTER TABLE articles ADD COLUMN deep_summary_batch_id TEXT")
+            if schema_version < 8:
+                # Schema version 8: token usage and model of cached LLM responses
+                cursor.execute("ALTER TABLE llm_cache ADD COLUMN prompt_tokens INTEGER")
+                cursor.execute("ALTER TABLE llm_cache ADD COLUMN completion_tokens INTEGER")
+                cursor.execute("ALTER TABLE llm_cache ADD COLUMN model TEXT")
+
+            # Triggers and indexes come last, as the rebuilds above drop them
+            self._create_triggers(cursor)
+            self._create_indexes(cursor)
+
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             conn.commit()
             logger.info("Database tables created and upgraded successfully")
         except sqlite3.Error as e:
             conn.rollback()
             logger.error(f"Error creating/upgrading tables: {e}")
             raise
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+    def _migrate_columns(self, cursor):
+        """Schema version 1: add the columns introduced after the original tables."""
+        # Check if columns exist and add them if needed
+        cursor.execute("PRAGMA table_info(feeds)")
+        columns = {col[1] for col in cursor.fetchall()}
+
+        # Add new columns if they don't exist. Constant defaults are schema-only
+        # changes that fill existing rows without rewriting them.
+        if 'polling_interval' not in columns:
+            cursor.execute("ALTER TABLE feeds ADD COLUMN polling_interval INTEGER NOT NULL DEFAULT 30")
+
+        if 'max_articles' not in columns:
+            cursor.execute("ALTER TABLE feeds ADD COLUMN max_articles INTEGER NOT NULL DEFAULT 100")
+
+        # SQLite can't add a column with a non-constant default, so these are
+        # backfilled; the version gate means it happens only once
+        if 'created_at' not in columns:
+            cursor.execute("ALTER TABLE feeds ADD COLUMN created_at DATETIME")
+            cursor.execute("UPDATE feeds SET created_at = datetime('now') WHERE created_at IS NULL")
+
+        if 'last_modified' not in columns:
+            cursor.execute("ALTER TABLE feeds ADD COLUMN last_modified DATETIME")
+            cursor.execute("UPDATE feeds SET last_modified = datetime('now') WHERE last_modified IS NULL")
+
+        if 'display_order' not in columns:
+            cursor.execute("ALTER TABLE feeds ADD COLUMN display_order INTEGER")
+            cursor.execute("UPDATE feeds SET display_order = id WHERE display_order IS NULL")
+
+        # Check if new columns exist and add them if needed
+        cursor.execute("PRAGMA table_info(articles)")
+        columns = {col[1] for col in cursor.fetchall()}
+
+        # Add ArXiv-related columns
+        if 'arxiv_id' not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN arxiv_id TEXT")
+
+        if 'full_content_status' not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN full_content_status TEXT DEFAULT 'not_applicable'")
+            # Possible values: 'not_applicable', 'pending', 'extracted', 'failed', 'unavailable'
+
+        if 'full_content' not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN full_content TEXT")
+
+        if 'full_content_extracted_date' not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN full_content_extracted_date DATETIME")
+
+        if 'deep_summary_status' not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN deep_summary_status TEXT DEFAULT 'not_requested'")
+            # Possible values: 'not_requested', 'pending', 'completed', 'failed'
+
+        if 'deep_summary' not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN deep_summary TEXT")
+
+        if 'deep_summary_date' not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN deep_summary_date DATETIME")
+
+    def _migrate_cascade_deletes(self, cursor):
+        """Schema version 2: make article and keyword-link rows cascade from their parents."""
+        # Drop rows orphaned by earlier manual deletes so the new constraints hold
+        cursor.execute("DELETE FROM article_keywords WHERE article_id NOT IN (SELECT id FROM articles)")
+        cursor.execute("DELETE FROM favorites WHERE article_id NOT IN (SELECT id FROM articles)")
+
+        for table, parent in (('articles', 'feeds'), ('article_keywords', 'articles')):
+            cursor.execute(f"PRAGMA foreign_key_list({table})")
+            if all(fk[2] != parent or fk[6] == 'CASCADE' for fk in cursor.fetchall()):
+                continue
+
+            # SQLite can't alter a constraint in place, so copy the rows into a
+            # table declared with the cascade and swap it in
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            table_sql = cursor.fetchone()[0]
+            table_sql = re.sub(rf"^CREATE TABLE\s+(IF NOT EXISTS\s+)?{table}\b",
+                               f"CREATE TABLE {table}_new", table_sql)
+            table_sql = re.sub(rf"(REFERENCES\s+{parent}\s*\(\s*id\s*\))",
+                               r"\1 ON DELETE CASCADE", table_sql)
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+            sequence = cursor.fetchone()
+
+            cursor.execute(table_sql)
+            cursor.execute(f"INSERT INTO {table}_new SELECT * FROM {table}")
+            cursor.execute(f"DROP TABLE {table}")
+            cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            if sequence is not None:
+                # Keep AUTOINCREMENT from reusing the ids of deleted rows
+                cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (sequence[0], table))
+            logger.info(f"Rebuilt {table} with ON DELETE CASCADE")
+
+    def _migrate_favorite_tags(self, cursor):
+        """Schema version 3: fill favorite_tags from the comma-separated favorites.tags."""
+        # Peel one tag off each favorite's string per step
+        cursor.execute(
+            """
+            WITH RECURSIVE split(article_id, tag, rest) AS (
+                SELECT article_id, NULL, tags || ','
+                FROM favorites
+                WHERE tags IS NOT NULL AND tags != ''
+                UNION ALL
+                SELECT article_id,
+                       trim(substr(rest, 1, instr(rest, ',') - 1), :space),
+                       substr(rest, instr(rest, ',') + 1)
+                FROM split
+                WHERE rest != ''
+            )
+            INSERT OR IGNORE INTO favorite_tags (article_id, tag)
+            SELECT article_id, tag FROM split
+            WHERE tag != ''
+            """,
+            {"space": " \t\r\n"}
+        )
+
+    def _create_triggers(self, cursor):
+        """Create the triggers that keep the FTS table in sync."""
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts(rowid, title, summary, raw_content)
+            VALUES (new.id, new.title, new.summary, new.raw_content);
+        END;
+        ''')
+
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+            DELETE FROM articles_fts WHERE rowid = old.id;
+        END;
+        ''')
+
+        # Only re-index when the searchable text changes, not on status updates
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF title, summary, raw_content ON articles BEGIN
+            UPDATE articles_fts
+            SET title = new.title, summary = new.summary, raw_content = new.raw_content
+            WHERE rowid = new.id;
+        END;
+        ''')
+
+        # Keep the keywords column in sync with article_keywords. Rows cascading from
+        # an article delete are skipped, since articles_ad drops its index row.
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS article_keywords_ai AFTER INSERT ON article_keywords BEGIN
+            UPDATE articles_fts
+            SET keywords = (SELECT GROUP_CONCAT(k.keyword_text, ' ')
+                            FROM article_keywords ak
+                            JOIN keywords k ON ak.keyword_id = k.id
+                            WHERE ak.article_id = new.article_id)
+            WHERE rowid = new.article_id;
+        END;
+        ''')
+
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS article_keywords_ad AFTER DELETE ON article_keywords
+        WHEN EXISTS (SELECT 1 FROM articles WHERE id = old.article_id) BEGIN
+            UPDATE articles_fts
+            SET keywords = (SELECT GROUP_CONCAT(k.keyword_text, ' ')
+                            FROM article_keywords ak
+                            JOIN keywords k ON ak.keyword_id = k.id
+                            WHERE ak.article_id = old.article_id)
+            WHERE rowid = old.article_id;
+        END;
+        ''')
+
+    def _create_indexes(self, cursor):
+        """Create the query indexes; all are IF NOT EXISTS, so this is cheap on every start."""
+        # Indexes for the ArXiv processing status counts
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_full_content_status ON articles(full_content_status, arxiv_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_full_content_extracted_date ON articles(full_content_extracted_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_deep_summary_date ON articles(deep_summary_date)")
+        # Extracted papers waiting for a deep summary, most recently extracted first
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_articles_deep_pending ON articles(full_content_extracted_date DESC)
+            WHERE full_content_status = 'extracted' AND deep_summary_status = 'pending'
+        """)
+        # Deep summaries waiting on an OpenAI batch
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_articles_deep_batch ON articles(deep_summary_batch_id)
+            WHERE deep_summary_batch_id IS NOT NULL
+        """)
+        # ArXiv links still awaiting extraction, newest first. Only pending rows are
+        # indexed, so the scheduler's lookup reads just the rows it returns.
+        cursor.execute("DROP INDEX IF EXISTS idx_articles_arxiv_candidate")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_articles_arxiv_pending ON articles(published_date)
+            WHERE (link LIKE '%arxiv.org%' OR guid LIKE '%arxiv.org%')
+            AND (
+                full_content_status = 'not_applicable'
+                OR full_content_status IS NULL
+                OR arxiv_id IS NULL
+            )
+            AND COALESCE(full_content_status, '') != 'unavailable'
+        """)
+
+        # Indexes for the article listing (optionally per feed, newest first), keyword
+        # lookups and the sidebar feed order. idx_articles_feed_pub also covers the
+        # (feed_id, id) lookups of a feed delete's cascade, as every index carries the rowid.
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_articles_feed_pub'")
+        new_listing_indexes = cursor.fetchone() is None
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_feed_pub ON articles(feed_id, published_date DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_pub ON articles(published_date DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ak_keyword ON article_keywords(keyword_id, article_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feeds_order ON feeds(is_enabled, display_order, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_favorite_tags_tag ON favorite_tags(tag, article_id)")
+        # The favorites page's default order; article_id lookups use the UNIQUE constraint
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_favorites_added ON favorites(added_date DESC)")
+        if new_listing_indexes:
+            # Give the planner statistics for the new indexes before the first query
+            cursor.execute("ANALYZE")
 
     def add_feed(self, url, name):
         """Add a new feed to the database."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
+            with self.writer() as conn:
+                # Insert the feed with current timestamp; an existing URL leaves the row untouched
+                cursor = conn.execute(
+                    """
+                    INSERT INTO feeds
+                    (url, name, is_enabled, polling_interval, max_articles, created_at, last_modified)
+                    VALUES (?, ?, 1, 30, 100, datetime('now'), datetime('now'))
+                    ON CONFLICT(url) DO NOTHING
+                    """,
+                    (url, name)
+                )
+                if cursor.rowcount:
+                    logger.info(f"Added feed: {name} ({url})")
+                    return cursor.lastrowid
 
-            # First check if feed already exists
-            cursor.execute("SELECT id FROM feeds WHERE url = ?", (url,))
-            existing = cursor.fetchone()
-            if existing:
                 logger.info(f"Feed already exists: {url}")
-                return existing[0]
-
-            # Insert the feed with current timestamp
-            cursor.execute(
-                """
-                INSERT INTO feeds
-                (url, name, is_enabled, polling_interval, max_articles, created_at, last_modified)
-                VALUES (?, ?, 1, 30, 100, datetime('now'), datetime('now'))
-                """,
-                (url, name)
-            )
-            conn.commit()
-            feed_id = cursor.lastrowid
-            logger.info(f"Added feed: {name} ({url})")
-            return feed_id
-        except sqlite3.IntegrityError:
-            logger.warning(f"Feed already exists: {url}")
-            cursor.execute("SELECT id FROM feeds WHERE url = ?", (url,))
-            row = cursor.fetchone()
-            return row[0] if row else None
+                row = conn.execute("SELECT id FROM feeds WHERE url = ?", (url,)).fetchone()
+                return row[0] if row else None
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error adding feed: {e}")
             raise
 
+    def add_feeds(self, feeds):
+        """Add several feeds in a single transaction, skipping URLs that already exist.
+
+        Args:
+            feeds: List of dicts with url, name, polling_interval, max_articles and display_order
+
+        Returns:
+            Number of feeds inserted
+        """
+        try:
+            with self.writer() as conn:
+                cursor = conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO feeds
+                    (url, name, is_enabled, polling_interval, max_articles, display_order, created_at, last_modified)
+                    VALUES (?, ?, 1, ?, ?, ?, datetime('now'), datetime('now'))
+                    """,
+                    [
+                        (feed["url"], feed["name"], feed.get("polling_interval", 30),
+                         feed.get("max_articles", 100), feed.get("display_order", 0))
+                        for feed in feeds
+                    ]
+                )
+            logger.info(f"Added {cursor.rowcount} feeds")
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error adding feeds: {e}")
+            raise
+
     def get_feeds(self, enabled_only=True, include_article_counts=False):
         """Get all feeds from the database."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            if include_article_counts:
-                # Include article counts in the query
-                query = """
-                SELECT f.*,
-                       COALESCE(article_counts.count, 0) as article_count
-                FROM feeds f
-                LEFT JOIN (
-                    SELECT feed_id, COUNT(*) as count
-                    FROM articles
-                    GROUP BY feed_id
-                ) article_counts ON f.id = article_counts.feed_id
-                """
-            else:
-                query = "SELECT * FROM feeds"
+            with self.reader() as conn:
+                if include_article_counts:
+                    # Include article counts in the query
+                    query = """
+                    SELECT f.*,
+                           COALESCE(article_counts.count, 0) as article_count
+                    FROM feeds f
+                    LEFT JOIN (
+                        SELECT feed_id, COUNT(*) as count
+                        FROM articles
+                        GROUP BY feed_id
+                    ) article_counts ON f.id = article_counts.feed_id
+                    """
+                else:
+                    query = "SELECT * FROM feeds"
 
-            if enabled_only:
-                query += " WHERE f.is_enabled = 1" if include_article_counts else " WHERE is_enabled = 1"
+                if enabled_only:
+                    query += " WHERE f.is_enabled = 1" if include_article_counts else " WHERE is_enabled = 1"
 
-            query += " ORDER BY f.display_order, f.id" if include_article_counts else " ORDER BY display_order, id"
+                query += " ORDER BY f.display_order, f.id" if include_article_counts else " ORDER BY display_order, id"
 
-            cursor.execute(query)
-            return [dict(row) for row in cursor.fetchall()]
+                cursor = conn.execute(query)
+                return self._rows_to_dicts(cursor)
         except sqlite3.Error as e:
             logger.error(f"Error getting feeds: {e}")
             raise
 
-    def update_feed_poll_status(self, feed_id, last_guid, timestamp=None):
-        """Update feed's last polled item and timestamp."""
-        if timestamp is None:
-            timestamp = datetime.now().isoformat()
+    def update_feed_poll_status(self, feed_id, last_guid, timestamp=None, etag=None, http_last_modified=None,
+                                content_in_feed_ratio=None):
+        """Update feed's last polled item and timestamp (default: now, in local time).
 
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE feeds SET last_polled_item_guid = ?, last_successful_poll_timestamp = ?, error_count = 0, last_modified = datetime('now') WHERE id = ?",
-                (last_guid, timestamp, feed_id)
-            )
-            conn.commit()
-            logger.info(f"Updated feed poll status for feed_id: {feed_id}")
-        except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error updating feed poll status: {e}")
-            raise
+        A None last_guid, etag, http_last_modified or content_in_feed_ratio keeps the stored
+        value. The update is queued for the background writer; returns a Future for the row count.
+        """
+        # Same local ISO format the timestamp used to be generated with in Python
+        future = self._enqueue_write(
+            """UPDATE feeds
+               SET last_polled_item_guid = COALESCE(?, last_polled_item_guid),
+                   last_successful_poll_timestamp = COALESCE(?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+                   http_etag = COALESCE(?, http_etag),
+                   http_last_modified = COALESCE(?, http_last_modified),
+                   content_in_feed_ratio = COALESCE(?, content_in_feed_ratio),
+                   error_count = 0, last_modified = datetime('now')
+               WHERE id = ?""",
+            (last_guid, timestamp, etag, http_last_modified, content_in_feed_ratio, feed_id)
+        )
+        logger.info(f"Queued feed poll status update for feed_id: {feed_id}")
+        return future
 
     def increment_feed_error(self, feed_id):
-        """Increment error count for a feed."""
-        conn = self._get_connection()
+        """Increment error count for a feed; queued like update_feed_poll_status."""
+        future = self._enqueue_write(
+            "UPDATE feeds SET error_count = error_count + 1, last_modified = datetime('now') WHERE id = ?",
+            (feed_id,)
+        )
+        logger.warning(f"Incrementing error count for feed_id: {feed_id}")
+        return future
+
+    def get_recent_guids(self, feed_id, limit=200):
+        """Get the GUIDs of a feed's most recently published articles."""
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE feeds SET error_count = error_count + 1, last_modified = datetime('now') WHERE id = ?",
-                (feed_id,)
-            )
-            conn.commit()
-            logger.warning(f"Incremented error count for feed_id: {feed_id}")
+            with self.reader() as conn:
+                cursor = conn.execute(
+                    "SELECT guid FROM articles WHERE feed_id = ? ORDER BY published_date DESC LIMIT ?",
+                    (feed_id, limit)
+                )
+                return [row[0] for row in cursor]
         except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error incrementing feed error count: {e}")
+            logger.error(f"Error getting recent GUIDs for feed {feed_id}: {e}")
             raise
 
-    def add_article(self, feed_id, guid, link, title, published_date, raw_content=None, status="pending_llm"):
-        """Add a new article to the database."""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
+    def add_articles(self, feed_id, items, status="pending_llm"):
+        """Add several articles from one feed in a single transaction.
 
-            # Check if article already exists
-            cursor.execute("SELECT id FROM articles WHERE guid = ?", (guid,))
-            existing = cursor.fetchone()
-            if existing:
-                return existing[0]
+        Args:
+            feed_id: Feed the articles belong to
+            items: Dicts with guid, link, title, published_date and optionally raw_content
+            status: Initial processing status for the new articles
 
-            cursor.execute(
-                """
-                INSERT INTO articles
-                (feed_id, guid, link, title, published_date, fetched_date, raw_content, processing_status)
-                VALUES (?, ?, ?, ?, ?, datetime('now'), ?, ?)
-                """,
-                (feed_id, guid, link, title, published_date, raw_content, status)
-            )
-            conn.commit()
-            article_id = cursor.lastrowid
-            logger.info(f"Added article: {title} from feed: {feed_id}")
-            return article_id
-        except sqlite3.IntegrityError:
-            logger.debug(f"Article already exists: {guid}")
-            cursor.execute("SELECT id FROM articles WHERE guid = ?", (guid,))
-            row = cursor.fetchone()
-            return row[0] if row else None
+        Returns:
+            Dictionary mapping the guids that were newly added to their article IDs
+        """
+        # Keep the first entry for each guid, as separate inserts would
+        unique = {}
+        for item in items:
+            unique.setdefault(item['guid'], item)
+        items = list(unique.values())
+        if not items:
+            return {}
+        guids = [item['guid'] for item in items]
+        placeholders = ','.join('?' * len(guids))
+        try:
+            with self.writer() as conn:
+                existing = {
+                    row[0] for row in conn.execute(
+                        f"SELECT guid FROM articles WHERE guid IN ({placeholders})", guids
+                    )
+                }
+                conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO articles
+                    (feed_id, guid, link, title, published_date, fetched_date, raw_content, processing_status)
+                    VALUES (?, ?, ?, ?, ?, datetime('now'), ?, ?)
+                    """,
+                    [
+                        (feed_id, item['guid'], item['link'], item['title'], item['published_date'],
+                         item.get('raw_content'), status)
+                        for item in items if item['guid'] not in existing
+                    ]
+                )
+                added = {
+                    row[1]: row[0] for row in conn.execute(
+                        f"SELECT id, guid FROM articles WHERE guid IN ({placeholders})", guids
+                    )
+                    if row[1] not in existing
+                }
+            if added:
+                logger.info(f"Added {len(added)} articles from feed: {feed_id}")
+            return added
         except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error adding article: {e}")
+            logger.error(f"Error adding articles: {e}")
             raise
 
-    def update_article_summary(self, article_id, summary, model_used):
-        """Update article with summary from LLM."""
-        conn = self._get_connection()
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _build_articles_sql(has_feed, has_keyword, sort_by, include_full):
+        """Build the get_articles query for one filter/sort/column combination."""
+        columns = ARTICLE_LIST_COLUMNS + ARTICLE_FULL_COLUMNS if include_full else ARTICLE_LIST_COLUMNS
+        select_list = ', '.join(f"a.{column}" for column in columns)
+
+        # Base query without filters. Keywords are attached afterwards for just the
+        # returned page, so the ORDER BY ... LIMIT can stream from an index.
+        query = f"""
+            SELECT {select_list}, f.name as feed_name
+            FROM articles a
+            JOIN feeds f ON a.feed_id = f.id
+        """
+
+        where_clauses = []
+
+        # Add feed filter if specified
+        if has_feed:
+            where_clauses.append("a.feed_id = ?")
+
+        # Add keyword filter if specified
+        if has_keyword:
+            # Full-text match on title, summary, content and keywords, plus exact keyword tags,
+            # as one IN list, so both index lookups feed a single rowid set
+            where_clauses.append("""
+                a.id IN (
+                    SELECT rowid
+                    FROM articles_fts
+                    WHERE articles_fts MATCH ?
+                    UNION
+                    SELECT ak.article_id
+                    FROM article_keywords ak
+                    JOIN keywords k ON ak.keyword_id = k.id
+                    WHERE k.keyword_text = ?
+                )
+            """)
+
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+
+        query += f" ORDER BY {ARTICLE_SORT_ORDERS[sort_by]}"
+        query += " LIMIT ? OFFSET ?"
+        return query
+
+    def get_articles(self, limit=50, offset=0, feed_id=None, keyword=None, sort_by='date_desc', include_full=False):
+        """Get articles with optional filtering and sorting.
+
+        Only the list-view columns are returned unless include_full is set, which adds
+        raw_content, full_content and deep_summary.
+        """
+        # Unknown sort orders default to date descending
+        if sort_by not in ARTICLE_SORT_ORDERS:
+            sort_by = 'date_desc'
+
+        # The SQL text is fixed per filter/sort combination, so it's built once and
+        # sqlite3's per-connection statement cache can reuse the prepared statement
+        query = self._build_articles_sql(bool(feed_id), bool(keyword), sort_by, include_full)
+
+        params = []
+        if feed_id:
+            params.append(feed_id)
+        if keyword:
+            params.extend([self.to_fts_query(keyword), keyword])
+        params.extend([limit, offset])
+
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE articles
-                SET summary = ?, llm_model_used = ?, llm_processed_date = datetime('now'), processing_status = 'processed'
-                WHERE id = ?
-                """,
-                (summary, model_used, article_id)
-            )
-            conn.commit()
-            logger.info(f"Updated article summary for article_id: {article_id}")
+            with self.reader() as conn:
+                cursor = conn.execute(query, params)
+                articles = self._rows_to_dicts(cursor)
+                self._attach_keywords(conn, articles)
+                return articles
         except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error updating article summary: {e}")
+            logger.error(f"Error getting articles: {e}")
             raise
 
-    def add_keywords_to_article(self, article_id, keywords):
-        """Add keywords to an article."""
-        conn = self._get_connection()
+    def get_article_by_id(self, article_id):
+        """Get a specific article by ID."""
         try:
-            cursor = conn.cursor()
-
-            for keyword in keywords:
-                # First try to get existing keyword
-                cursor.execute("SELECT id FROM keywords WHERE keyword_text = ?", (keyword,))
+            with self.reader() as conn:
+                cursor = conn.execute(
+                    """
+                    SELECT a.*, f.name as feed_name
+                    FROM articles a
+                    JOIN feeds f ON a.feed_id = f.id
+                    WHERE a.id = ?
+                    """,
+                    (article_id,)
+                )
                 result = cursor.fetchone()
+                if not result:
+                    return None
+                article = dict(result)
+                self._attach_keywords(conn, [article])
+                return article
+        except sqlite3.Error as e:
+            logger.error(f"Error getting article by ID: {e}")
+            raise
 
-                if result:
-                    keyword_id = result['id']
-                else:
-                    # Create new keyword
-                    cursor.execute("INSERT INTO keywords (keyword_text) VALUES (?)", (keyword,))
-                    keyword_id = cursor.lastrowid
-
-                # Associate keyword with article
-                cursor.execute(
-                    "INSERT OR IGNORE INTO article_keywords (article_id, keyword_id) VALUES (?, ?)",
-                    (article_id, keyword_id)
+    def _attach_keywords(self, conn, articles):
+        """Set each article's 'keywords' to its comma-joined keywords (None if it has none)."""
+        if not articles:
+            return
+        ids = [article['id'] for article in articles]
+        placeholders = ','.join('?' * len(ids))
+        cursor = conn.execute(
+            f"""
+            SELECT ak.article_id, k.keyword_text
+            FROM article_keywords ak
+            JOIN keywords k ON k.id = ak.keyword_id
+            WHERE ak.article_id IN ({placeholders})
+            """,
+            ids
+        )
+        keywords = {}
+        for article_id, keyword_text in cursor:
+            keywords.setdefault(article_id, []).append(keyword_text)
+        for article in articles:
+            article_keywords = keywords.get(article['id'])
+            article['keywords'] = ','.join(article_keywords) if article_keywords else None
+
+    def get_article_keywords(self, article_id):
+        """Get the keywords attached to an article as a list."""
+        try:
+            with self.reader() as conn:
+                cursor = conn.execute(
+                    """
+                    SELECT k.keyword_text
+                    FROM article_keywords ak
+                    JOIN keywords k ON k.id = ak.keyword_id
+                    WHERE ak.article_id = ?
+                    """,
+                    (article_id,)
                 )
-
-            conn.commit()
-            logger.info(f"Added keywords to article_id: {article_id}")
+                return [row[0] for row in cursor.fetchall()]
         except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error adding keywords to article: {e}")
+            logger.error(f"Error getting article keywords: {e}")
             raise
 
-    def get_articles(self, limit=50, offset=0, feed_id=None, keyword=None, sort_by='date_desc'):
-            """Get articles with optional filtering and sorting."""
-            conn = self._get_connection()
-            try:
-                cursor = conn.cursor()
+    def to_fts_query(self, text):
+        """Turn free-form user input into an FTS5 phrase expression."""
+        return '"' + text.replace('"', '""') + '"'
+
+    def to_fts_prefix_query(self, text):
+        """Turn search box input into an FTS5 expression requiring every word, as a prefix."""
+        terms = FTS_TOKEN_RE.findall(text)
+        # Input without any word characters becomes an empty phrase, which matches nothing
+        return ' '.join(f'"{term}"*' for term in terms) or '""'
 
-                # Base query without filters
-                base_query = """
+    def search_articles(self, query, limit=50, offset=0):
+        """Search articles using the full-text index over titles, summaries, content and keywords."""
+        try:
+            with self.reader() as conn:
+                # Pick the page of matching ids first, then build keywords and snippets for
+                # just those rows instead of for every match ahead of the sort
+                search_query = """
+                    WITH page AS (
+                        SELECT a.id, a.published_date
+                        FROM articles_fts
+                        JOIN articles a ON articles_fts.rowid = a.id
+                        WHERE articles_fts MATCH ?
+                        ORDER BY a.published_date DESC
+                        LIMIT ? OFFSET ?
+                    )
                     SELECT a.*, f.name as feed_name,
-                        GROUP_CONCAT(k.keyword_text) as keywords
-                    FROM articles a
+                           (SELECT GROUP_CONCAT(k.keyword_text)
+                            FROM article_keywords ak
+                            JOIN keywords k ON ak.keyword_id = k.id
+                            WHERE ak.article_id = a.id) as keywords,
+                           snippet(articles_fts, 0, '<b>', '</b>', '...', 10) as title_snippet,
+                           snippet(articles_fts, 1, '<b>', '</b>', '...', 10) as summary_snippet
+                    FROM page
+                    JOIN articles a ON a.id = page.id
                     JOIN feeds f ON a.feed_id = f.id
-                    LEFT JOIN article_keywords ak ON a.id = ak.article_id
-                    LEFT JOIN keywords k ON ak.keyword_id = k.id
+                    JOIN articles_fts ON articles_fts.rowid = page.id
+                    WHERE articles_fts MATCH ?
+                    ORDER BY page.published_date DESC
                 """
 
-                where_clauses = []
-                params = []
-
-                # Add feed filter if specified
-                if feed_id:
-                    where_clauses.append("a.feed_id = ?")
-                    params.append(feed_id)
-
-                # Add keyword filter if specified
-                if keyword:
-                    # This is the enhanced part - search across all text fields
-                    keyword_clause = """
-                        (
-                            -- Search in LLM-extracted keywords
-                            a.id IN (
-                                SELECT article_id
-                                FROM article_keywords
-                                WHERE keyword_id IN (
-                                    SELECT id
-                                    FROM keywords
-                                    WHERE keyword_text LIKE ?
-                                )
-                            )
-                            -- Search in title
-                            OR a.title LIKE ?
-                            -- Search in summary
-                            OR a.summary LIKE ?
-                            -- Search in raw content
-                            OR a.raw_content LIKE ?
-                        )
-                    """
-                    where_clauses.append(keyword_clause)
-
-                    # Add wildcard pattern for SQL LIKE
-                    keyword_pattern = f"%{keyword}%"
-                    params.extend([keyword_pattern, keyword_pattern, keyword_pattern, keyword_pattern])
+                fts_query = self.to_fts_prefix_query(query)
+                cursor = conn.execute(search_query, (fts_query, limit, offset, fts_query))
+                return self._rows_to_dicts(cursor)
+        except sqlite3.Error as e:
+            logger.error(f"Error searching articles: {e}")
+            raise
 
-                # Construct the full query
-                query = base_query
-                if where_clauses:
-                    query += " WHERE " + " AND ".join(where_clauses)
+    def count_search_results(self, query):
+        """Count articles matching a full-text search query."""
+        try:
+            with self.reader() as conn:
+                cursor = conn.execute(
+                    "SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH ?",
+                    (self.to_fts_prefix_query(query),)
+                )
+                return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Error counting search results: {e}")
+            raise
 
-                query += " GROUP BY a.id"
+    def get_llm_cache(self, key, max_age_days=None):
+        """Get a cached LLM response, or None if there isn't one.
 
-                # Add sorting
-                if sort_by == 'date_asc':
-                    query += " ORDER BY a.published_date ASC"
-                elif sort_by == 'date_desc':
-                    query += " ORDER BY a.published_date DESC"
-                elif sort_by == 'title_asc':
-                    query += " ORDER BY a.title ASC"
-                elif sort_by == 'title_desc':
-                    query += " ORDER BY a.title DESC"
-                elif sort_by == 'feed_asc':
-                    query += " ORDER BY f.name ASC"
-                elif sort_by == 'feed_desc':
-                    query += " ORDER BY f.name DESC"
-                else:
-                    # Default to date descending
-                    query += " ORDER BY a.published_date DESC"
+        Args:
+            key: Cache key
+            max_age_days: Treat entries older than this many days as missing
 
-                query += " LIMIT ? OFFSET ?"
-                params.extend([limit, offset])
+        Returns:
+            Dict with result, prompt_tokens, completion_tokens, model and created_at
+        """
+        query = """SELECT result, prompt_tokens, completion_tokens, model, created_at
+                   FROM llm_cache WHERE key = ?"""
+        params = [key]
+        if max_age_days is not None:
+            query += " AND created_at >= datetime('now', ?)"
+            params.append(f'-{max_age_days} days')
+        try:
+            with self.reader() as conn:
+                row = conn.execute(query, params).fetchone()
+                return dict(row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Error reading LLM cache: {e}")
+            return None
 
-                # Execute the query
-                cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
-            except sqlite3.Error as e:
-                logger.error(f"Error getting articles: {e}")
-                raise
+    def set_llm_cache(self, key, result, prompt_tokens=None, completion_tokens=None, model=None):
+        """Cache an LLM response with its token usage; queued like update_feed_poll_status."""
+        return self._enqueue_write(
+            """INSERT OR REPLACE INTO llm_cache (key, result, prompt_tokens, completion_tokens, model, created_at)
+               VALUES (?, ?, ?, ?, ?, datetime('now'))""",
+            (key, result, prompt_tokens, completion_tokens, model)
+        )
 
-    def get_article_by_id(self, article_id):
-        """Get a specific article by ID."""
+    def maintain_fts(self, pages=500):
+        """Merge full-text index segments, doing at most about `pages` pages of work."""
         conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT a.*, f.name as feed_name,
-                       GROUP_CONCAT(k.keyword_text) as keywords
-                FROM articles a
-                JOIN feeds f ON a.feed_id = f.id
-                LEFT JOIN article_keywords ak ON a.id = ak.article_id
-                LEFT JOIN keywords k ON ak.keyword_id = k.id
-                WHERE a.id = ?
-                GROUP BY a.id
-                """,
-                (article_id,)
-            )
-            result = cursor.fetchone()
-            return dict(result) if result else None
+            # A negative page count merges segments even when automerge wouldn't
+            conn.execute("INSERT INTO articles_fts(articles_fts, rank) VALUES('merge', ?)", (-pages,))
+            conn.commit()
+            logger.info("Merged full-text search index segments")
         except sqlite3.Error as e:
-            logger.error(f"Error getting article by ID: {e}")
-            raise
+            conn.rollback()
+            logger.error(f"Error merging full-text search index: {e}")
 
-    def search_articles(self, query, limit=50, offset=0):
-        """Search articles using full-text search and LIKE patterns for comprehensive results."""
+    def maybe_optimize(self):
+        """Let SQLite re-analyze tables whose query plans would benefit from fresh statistics."""
         conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            # Use FTS for main search but also include LIKE patterns for better coverage
-            search_query = """
-                SELECT a.*, f.name as feed_name,
-                       GROUP_CONCAT(k.keyword_text) as keywords,
-                       snippet(articles_fts, 0, '<b>', '</b>', '...', 10) as title_snippet,
-                       snippet(articles_fts, 1, '<b>', '</b>', '...', 10) as summary_snippet
-                FROM (
-                    -- First get results from FTS virtual table
-                    SELECT rowid FROM articles_fts
-                    WHERE articles_fts MATCH ?
-
-                    UNION
-
-                    -- Then get results from LIKE patterns in original tables (for fields that might not be in FTS)
-                    SELECT id FROM articles
-                    WHERE title LIKE ? OR summary LIKE ? OR raw_content LIKE ?
-
-                    UNION
-
-                    -- Also include keyword matches
-                    SELECT article_id FROM article_keywords
-                    JOIN keywords ON article_keywords.keyword_id = keywords.id
-                    WHERE keyword_text LIKE ?
-                ) as matches
-                JOIN articles a ON matches.rowid = a.id
-                JOIN feeds f ON a.feed_id = f.id
-                LEFT JOIN article_keywords ak ON a.id = ak.article_id
-                LEFT JOIN keywords k ON ak.keyword_id = k.id
-                GROUP BY a.id
-                ORDER BY a.published_date DESC
-                LIMIT ? OFFSET ?
-            """
-
-            # Prepare parameters
-            pattern = f"%{query}%"
-            cursor.execute(search_query, (query, pattern, pattern, pattern, pattern, limit, offset))
-            return [dict(row) for row in cursor.fetchall()]
+            conn.execute("PRAGMA optimize")
+            logger.info("Ran PRAGMA optimize")
         except sqlite3.Error as e:
-            logger.error(f"Error searching articles: {e}")
-            raise
+            logger.error(f"Error running PRAGMA optimize: {e}")
 
     def execute(self, query, params=()):
         """Execute a custom query."""
         conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+            cursor = conn.execute(query, params)
             return cursor
         except sqlite3.Error as e:
             logger.error(f"Error executing query: {e}")
@@ -581,86 +1127,76 @@ class Database:
 
     def update_feed(self, feed_id, name=None, url=None, is_enabled=None, polling_interval=None, max_articles=None, display_order=None):
         """Update feed details."""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
+        # Build the SET part of the SQL query
+        set_clauses = []
+        params = []
 
-            # Build the SET part of the SQL query
-            set_clauses = []
-            params = []
+        if name is not None:
+            set_clauses.append("name = ?")
+            params.append(name)
 
-            if name is not None:
-                set_clauses.append("name = ?")
-                params.append(name)
+        if url is not None:
+            set_clauses.append("url = ?")
+            params.append(url)
 
-            if url is not None:
-                set_clauses.append("url = ?")
-                params.append(url)
+        if is_enabled is not None:
+            set_clauses.append("is_enabled = ?")
+            params.append(1 if is_enabled else 0)
 
-            if is_enabled is not None:
-                set_clauses.append("is_enabled = ?")
-                params.append(1 if is_enabled else 0)
+        if polling_interval is not None:
+            set_clauses.append("polling_interval = ?")
+            params.append(polling_interval)
 
-            if polling_interval is not None:
-                set_clauses.append("polling_interval = ?")
-                params.append(polling_interval)
+        if max_articles is not None:
+            set_clauses.append("max_articles = ?")
+            params.append(max_articles)
 
-            if max_articles is not None:
-                set_clauses.append("max_articles = ?")
-                params.append(max_articles)
+        if display_order is not None:
+            set_clauses.append("display_order = ?")
+            params.append(display_order)
 
-            if display_order is not None:
-                set_clauses.append("display_order = ?")
-                params.append(display_order)
-
-            # Only update if there's something to update
-            if set_clauses:
-                # Always update last_modified timestamp
-                set_clauses.append("last_modified = datetime('now')")
-
-                # Build and execute the SQL query
-                query = f"UPDATE feeds SET {', '.join(set_clauses)} WHERE id = ?"
-                params.append(feed_id)
+        # Only update if there's something to update
+        if not set_clauses:
+            return False
 
-                cursor.execute(query, params)
-                conn.commit()
+        # Always update last_modified timestamp
+        set_clauses.append("last_modified = datetime('now')")
 
-                if cursor.rowcount > 0:
-                    logger.info(f"Updated feed ID {feed_id}")
-                    return True
-                else:
-                    logger.warning(f"Feed ID {feed_id} not found or no changes made")
-                    return False
+        # Build and execute the SQL query
+        query = f"UPDATE feeds SET {', '.join(set_clauses)} WHERE id = ?"
+        params.append(feed_id)
 
-            return False
+        try:
+            with self.writer() as conn:
+                cursor = conn.execute(query, params)
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error updating feed: {e}")
             raise
 
+        if cursor.rowcount > 0:
+            logger.info(f"Updated feed ID {feed_id}")
+            return True
+        logger.warning(f"Feed ID {feed_id} not found or no changes made")
+        return False
+
     def toggle_feed(self, feed_id, enabled=None):
         """Toggle or set the enabled state of a feed."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            if enabled is None:
-                # Toggle current state
-                cursor.execute(
-                    "UPDATE feeds SET is_enabled = NOT is_enabled, last_modified = datetime('now') WHERE id = ?",
-                    (feed_id,)
-                )
-            else:
-                # Set to specified state
-                cursor.execute(
-                    "UPDATE feeds SET is_enabled = ?, last_modified = datetime('now') WHERE id = ?",
-                    (1 if enabled else 0, feed_id)
-                )
-
-            conn.commit()
+            with self.writer() as conn:
+                if enabled is None:
+                    # Toggle current state
+                    cursor = conn.execute(
+                        "UPDATE feeds SET is_enabled = NOT is_enabled, last_modified = datetime('now') WHERE id = ?",
+                        (feed_id,)
+                    )
+                else:
+                    # Set to specified state
+                    cursor = conn.execute(
+                        "UPDATE feeds SET is_enabled = ?, last_modified = datetime('now') WHERE id = ?",
+                        (1 if enabled else 0, feed_id)
+                    )
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error toggling feed: {e}")
             raise
 
@@ -670,76 +1206,71 @@ class Database:
         Args:
             order_mapping: Dictionary mapping feed IDs to their new display order
         """
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            for feed_id, order in order_mapping.items():
-                cursor.execute(
+            with self.writer() as conn:
+                conn.executemany(
                     "UPDATE feeds SET display_order = ?, last_modified = datetime('now') WHERE id = ?",
-                    (order, feed_id)
+                    [(order, feed_id) for feed_id, order in order_mapping.items()]
                 )
-
-            conn.commit()
             logger.info(f"Reordered {len(order_mapping)} feeds")
             return True
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error reordering feeds: {e}")
             raise
 
     def get_feed_by_id(self, feed_id):
         """Get detailed information about a specific feed."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM feeds WHERE id = ?", (feed_id,))
-            feed = cursor.fetchone()
+            with self.reader() as conn:
+                cursor = conn.execute("SELECT * FROM feeds WHERE id = ?", (feed_id,))
+                feed = cursor.fetchone()
 
-            if feed:
-                # Get article count for this feed
-                cursor.execute("SELECT COUNT(*) FROM articles WHERE feed_id = ?", (feed_id,))
-                article_count = cursor.fetchone()[0]
+                if feed:
+                    # Get article count for this feed
+                    cursor.execute("SELECT COUNT(*) FROM articles WHERE feed_id = ?", (feed_id,))
+                    article_count = cursor.fetchone()[0]
 
-                # Convert to dict and add article count
-                feed_dict = dict(feed)
-                feed_dict['article_count'] = article_count
+                    # Convert to dict and add article count
+                    feed_dict = dict(feed)
+                    feed_dict['article_count'] = article_count
 
-                return feed_dict
+                    return feed_dict
 
-            return None
+                return None
         except sqlite3.Error as e:
             logger.error(f"Error getting feed by ID: {e}")
             raise
 
     def export_feeds_to_json(self):
         """Export all feeds to a JSON format."""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-
-            # Get all feeds, ordered by display order
-            cursor.execute(
-                "SELECT id, name, url, is_enabled, polling_interval, max_articles, display_order FROM feeds ORDER BY display_order"
-            )
+        return {"feeds": list(self.iter_feeds_for_export())}
 
-            feeds = []
-            for row in cursor.fetchall():
-                feeds.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "url": row[2],
-                    "enabled": bool(row[3]),
-                    "polling_interval": row[4],
-                    "max_articles": row[5],
-                    "display_order": row[6]
-                })
-
-            return {"feeds": feeds}
-        except sqlite3.Error as e:
-            logger.error(f"Error exporting feeds: {e}")
-            raise
+    def iter_feeds_for_export(self):
+        """Return an iterator over feeds in export format, read from the cursor as it goes."""
+        def feed_rows():
+            # The pooled connection is held until the export has been fully streamed
+            with self.reader() as conn:
+                try:
+                    # Get all feeds, ordered by display order
+                    cursor = conn.execute(
+                        "SELECT id, name, url, is_enabled, polling_interval, max_articles, display_order FROM feeds ORDER BY display_order"
+                    )
+                except sqlite3.Error as e:
+                    logger.error(f"Error exporting feeds: {e}")
+                    raise
+
+                for row in cursor:
+                    yield {
+                        "id": row[0],
+                        "name": row[1],
+                        "url": row[2],
+                        "enabled": bool(row[3]),
+                        "polling_interval": row[4],
+                        "max_articles": row[5],
+                        "display_order": row[6]
+                    }
+
+        return feed_rows()
 
     def import_feeds_from_json(self, json_data, overwrite=False):
         """Import feeds from JSON data.
@@ -751,10 +1282,20 @@ class Database:
         Returns:
             Dictionary with counts of added, updated, and skipped feeds
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
+        return self.import_feeds_batch(json_data.get("feeds", []), overwrite)
+
+    def import_feeds_batch(self, feeds, overwrite=False, result=None):
+        """Import a batch of feed records in one transaction.
 
+        Args:
+            feeds: Iterable of feed dictionaries in export format
+            overwrite: If True, will replace existing feeds with same URL
+            result: Counts from earlier batches to add to, if any
+
+        Returns:
+            Dictionary with counts of added, updated, and skipped feeds
+        """
+        if result is None:
             result = {
                 "added": 0,
                 "updated": 0,
@@ -762,478 +1303,589 @@ class Database:
                 "errors": 0
             }
 
-            # Get existing feed URLs
-            cursor.execute("SELECT id, url FROM feeds")
-            existing_feeds = {row[1]: row[0] for row in cursor.fetchall()}
-
-            # Process each feed in the JSON data
-            for feed in json_data.get("feeds", []):
-                try:
-                    url = feed.get("url")
-                    if not url:
-                        result["errors"] += 1
-                        continue
-
-                    name = feed.get("name", url.split("/")[-1])
-                    enabled = feed.get("enabled", True)
-                    polling_interval = feed.get("polling_interval", 30)
-                    max_articles = feed.get("max_articles", 100)
-                    display_order = feed.get("display_order", 0)
-
-                    if url in existing_feeds:
-                        # Feed exists
-                        if overwrite:
-                            # Update existing feed
-                            feed_id = existing_feeds[url]
-                            cursor.execute(
-                                """
-                                UPDATE feeds
-                                SET name = ?, is_enabled = ?, polling_interval = ?,
-                                    max_articles = ?, display_order = ?, last_modified = datetime('now')
-                                WHERE id = ?
-                                """,
-                                (name, 1 if enabled else 0, polling_interval, max_articles, display_order, feed_id)
-                            )
-                            result["updated"] += 1
-                        else:
-                            # Skip
+        # Sort the batch into parameter lists so each statement runs once via executemany
+        updates = []
+        inserts = {}
+        try:
+            with self.writer() as conn:
+                # Get existing feed URLs
+                cursor = conn.execute("SELECT url, id FROM feeds")
+                existing_feeds = dict(cursor.fetchall())
+
+                # Process each feed in the batch
+                for feed in feeds:
+                    try:
+                        url = feed.get("url")
+                        if not url:
+                            result["errors"] += 1
+                            continue
+
+                        name = feed.get("name", url.split("/")[-1])
+                        enabled = 1 if feed.get("enabled", True) else 0
+                        polling_interval = feed.get("polling_interval", 30)
+                        max_articles = feed.get("max_articles", 100)
+                        display_order = feed.get("display_order", 0)
+
+                        if url in existing_feeds:
+                            # Feed exists
+                            if overwrite:
+                                # Update existing feed
+                                updates.append((name, enabled, polling_interval, max_articles,
+                                                display_order, existing_feeds[url]))
+                                result["updated"] += 1
+                            else:
+                                # Skip
+                                result["skipped"] += 1
+                        elif url in inserts and not overwrite:
+                            # Repeated within the import
                             result["skipped"] += 1
-                    else:
-                        # Add new feed
-                        cursor.execute(
-                            """
-                            INSERT INTO feeds
-                            (url, name, is_enabled, polling_interval, max_articles, display_order, created_at, last_modified)
-                            VALUES (?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-                            """,
-                            (url, name, 1 if enabled else 0, polling_interval, max_articles, display_order)
-                        )
-                        result["added"] += 1
-                except Exception as e:
-                    logger.error(f"Error processing feed {feed.get('name', 'unknown')}: {e}")
-                    result["errors"] += 1
+                        else:
+                            # Add new feed; a repeat with overwrite replaces the earlier entry
+                            if url in inserts:
+                                result["updated"] += 1
+                            else:
+                                result["added"] += 1
+                            inserts[url] = (url, name, enabled, polling_interval, max_articles, display_order)
+                    except Exception as e:
+                        logger.error(f"Error processing feed {feed.get('name', 'unknown')}: {e}")
+                        result["errors"] += 1
 
-            conn.commit()
+                conn.executemany(
+                    """
+                    UPDATE feeds
+                    SET name = ?, is_enabled = ?, polling_interval = ?,
+                        max_articles = ?, display_order = ?, last_modified = datetime('now')
+                    WHERE id = ?
+                    """,
+                    updates
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO feeds
+                    (url, name, is_enabled, polling_interval, max_articles, display_order, created_at, last_modified)
+                    VALUES (?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+                    """,
+                    inserts.values()
+                )
             return result
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error importing feeds: {e}")
             raise
 
     def delete_article(self, article_id):
         """Delete an article and its associated data."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            # Begin transaction
-            cursor.execute("BEGIN TRANSACTION")
-
-            # Delete from article_keywords junction table
-            cursor.execute("DELETE FROM article_keywords WHERE article_id = ?", (article_id,))
-
-            # Delete from articles_fts virtual table
-            cursor.execute("DELETE FROM articles_fts WHERE rowid = ?", (article_id,))
-
-            # Delete from articles table
-            cursor.execute("DELETE FROM articles WHERE id = ?", (article_id,))
-
-            # Commit transaction
-            conn.commit()
+            with self.writer() as conn:
+                # Keywords and favorites cascade; the articles_ad trigger clears the FTS row
+                conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
             logger.info(f"Deleted article ID: {article_id}")
             return True
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error deleting article {article_id}: {e}")
             return False
 
     def delete_feed(self, feed_id):
         """Delete a feed and all its associated articles."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            # Begin transaction
-            cursor.execute("BEGIN TRANSACTION")
-
-            # Get all article IDs for this feed
-            cursor.execute("SELECT id FROM articles WHERE feed_id = ?", (feed_id,))
-            article_ids = [row[0] for row in cursor.fetchall()]
-
-            # Delete article keywords
-            cursor.execute("DELETE FROM article_keywords WHERE article_id IN (SELECT id FROM articles WHERE feed_id = ?)", (feed_id,))
-
-            # Delete from FTS
-            for article_id in article_ids:
-                cursor.execute("DELETE FROM articles_fts WHERE rowid = ?", (article_id,))
-
-            # Delete articles
-            cursor.execute("DELETE FROM articles WHERE feed_id = ?", (feed_id,))
-
-            # Delete feed
-            cursor.execute("DELETE FROM feeds WHERE id = ?", (feed_id,))
+            # writer() takes the write lock before the count, so it matches what is deleted
+            with self.writer() as conn:
+                # Count first, as rowcount doesn't include cascaded rows
+                cursor = conn.execute("SELECT COUNT(*) FROM articles WHERE feed_id = ?", (feed_id,))
+                article_count = cursor.fetchone()[0]
 
-            # Commit transaction
-            conn.commit()
-            logger.info(f"Deleted feed ID: {feed_id} and {len(article_ids)} associated articles")
+                # Articles, their keywords and favorites cascade from the feed
+                conn.execute("DELETE FROM feeds WHERE id = ?", (feed_id,))
+            logger.info(f"Deleted feed ID: {feed_id} and {article_count} associated articles")
             return True
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error deleting feed {feed_id}: {e}")
             return False
 
     def clean_orphaned_keywords(self):
         """Clean up keywords that are not associated with any articles."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            # Delete keywords not associated with any article
-            cursor.execute("""
-                DELETE FROM keywords
-                WHERE id NOT IN (
-                    SELECT DISTINCT keyword_id FROM article_keywords
-                )
-            """)
-
+            with self.writer() as conn:
+                # One idx_ak_keyword probe per keyword, stopping at the first link
+                cursor = conn.execute("""
+                    DELETE FROM keywords
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM article_keywords ak WHERE ak.keyword_id = keywords.id
+                    )
+                """)
             deleted_count = cursor.rowcount
-            conn.commit()
             logger.info(f"Cleaned up {deleted_count} orphaned keywords")
             return deleted_count
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error cleaning orphaned keywords: {e}")
             return 0
 
+    @staticmethod
+    def _set_favorite_tags(conn, article_id, tags):
+        """Replace a favorite's rows in favorite_tags with the tags in a comma-separated string."""
+        conn.execute("DELETE FROM favorite_tags WHERE article_id = ?", (article_id,))
+        if tags:
+            conn.executemany(
+                "INSERT OR IGNORE INTO favorite_tags (article_id, tag) VALUES (?, ?)",
+                [(article_id, tag.strip()) for tag in tags.split(',') if tag.strip()]
+            )
+
     def add_favorite(self, article_id, notes=None, tags=None):
         """Add an article to favorites."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO favorites (article_id, notes, tags, added_date) VALUES (?, ?, ?, datetime('now'))",
-                (article_id, notes, tags)
-            )
-            conn.commit()
+            with self.writer() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO favorites (article_id, notes, tags, added_date) VALUES (?, ?, ?, datetime('now'))",
+                    (article_id, notes, tags)
+                )
+                self._set_favorite_tags(conn, article_id, tags)
             logger.info(f"Added article {article_id} to favorites")
             return True
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error adding favorite: {e}")
             return False
 
     def remove_favorite(self, article_id):
         """Remove an article from favorites."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM favorites WHERE article_id = ?", (article_id,))
-            conn.commit()
+            with self.writer() as conn:
+                cursor = conn.execute("DELETE FROM favorites WHERE article_id = ?", (article_id,))
             removed = cursor.rowcount > 0
             if removed:
                 logger.info(f"Removed article {article_id} from favorites")
             return removed
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error removing favorite: {e}")
             return False
 
     def update_favorite(self, article_id, notes=None, tags=None):
         """Update favorite notes and tags."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE favorites SET notes = ?, tags = ? WHERE article_id = ?",
-                (notes, tags, article_id)
-            )
-            conn.commit()
-            updated = cursor.rowcount > 0
+            with self.writer() as conn:
+                cursor = conn.execute(
+                    "UPDATE favorites SET notes = ?, tags = ? WHERE article_id = ?",
+                    (notes, tags, article_id)
+                )
+                updated = cursor.rowcount > 0
+                if updated:
+                    self._set_favorite_tags(conn, article_id, tags)
             if updated:
                 logger.info(f"Updated favorite for article {article_id}")
             return updated
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error updating favorite: {e}")
             return False
 
     def get_favorites(self, limit=50, offset=0, tag_filter=None, sort_by='date_desc'):
-        """Get favorited articles with optional filtering and sorting."""
-        conn = self._get_connection()
+        """Get favorited articles with optional filtering and sorting.
+
+        Each favorite has the ARTICLE_LIST_COLUMNS plus feed_name, favorited_date,
+        favorite_notes, favorite_tags and keywords; the large text columns are left out.
+        """
+        select_list = ', '.join(f"a.{column}" for column in ARTICLE_LIST_COLUMNS)
         try:
-            cursor = conn.cursor()
-
-            query = """
-                SELECT a.*, f.name as feed_name,
-                       fav.added_date as favorited_date,
-                       fav.notes as favorite_notes,
-                       fav.tags as favorite_tags,
-                       GROUP_CONCAT(k.keyword_text) as keywords
-                FROM favorites fav
-                JOIN articles a ON fav.article_id = a.id
-                JOIN feeds f ON a.feed_id = f.id
-                LEFT JOIN article_keywords ak ON a.id = ak.article_id
-                LEFT JOIN keywords k ON ak.keyword_id = k.id
-            """
+            with self.reader() as conn:
+                query = f"""
+                    SELECT {select_list}, f.name as feed_name,
+                           fav.added_date as favorited_date,
+                           fav.notes as favorite_notes,
+                           fav.tags as favorite_tags
+                    FROM favorites fav
+                    JOIN articles a ON fav.article_id = a.id
+                    JOIN feeds f ON a.feed_id = f.id
+                """
+
+                params = []
 
-            params = []
-
-            # Add tag filter if specified
-            if tag_filter:
-                query += " WHERE fav.tags LIKE ?"
-                params.append(f"%{tag_filter}%")
-
-            query += " GROUP BY a.id"
-
-            # Add sorting
-            if sort_by == 'date_desc':
-                query += " ORDER BY fav.added_date DESC"
-            elif sort_by == 'date_asc':
-                query += " ORDER BY fav.added_date ASC"
-            elif sort_by == 'title_asc':
-                query += " ORDER BY a.title ASC"
-            elif sort_by == 'title_desc':
-                query += " ORDER BY a.title DESC"
-            elif sort_by == 'published_desc':
-                query += " ORDER BY a.published_date DESC"
-            else:
-                query += " ORDER BY fav.added_date DESC"
-
-            query += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-
-            cursor.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+                # Add tag filter if specified
+                if tag_filter:
+                    query += " JOIN favorite_tags ft ON ft.article_id = fav.article_id WHERE ft.tag = ?"
+                    params.append(tag_filter)
+
+                # Add sorting
+                if sort_by == 'date_desc':
+                    query += " ORDER BY fav.added_date DESC"
+                elif sort_by == 'date_asc':
+                    query += " ORDER BY fav.added_date ASC"
+                elif sort_by == 'title_asc':
+                    query += " ORDER BY a.title ASC"
+                elif sort_by == 'title_desc':
+                    query += " ORDER BY a.title DESC"
+                elif sort_by == 'published_desc':
+                    query += " ORDER BY a.published_date DESC"
+                else:
+                    query += " ORDER BY fav.added_date DESC"
+
+                query += " LIMIT ? OFFSET ?"
+                params.extend([limit, offset])
+
+                cursor = conn.execute(query, params)
+                favorites = self._rows_to_dicts(cursor)
+                # Keywords for just this page, rather than joining them in before the sort
+                self._attach_keywords(conn, favorites)
+                return favorites
         except sqlite3.Error as e:
             logger.error(f"Error getting favorites: {e}")
             return []
 
     def is_favorite(self, article_id):
         """Check if an article is favorited."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM favorites WHERE article_id = ?", (article_id,))
-            return cursor.fetchone() is not None
+            with self.reader() as conn:
+                cursor = conn.execute("SELECT 1 FROM favorites WHERE article_id = ?", (article_id,))
+                return cursor.fetchone() is not None
         except sqlite3.Error as e:
             logger.error(f"Error checking favorite status: {e}")
             return False
 
     def get_favorite_tags(self):
         """Get all unique tags from favorites."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT DISTINCT tags FROM favorites WHERE tags IS NOT NULL AND tags != ''")
-
-            # Parse comma-separated tags
-            all_tags = set()
-            for row in cursor.fetchall():
-                if row[0]:
-                    tags = [tag.strip() for tag in row[0].split(',') if tag.strip()]
-                    all_tags.update(tags)
-
-            return sorted(list(all_tags))
+            with self.reader() as conn:
+                cursor = conn.execute("SELECT DISTINCT tag FROM favorite_tags ORDER BY tag")
+                return [row[0] for row in cursor]
         except sqlite3.Error as e:
             logger.error(f"Error getting favorite tags: {e}")
             return []
 
     def get_favorites_count(self, tag_filter=None):
         """Get total count of favorites for pagination."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            query = "SELECT COUNT(*) FROM favorites"
-            params = []
+            with self.reader() as conn:
+                query = "SELECT COUNT(*) FROM favorites"
+                params = []
 
-            if tag_filter:
-                query += " WHERE tags LIKE ?"
-                params.append(f"%{tag_filter}%")
+                if tag_filter:
+                    # Counted straight from the tag index
+                    query = "SELECT COUNT(*) FROM favorite_tags WHERE tag = ?"
+                    params.append(tag_filter)
 
-            cursor.execute(query, params)
-            return cursor.fetchone()[0]
+                cursor = conn.execute(query, params)
+                return cursor.fetchone()[0]
         except sqlite3.Error as e:
             logger.error(f"Error getting favorites count: {e}")
             return 0
 
-    def update_article_arxiv_status(self, article_id, arxiv_id=None, status='pending'):
-        """Update article with ArXiv ID and extraction status."""
-        conn = self._get_connection()
+    def bulk_update_arxiv_results(self, results):
+        """Store ArXiv extraction results for several articles in one transaction.
+
+        Args:
+            results: List of dicts with id, arxiv_id, status and full_content (None unless extracted)
+
+        Returns:
+            True if the results were saved
+        """
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE articles SET arxiv_id = ?, full_content_status = ? WHERE id = ?",
-                (arxiv_id, status, article_id)
-            )
-            conn.commit()
-            logger.info(f"Updated ArXiv status for article {article_id}: {status}")
-            return cursor.rowcount > 0
+            with self.writer() as conn:
+                conn.executemany(
+                    """UPDATE articles
+                       SET arxiv_id = ?, full_content_status = ?, arxiv_claimed_at = NULL,
+                           full_content = COALESCE(?, full_content),
+                           full_content_extracted_date = CASE WHEN ? IS NOT NULL
+                               THEN datetime('now') ELSE full_content_extracted_date END
+                       WHERE id = ?""",
+                    [
+                        (r['arxiv_id'], r['status'], r['full_content'], r['full_content'], r['id'])
+                        for r in results
+                    ]
+                )
+            logger.info(f"Saved ArXiv results for {len(results)} articles")
+            return True
         except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error updating ArXiv status: {e}")
+            logger.error(f"Error saving ArXiv results: {e}")
             return False
 
-    def update_article_full_content(self, article_id, full_content, status='extracted'):
-        """Update article with extracted full content."""
-        conn = self._get_connection()
+    def bulk_update_article_content(self, results):
+        """Store extracted feed content for several articles in one transaction.
+
+        Args:
+            results: List of dicts with id, raw_content (None if extraction failed) and processing_status
+
+        Returns:
+            True if the results were saved
+        """
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """UPDATE articles
-                   SET full_content = ?, full_content_status = ?, full_content_extracted_date = datetime('now')
-                   WHERE id = ?""",
-                (full_content, status, article_id)
-            )
-            conn.commit()
-            logger.info(f"Updated full content for article {article_id}")
-            return cursor.rowcount > 0
+            with self.writer() as conn:
+                conn.executemany(
+                    """UPDATE articles
+                       SET raw_content = COALESCE(?, raw_content), processing_status = ?
+                       WHERE id = ?""",
+                    [(r['raw_content'], r['processing_status'], r['id']) for r in results]
+                )
+            logger.info(f"Saved extracted content for {len(results)} articles")
+            return True
         except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error updating full content: {e}")
+            logger.error(f"Error saving extracted content: {e}")
+            return False
+
+    def bulk_save_llm_results(self, results):
+        """Store the summaries, keywords and statuses of several LLM-processed articles in one transaction.
+
+        Args:
+            results: List of dicts with id and processing_status, plus summary, keywords
+                and model for processed articles
+
+        Returns:
+            True if the results were saved
+        """
+        processed = [r for r in results if r['processing_status'] == 'processed']
+        failed = [r for r in results if r['processing_status'] != 'processed']
+        # Drop duplicate keywords per article, keeping order
+        links = [(r['id'], keyword) for r in processed for keyword in dict.fromkeys(r.get('keywords') or [])]
+        try:
+            with self.writer() as conn:
+                conn.executemany(
+                    """UPDATE articles
+                       SET summary = ?, llm_model_used = ?, llm_processed_date = datetime('now'),
+                           processing_status = 'processed'
+                       WHERE id = ?""",
+                    [(r['summary'], r['model'], r['id']) for r in processed]
+                )
+                conn.executemany(
+                    "UPDATE articles SET processing_status = ? WHERE id = ?",
+                    [(r['processing_status'], r['id']) for r in failed]
+                )
+                # Create any new keywords, then link them to their articles
+                conn.executemany(
+                    "INSERT OR IGNORE INTO keywords (keyword_text) VALUES (?)",
+                    [(keyword,) for keyword in {keyword for _, keyword in links}]
+                )
+                conn.executemany(
+                    """INSERT OR IGNORE INTO article_keywords (article_id, keyword_id)
+                       SELECT ?, id FROM keywords WHERE keyword_text = ?""",
+                    links
+                )
+            logger.info(f"Saved LLM results for {len(results)} articles")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error saving LLM results: {e}")
             return False
 
     def update_deep_summary(self, article_id, deep_summary, status='completed'):
         """Update article with deep summary from full content."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """UPDATE articles
-                   SET deep_summary = ?, deep_summary_status = ?, deep_summary_date = datetime('now')
-                   WHERE id = ?""",
-                (deep_summary, status, article_id)
-            )
-            conn.commit()
+            with self.writer() as conn:
+                cursor = conn.execute(
+                    """UPDATE articles
+                       SET deep_summary = ?, deep_summary_status = ?, deep_summary_date = datetime('now'),
+                           deep_summary_batch_id = NULL
+                       WHERE id = ?""",
+                    (deep_summary, status, article_id)
+                )
             logger.info(f"Updated deep summary for article {article_id}")
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Error updating deep summary: {e}")
             return False
 
-    def get_articles_for_arxiv_extraction(self, limit=10):
-        """Get articles that could have ArXiv content extracted."""
-        conn = self._get_connection()
+    def claim_articles_for_arxiv_extraction(self, limit=10):
+        """Take up to limit unclaimed extraction candidates, so concurrent extractors don't fetch the same papers.
+
+        The select and the claim share one write transaction. A claim is cleared when the
+        result is saved or released, and lapses after ARXIV_CLAIM_TIMEOUT_MINUTES.
+        """
         try:
-            cursor = conn.cursor()
-            # More comprehensive ArXiv detection
-            cursor.execute(
-                """SELECT id, title, link, guid
-                   FROM articles
-                   WHERE (
-                       link LIKE '%arxiv.org%'
-                       OR guid LIKE '%arxiv.org%'
-                       OR link LIKE '%arXiv.org%'
-                       OR guid LIKE '%arXiv.org%'
-                   )
-                   AND (
-                       full_content_status = 'not_applicable'
-                       OR full_content_status IS NULL
-                       OR arxiv_id IS NULL
-                   )
-                   ORDER BY published_date DESC
-                   LIMIT ?""",
-                (limit,)
-            )
-            results = [dict(row) for row in cursor.fetchall()]
-            logger.info(f"Found {len(results)} articles for ArXiv extraction")
+            with self.writer() as conn:
+                # LIKE is case-insensitive, so this also matches arXiv.org and OAI GUIDs.
+                # The conditions are written exactly as in idx_articles_arxiv_pending so the
+                # partial index can be used.
+                results = self._rows_to_dicts(conn.execute(
+                    """SELECT id, title, link, guid
+                       FROM articles
+                       WHERE (link LIKE '%arxiv.org%' OR guid LIKE '%arxiv.org%')
+                       AND (
+                           full_content_status = 'not_applicable'
+                           OR full_content_status IS NULL
+                           OR arxiv_id IS NULL
+                       )
+                       -- ArXiv links without a paper ID, already checked
+                       AND COALESCE(full_content_status, '') != 'unavailable'
+                       AND (arxiv_claimed_at IS NULL OR arxiv_claimed_at < datetime('now', ?))
+                       ORDER BY published_date DESC LIMIT ?""",
+                    (f"-{ARXIV_CLAIM_TIMEOUT_MINUTES} minutes", limit)
+                ))
+                conn.executemany(
+                    "UPDATE articles SET arxiv_claimed_at = datetime('now') WHERE id = ?",
+                    [(article['id'],) for article in results]
+                )
+            logger.info(f"Claimed {len(results)} articles for ArXiv extraction")
             return results
         except sqlite3.Error as e:
-            logger.error(f"Error getting articles for ArXiv extraction: {e}")
+            logger.error(f"Error claiming articles for ArXiv extraction: {e}")
             return []
 
+    def release_arxiv_claims(self, article_ids):
+        """Clear the extraction claims on articles that weren't processed, so they can be retried."""
+        try:
+            with self.writer() as conn:
+                conn.executemany(
+                    "UPDATE articles SET arxiv_claimed_at = NULL WHERE id = ?",
+                    [(article_id,) for article_id in article_ids]
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error releasing ArXiv claims: {e}")
+            return False
+
     def get_articles_for_deep_summary(self, limit=10):
         """Get articles that have full content but need deep summary."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """SELECT id, title, full_content
-                   FROM articles
-                   WHERE full_content_status = 'extracted'
-                   AND full_content IS NOT NULL
-                   AND deep_summary_status = 'pending'
-                   ORDER BY full_content_extracted_date DESC
-                   LIMIT ?""",
-                (limit,)
-            )
-            return [dict(row) for row in cursor.fetchall()]
+            with self.reader() as conn:
+                cursor = conn.execute(
+                    """SELECT id, title, full_content
+                       FROM articles
+                       WHERE full_content_status = 'extracted'
+                       AND full_content IS NOT NULL
+                       AND deep_summary_status = 'pending'
+                       AND deep_summary_batch_id IS NULL
+                       ORDER BY full_content_extracted_date DESC
+                       LIMIT ?""",
+                    (limit,)
+                )
+                return self._rows_to_dicts(cursor)
         except sqlite3.Error as e:
             logger.error(f"Error getting articles for deep summary: {e}")
             return []
 
-    def request_deep_summary(self, article_id):
-        """Mark an article as requesting deep summary processing."""
-        conn = self._get_connection()
+    def get_pending_llm_work(self, article_limit=10, deep_summary_limit=10):
+        """Get articles awaiting LLM processing and deep summaries in one query.
+
+        Args:
+            article_limit: Maximum number of articles pending summary and keywords
+            deep_summary_limit: Maximum number of articles pending a deep summary
+
+        Returns:
+            List of dicts with id, title, raw_content, full_content and kind, which is
+            'article' (with raw_content) or 'deep_summary' (with full_content)
+        """
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE articles SET deep_summary_status = 'pending' WHERE id = ?",
-                (article_id,)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+            with self.reader() as conn:
+                cursor = conn.execute(
+                    """SELECT * FROM (
+                           SELECT id, title, raw_content, NULL AS full_content, 'article' AS kind
+                           FROM articles
+                           WHERE processing_status = 'pending_llm'
+                           LIMIT ?
+                       )
+                       UNION ALL
+                       SELECT * FROM (
+                           SELECT id, title, NULL, full_content, 'deep_summary'
+                           FROM articles
+                           WHERE full_content_status = 'extracted'
+                           AND full_content IS NOT NULL
+                           AND deep_summary_status = 'pending'
+                           AND deep_summary_batch_id IS NULL
+                           ORDER BY full_content_extracted_date DESC
+                           LIMIT ?
+                       )""",
+                    (article_limit, deep_summary_limit)
+                )
+                return self._rows_to_dicts(cursor)
         except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Error requesting deep summary: {e}")
+            logger.error(f"Error getting pending LLM work: {e}")
+            return []
+
+    def count_articles_for_deep_summary(self):
+        """Count the articles get_articles_for_deep_summary would return, without a limit."""
+        try:
+            with self.reader() as conn:
+                return conn.execute(
+                    """SELECT COUNT(*)
+                       FROM articles
+                       WHERE full_content_status = 'extracted'
+                       AND full_content IS NOT NULL
+                       AND deep_summary_status = 'pending'
+                       AND deep_summary_batch_id IS NULL"""
+                ).fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Error counting articles for deep summary: {e}")
+            return 0
+
+    def mark_deep_summary_batch(self, article_ids, batch_id):
+        """Record that the articles' deep summaries were submitted in an OpenAI batch."""
+        try:
+            with self.writer() as conn:
+                conn.executemany(
+                    "UPDATE articles SET deep_summary_batch_id = ? WHERE id = ?",
+                    [(batch_id, article_id) for article_id in article_ids]
+                )
+            logger.info(f"Marked {len(article_ids)} deep summaries as submitted in batch {batch_id}")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error marking deep summary batch: {e}")
             return False
 
-    def extract_arxiv_id_from_url(self, url):
-        """Extract ArXiv ID from URL or GUID."""
-        import re
+    def get_deep_summary_batches(self):
+        """Get the IDs of OpenAI batches that still have deep summaries waiting on them."""
+        try:
+            with self.reader() as conn:
+                cursor = conn.execute(
+                    "SELECT DISTINCT deep_summary_batch_id FROM articles WHERE deep_summary_batch_id IS NOT NULL"
+                )
+                return [row[0] for row in cursor]
+        except sqlite3.Error as e:
+            logger.error(f"Error getting deep summary batches: {e}")
+            return []
 
-        # ArXiv URL patterns
-        patterns = [
-            r'arxiv\.org/abs/([0-9]{4}\.[0-9]{4,5})',  # New format
-            r'arxiv\.org/abs/([a-z-]+/[0-9]{7})',     # Old format
-            r'arxiv\.org/pdf/([0-9]{4}\.[0-9]{4,5})', # PDF links
-            r'arxiv\.org/pdf/([a-z-]+/[0-9]{7})',     # Old PDF format
-        ]
+    def release_deep_summary_batch(self, batch_id):
+        """Return a batch's unfinished deep summaries to the regular pending queue."""
+        try:
+            with self.writer() as conn:
+                cursor = conn.execute(
+                    "UPDATE articles SET deep_summary_batch_id = NULL WHERE deep_summary_batch_id = ?",
+                    (batch_id,)
+                )
+            logger.info(f"Released {cursor.rowcount} deep summaries from batch {batch_id}")
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error releasing deep summary batch: {e}")
+            return 0
 
-        for pattern in patterns:
-            match = re.search(pattern, url, re.IGNORECASE)
-            if match:
-                return match.group(1)
+    def request_deep_summary(self, article_id, only_if_ready=False):
+        """Mark an article as requesting deep summary processing.
 
-        return None
+        With only_if_ready, the article is only marked if its full content is extracted
+        and no deep summary is already pending, checked within the UPDATE itself.
+        """
+        query = "UPDATE articles SET deep_summary_status = 'pending' WHERE id = ?"
+        if only_if_ready:
+            query += " AND full_content_status = 'extracted' AND deep_summary_status IS NOT 'pending'"
+        try:
+            with self.writer() as conn:
+                cursor = conn.execute(query, (article_id,))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"Error requesting deep summary: {e}")
+            return False
 
     def get_feed_arxiv_breakdown(self):
         """Get breakdown of ArXiv articles by feed."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            # Get ArXiv article counts by feed
-            cursor.execute("""
-                SELECT f.id, f.name,
-                       COUNT(a.id) as total_arxiv,
-                       SUM(CASE WHEN a.full_content_status = 'extracted' THEN 1 ELSE 0 END) as extracted,
-                       SUM(CASE WHEN a.deep_summary_status = 'completed' THEN 1 ELSE 0 END) as analyzed
-                FROM feeds f
-                JOIN articles a ON f.id = a.feed_id
-                WHERE a.arxiv_id IS NOT NULL
-                GROUP BY f.id
-                ORDER BY total_arxiv DESC
-            """)
-
-            feeds = []
-            for row in cursor.fetchall():
-                feed_dict = {
-                    "id": row[0],
-                    "name": row[1],
-                    "total_arxiv": row[2],
-                    "extracted": row[3],
-                    "analyzed": row[4],
-                    "extraction_percentage": round((row[3] / row[2]) * 100) if row[2] > 0 else 0,
-                    "analysis_percentage": round((row[4] / row[3]) * 100) if row[3] > 0 else 0
+            with self.reader() as conn:
+                # Get ArXiv article counts by feed, with the percentages computed alongside
+                cursor = conn.execute("""
+                    SELECT id, name, total_arxiv, extracted, analyzed,
+                           COALESCE(CAST(ROUND(extracted * 100.0 / NULLIF(total_arxiv, 0)) AS INTEGER), 0)
+                               AS extraction_percentage,
+                           COALESCE(CAST(ROUND(analyzed * 100.0 / NULLIF(extracted, 0)) AS INTEGER), 0)
+                               AS analysis_percentage
+                    FROM (
+                        SELECT f.id, f.name,
+                               COUNT(a.id) as total_arxiv,
+                               SUM(CASE WHEN a.full_content_status = 'extracted' THEN 1 ELSE 0 END) as extracted,
+                               SUM(CASE WHEN a.deep_summary_status = 'completed' THEN 1 ELSE 0 END) as analyzed
+                        FROM feeds f
+                        JOIN articles a ON f.id = a.feed_id
+                        WHERE a.arxiv_id IS NOT NULL
+                        GROUP BY f.id
+                    )
+                    ORDER BY total_arxiv DESC
+                """)
+                feeds = self._rows_to_dicts(cursor)
+
+                return {
+                    "feeds": feeds,
+                    "total_feeds_with_arxiv": len(feeds)
                 }
-                feeds.append(feed_dict)
-
-            return {
-                "feeds": feeds,
-                "total_feeds_with_arxiv": len(feeds)
-            }
 
         except sqlite3.Error as e:
             logger.error(f"Error getting ArXiv feed breakdown: {e}")
@@ -1245,98 +1897,71 @@ class Database:
 
     def get_arxiv_statistics(self):
         """Get statistics about ArXiv articles and processing."""
-        conn = self._get_connection()
         try:
-            cursor = conn.cursor()
-
-            # Get total ArXiv articles
-            cursor.execute("""
-                SELECT COUNT(*) FROM articles
-                WHERE arxiv_id IS NOT NULL
-            """)
-            total_arxiv = cursor.fetchone()[0]
-
-            # Get counts by extraction status
-            cursor.execute("""
-                SELECT full_content_status, COUNT(*)
-                FROM articles
-                WHERE arxiv_id IS NOT NULL
-                GROUP BY full_content_status
-            """)
-            extraction_status = {row[0]: row[1] for row in cursor.fetchall()}
-
-            # Format extraction status for UI
-            extraction = {
-                "extracted": extraction_status.get("extracted", 0),
-                "pending": extraction_status.get("pending", 0),
-                "failed": extraction_status.get("failed", 0),
-                "unavailable": extraction_status.get("unavailable", 0),
-                "not_applicable": extraction_status.get("not_applicable", 0)
-            }
-
-            # Get deep summary stats
-            cursor.execute("""
-                SELECT deep_summary_status, COUNT(*)
-                FROM articles
-                WHERE arxiv_id IS NOT NULL
-                GROUP BY deep_summary_status
-            """)
-            summary_status = {row[0]: row[1] for row in cursor.fetchall()}
-
-            # Format deep summary status for UI
-            deep_summary = {
-                "completed": summary_status.get("completed", 0),
-                "pending": summary_status.get("pending", 0),
-                "failed": summary_status.get("failed", 0),
-                "not_requested": summary_status.get("not_requested", 0)
-            }
-
-            # Get content type statistics
-            cursor.execute("""
-                SELECT COUNT(*) FROM articles
-                WHERE arxiv_id IS NOT NULL
-                AND full_content_status = 'extracted'
-                AND length(full_content) > 10000
-            """)
-            full_papers = cursor.fetchone()[0]
-
-            cursor.execute("""
-                SELECT COUNT(*) FROM articles
-                WHERE arxiv_id IS NOT NULL
-                AND full_content_status = 'extracted'
-                AND length(full_content) <= 10000
-            """)
-            abstracts_plus = cursor.fetchone()[0]
+            with self.reader() as conn:
+                # Count everything in one pass over the ArXiv articles. length() is only
+                # evaluated for extracted rows, as CASE stops at the first match.
+                cursor = conn.execute("""
+                    SELECT COUNT(*) AS total_arxiv,
+                           SUM(CASE WHEN published_date > datetime('now', '-7 days') THEN 1 ELSE 0 END) AS recent_arxiv,
+                           SUM(CASE WHEN full_content_status = 'extracted' THEN 1 ELSE 0 END) AS extracted,
+                           SUM(CASE WHEN full_content_status = 'pending' THEN 1 ELSE 0 END) AS extraction_pending,
+                           SUM(CASE WHEN full_content_status = 'failed' THEN 1 ELSE 0 END) AS extraction_failed,
+                           SUM(CASE WHEN full_content_status = 'unavailable' THEN 1 ELSE 0 END) AS unavailable,
+                           SUM(CASE WHEN full_content_status = 'not_applicable' THEN 1 ELSE 0 END) AS not_applicable,
+                           SUM(CASE WHEN deep_summary_status = 'completed' THEN 1 ELSE 0 END) AS completed,
+                           SUM(CASE WHEN deep_summary_status = 'pending' THEN 1 ELSE 0 END) AS summary_pending,
+                           SUM(CASE WHEN deep_summary_status = 'failed' THEN 1 ELSE 0 END) AS summary_failed,
+                           SUM(CASE WHEN deep_summary_status = 'not_requested' THEN 1 ELSE 0 END) AS not_requested,
+                           SUM(CASE WHEN full_content_status IS NOT 'extracted' THEN 0
+                                    WHEN length(full_content) > 10000 THEN 1 ELSE 0 END) AS full_papers,
+                           SUM(CASE WHEN full_content_status IS NOT 'extracted' THEN 0
+                                    WHEN length(full_content) <= 10000 THEN 1 ELSE 0 END) AS abstracts_plus
+                    FROM articles
+                    WHERE arxiv_id IS NOT NULL
+                """)
+                # SUM is NULL when there are no ArXiv articles
+                counts = {name: value or 0 for name, value in zip(
+                    [column[0] for column in cursor.description], cursor.fetchone())}
+
+                # Format extraction status for UI
+                extraction = {
+                    "extracted": counts["extracted"],
+                    "pending": counts["extraction_pending"],
+                    "failed": counts["extraction_failed"],
+                    "unavailable": counts["unavailable"],
+                    "not_applicable": counts["not_applicable"]
+                }
 
-            # Get recent ArXiv articles (last 7 days)
-            cursor.execute("""
-                SELECT COUNT(*) FROM articles
-                WHERE arxiv_id IS NOT NULL
-                AND published_date > datetime('now', '-7 days')
-            """)
-            recent_arxiv = cursor.fetchone()[0]
-
-            # Get most recent extractions
-            cursor.execute("""
-                SELECT id, title, arxiv_id, full_content_extracted_date
-                FROM articles
-                WHERE full_content_status = 'extracted'
-                ORDER BY full_content_extracted_date DESC
-                LIMIT 5
-            """)
-            recent_extractions = [dict(row) for row in cursor.fetchall()]
+                # Format deep summary status for UI
+                deep_summary = {
+                    "completed": counts["completed"],
+                    "pending": counts["summary_pending"],
+                    "failed": counts["summary_failed"],
+                    "not_requested": counts["not_requested"]
+                }
 
-            return {
-                "total_arxiv": total_arxiv,
-                "recent_arxiv": recent_arxiv,
-                "extraction": extraction,
-                "deep_summary": deep_summary,
-                "content_types": {
-                    "full_papers": full_papers,
-                    "abstracts_plus": abstracts_plus
-                },
-                "recent_extractions": recent_extractions
-            }
+                # Get most recent extractions
+                cursor.execute("""
+                    SELECT id, title, arxiv_id, full_content_extracted_date
+                    FROM articles
+                    WHERE full_content_status = 'extracted'
+                    ORDER BY full_content_extracted_date DESC
+                    LIMIT 5
+                """)
+                recent_extractions = self._rows_to_dicts(cursor)
+
+                return {
+                    "total_arxiv": counts["total_arxiv"],
+                    "recent_arxiv": counts["recent_arxiv"],
+                    "extraction": extraction,
+                    "deep_summary": deep_summary,
+                    "content_types": {
+                        "full_papers": counts["full_papers"],
+                        "abstracts_plus": counts["abstracts_plus"]
+                    },
+                    "recent_extractions": recent_extractions
+                }
 
         except sqlite3.Error as e:
             logger.error(f"Error getting ArXiv statistics: {e}")
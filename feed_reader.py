@@ -1,14 +1,31 @@
 import feedparser
 import asyncio
-import aiohttp
+import httpx
 import time
 import logging
 import random
-import re
-from datetime import datetime, timedelta
+import soupsieve
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO
 from bs4 import BeautifulSoup
+from collections import defaultdict
+from functools import lru_cache, partial
+from itertools import chain
 from urllib.parse import urlparse, urljoin
 
+from ratelimit import RateLimiter
+
+# Parse plain RSS 2.0 and Atom feeds with lxml when it's installed, falling back to
+# feedparser. Their HTML goes through feedparser's own sanitizer, so both paths store
+# the same markup.
+try:
+    from lxml import etree
+    from feedparser.sanitizer import _sanitize_html
+    from feedparser.mixin import _FeedParserMixin
+except ImportError:
+    etree = None
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,6 +33,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Extract article text with selectolax when it's installed, falling back to BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Element names for the lxml fast path
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+RSS_CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+DC_DATE = '{http://purl.org/dc/elements/1.1/}date'
+
+# Build article soups with lxml's parser when it's available
+HTML_PARSER = 'lxml' if etree is not None else 'html.parser'
+
+# Returned by _fetch_and_parse_feed when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
+# Retry backoff: the delay doubles per attempt from RETRY_BASE_DELAY up to RETRY_MAX_DELAY
+# seconds, with jitter. A Retry-After longer than MAX_RETRY_AFTER seconds ends the poll.
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 30
+MAX_RETRY_AFTER = 300
+
+# Feeds whose own content has matched the linked page on more than this share of recent
+# fetches (an exponential moving average) skip the page fetch, except for the occasional
+# probe that keeps the average current
+CONTENT_IN_FEED_THRESHOLD = 0.8
+CONTENT_IN_FEED_PROBE_RATE = 0.1
+
+# CSS selectors for article content containers, generic and per domain
+CONTENT_SELECTORS = (
+    'article', '.article', '.post', '.content', 'main', '#content', '#main',
+    '.post-content', '.entry-content', '.article-content', '.post-body',
+    '[itemprop="articleBody"]', '.blog-post', '.blog-content'
+)
+# Extra selectors tried after the generic ones, by domain (subdomains included)
+DOMAIN_SELECTORS = {
+    'machinelearningmastery.com': ('.entry', '.post-content', '.entry-content'),
+    'openai.com': ('.post-content', '.research-paper'),
+    'ai.googleblog.com': ('.post-body', '.post'),
+    'arxiv.org': ('#abs', '.abstract'),
+}
+
+# The BeautifulSoup path uses them compiled once, rather than re-parsed by soupsieve
+# for every article
+COMPILED_SELECTORS = {
+    selector: soupsieve.compile(selector)
+    for selector in CONTENT_SELECTORS + tuple(chain.from_iterable(DOMAIN_SELECTORS.values()))
+}
+
+# Page furniture removed before extracting text
+NON_CONTENT_TAGS = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe', 'noscript']
+
 # List of common user agents for rotation
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -25,6 +95,103 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36'
 ]
 
+# Request headers for each user agent, built once. They're shared, so copy one before
+# adding per-request headers.
+FEED_HEADER_VARIANTS = tuple(
+    {
+        'User-Agent': user_agent,
+        'Accept': 'application/rss+xml, application/xml, text/xml, application/atom+xml, text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Upgrade-Insecure-Requests': '1',
+        'Cache-Control': 'max-age=0',
+        'TE': 'Trailers',
+    }
+    for user_agent in USER_AGENTS
+)
+# Half of the article variants send DNT, to seem more human-like
+ARTICLE_HEADER_VARIANTS = tuple(
+    {
+        'User-Agent': user_agent,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Upgrade-Insecure-Requests': '1',
+        'Cache-Control': 'max-age=0',
+        'Referer': 'https://www.google.com/',  # Pretend we came from Google
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'cross-site',
+        'Sec-Fetch-User': '?1',
+        'TE': 'Trailers',
+        **extra,
+    }
+    for user_agent in USER_AGENTS
+    for extra in ({}, {'DNT': '1'})
+)
+
+def _parse_feed_date(text):
+    """Parse an ISO 8601 or RFC 822 feed date into a UTC struct_time, or None if it's neither."""
+    try:
+        dt = datetime.fromisoformat(text[:-1] + '+00:00' if text.endswith('Z') else text)
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(text)
+        except (TypeError, ValueError, IndexError):
+            return None
+    if dt.tzinfo is None:
+        # Like feedparser, read dates without a zone as UTC
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.utctimetuple()
+
+def _backoff_delay(attempt):
+    """Return the jittered exponential backoff delay, in seconds, before retry number attempt + 1."""
+    # Jitter spreads out retries from feeds that failed together, e.g. on the same host
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) * (0.5 + random.random())
+
+def _parse_retry_after(value):
+    """Parse a Retry-After header (seconds or an HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RetryableError(Exception):
+    """A fetch the server asked us to retry (429/503), after delay seconds if it said when."""
+
+    def __init__(self, message, delay=None):
+        super().__init__(message)
+        self.delay = delay
+
+@lru_cache(maxsize=1024)
+def _content_selectors(hostname):
+    """Return the content container selectors to try for a host, generic ones first."""
+    # Look the host up, then each parent domain (www.openai.com, then openai.com)
+    labels = hostname.split('.')
+    for i in range(len(labels) - 1):
+        domain_selectors = DOMAIN_SELECTORS.get('.'.join(labels[i:]))
+        if domain_selectors:
+            return CONTENT_SELECTORS + domain_selectors
+    return CONTENT_SELECTORS
+
+def _child_text(element, tag):
+    """Return the stripped text of element's first tag child, or ''."""
+    child = element.find(tag)
+    if child is None:
+        return ''
+    if len(child):
+        # Inline XHTML (Atom type="xhtml") comes wrapped in a div; keep its contents as markup
+        wrapper = child[0]
+        return ((wrapper.text or '') + ''.join(
+            etree.tostring(element, encoding='unicode') for element in wrapper
+        )).strip()
+    return (child.text or '').strip()
+
 class FeedReader:
     def __init__(self, database, config):
         """Initialize feed reader with database and config objects."""
@@ -32,7 +199,12 @@ class FeedReader:
         self.config = config
         self.polling = False
         self.session = None
-        self.retry_delays = [1, 2, 5, 10, 30]  # Seconds to wait between retries
+        self.max_retries = 5  # Attempts per feed fetch; delays come from _backoff_delay
+        self.on_new_articles = []  # Callbacks run after a poll stores new articles
+        # One limiter per host, shared by every concurrent poll, so feeds and articles
+        # on the same site (or CDN) don't hit it faster than per_host_rps together
+        self.host_limiters = defaultdict(lambda: RateLimiter(self.config.get('per_host_rps', 1)))
+
     async def start_polling(self):
         """Start polling feeds at their configured intervals."""
         if self.polling:
@@ -137,41 +309,42 @@ class FeedReader:
                 logger.info("No enabled feeds found")
                 return
             
-            # Create shared session for all requests
-            if self.session is None or self.session.closed:
-                timeout = aiohttp.ClientTimeout(total=60)  # 60 seconds timeout
-                self.session = aiohttp.ClientSession(timeout=timeout)
+            self._ensure_session()
             
-            # Process feeds concurrently with a limit
-            max_concurrent = self.config.get('max_concurrent_feeds', 5)
-            tasks = []
+            # Process feeds concurrently, at most max_concurrent_feeds at a time
+            semaphore = asyncio.Semaphore(self.config.get('max_concurrent_feeds', 5))
             
-            for feed in feeds:
-                if len(tasks) >= max_concurrent:
-                    # Wait for some tasks to complete before adding more
-                    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-                    tasks = list(pending)  # Convert set back to list
-                    # Handle any exceptions
-                    for task in done:
-                        try:
-                            await task
-                        except Exception as e:
-                            logger.error(f"Feed polling task error: {e}")
-                
-                # Add new task
-                task = asyncio.create_task(self.poll_feed(feed))
-                tasks.append(task)
+            async def poll_one(feed):
+                async with semaphore:
+                    return await self.poll_feed(feed)
             
-            # Wait for remaining tasks
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+            results = await asyncio.gather(*(poll_one(feed) for feed in feeds), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Feed polling task error: {result}")
                 
         except Exception as e:
             logger.error(f"Error in poll_all_feeds: {e}")
             raise
     
+    def _ensure_session(self):
+        """Create the shared HTTP client if there isn't an open one."""
+        # It lives until close() at shutdown, so connections to each feed host are kept
+        # alive and reused from one poll to the next. Over HTTP/2, article fetches to
+        # the same host are multiplexed on one connection.
+        if self.session is None or self.session.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.config.get('max_connections', 100),
+                max_keepalive_connections=50,
+                keepalive_expiry=75
+            )
+            self.session = httpx.AsyncClient(
+                http2=True, timeout=60, limits=limits, follow_redirects=True  # 60 seconds timeout
+            )
+    
     async def poll_feed(self, feed):
         """Poll a single feed for new items."""
+        self._ensure_session()
         feed_id = feed['id']
         feed_url = feed['url']
         feed_name = feed['name']
@@ -180,156 +353,320 @@ class FeedReader:
         logger.info(f"Polling feed: {feed_name} ({feed_url})")
         
         try:
-            # Parse the feed
-            feed_data = await self._fetch_and_parse_feed_with_retry(feed_url)
+            # Parse the feed, unless it hasn't changed since the last poll
+            feed_data = await self._fetch_and_parse_feed_with_retry(
+                feed_url, feed.get('http_etag'), feed.get('http_last_modified')
+            )
+            
+            if feed_data is NOT_MODIFIED:
+                logger.info(f"Feed not modified since last poll: {feed_name}")
+                self.db.update_feed_poll_status(feed_id, None)
+                return
             
             if not feed_data or not feed_data.entries:
                 logger.warning(f"No entries found for feed: {feed_name}")
                 self.db.increment_feed_error(feed_id)
                 return
             
-            # Process entries (newest first)
-            entries = sorted(feed_data.entries, key=lambda e: self._get_published_date(e), reverse=True)
-            new_items_count = 0
-            latest_guid = None
+            # Process entries (newest first), working out each date once
+            entries = sorted(
+                ((self._get_published_date(entry), entry) for entry in feed_data.entries),
+                key=lambda dated: dated[0],
+                reverse=True
+            )
+            new_entries = []
+            
+            # Skip entries we already have, wherever the feed puts them: many feeds reorder
+            # items, so stopping at the last processed one could miss new entries after it
+            # The database calls below run in worker threads, so the event loop keeps
+            # driving other feeds' fetches while SQLite waits on locks or fsyncs
+            loop = asyncio.get_running_loop()
+            seen_guids = frozenset(await loop.run_in_executor(None, self.db.get_recent_guids, feed_id))
             
-            for entry in entries:
+            for published_date, entry in entries:
                 guid = entry.get('id', entry.get('link', ''))
                 
-                # Stop if we've reached the last processed item
-                if guid == last_guid:
-                    break
-                
-                # Set the latest guid on first iteration
-                if latest_guid is None:
-                    latest_guid = guid
-                
-                # Process the new entry
-                await self._process_entry(feed_id, entry)
-                new_items_count += 1
+                if guid in seen_guids or guid == last_guid:
+                    continue
                 
-                # Add a small delay between processing entries to be nice to servers
-                await asyncio.sleep(0.5)
+                new_entries.append((guid, published_date, entry))
+            
+            latest_guid = new_entries[0][0] if new_entries else None
+            
+            # Add basic article info for all new entries in one transaction
+            article_ids = await loop.run_in_executor(None, partial(
+                self.db.add_articles,
+                feed_id,
+                [
+                    {
+                        'guid': guid,
+                        'link': entry.get('link', ''),
+                        'title': entry.get('title', 'No Title'),
+                        'published_date': published_date
+                    }
+                    for guid, published_date, entry in new_entries
+                ],
+                status="pending_content"
+            ))
+            new_items_count = len(article_ids)
+            
+            # Fetch the new articles' content concurrently, at most per_feed_concurrency at
+            # a time (the per-host limiters keep this polite), then store it all in one transaction
+            semaphore = asyncio.Semaphore(self.config.get('per_feed_concurrency', 4))
+            
+            async def process_one(article_id, entry):
+                async with semaphore:
+                    return await self._process_entry(feed, article_id, entry)
+            
+            tasks = []
+            for guid, _, entry in new_entries:
+                # Entries already stored (e.g. cross-posted from another feed) are skipped
+                article_id = article_ids.pop(guid, None)
+                if article_id is None:
+                    continue
+                tasks.append(process_one(article_id, entry))
+            content_updates = await asyncio.gather(*tasks)
+            
+            if content_updates:
+                await loop.run_in_executor(None, self.db.bulk_update_article_content, content_updates)
             
-            # Update feed status with latest guid
-            if latest_guid:
-                self.db.update_feed_poll_status(feed_id, latest_guid)
+            # Update feed status with latest guid and the validators for the next poll
+            if latest_guid or feed_data.get('etag') or feed_data.get('modified'):
+                self.db.update_feed_poll_status(
+                    feed_id, latest_guid,
+                    etag=feed_data.get('etag'), http_last_modified=feed_data.get('modified'),
+                    content_in_feed_ratio=feed.get('content_in_feed_ratio')
+                )
+                # The periodic poller reuses this dict, so keep it current too
+                feed['last_polled_item_guid'] = latest_guid or last_guid
+                feed['http_etag'] = feed_data.get('etag') or feed.get('http_etag')
+                feed['http_last_modified'] = feed_data.get('modified') or feed.get('http_last_modified')
             
             logger.info(f"Processed {new_items_count} new items from feed: {feed_name}")
+
+            if new_items_count:
+                self._notify_new_articles()
             
         except Exception as e:
             logger.error(f"Error polling feed {feed_name}: {e}")
             self.db.increment_feed_error(feed_id)
     
-    async def _fetch_and_parse_feed_with_retry(self, feed_url):
+    def _notify_new_articles(self):
+        """Run the registered new-article callbacks."""
+        for callback in self.on_new_articles:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in new-article callback: {e}")
+
+    async def _fetch_and_parse_feed_with_retry(self, feed_url, etag=None, last_modified=None):
         """Fetch and parse a feed from its URL with retries."""
-        for attempt, delay in enumerate(self.retry_delays):
+        for attempt in range(self.max_retries):
             try:
-                return await self._fetch_and_parse_feed(feed_url)
+                return await self._fetch_and_parse_feed(feed_url, etag, last_modified)
             except Exception as e:
                 logger.warning(f"Attempt {attempt + 1} failed for {feed_url}: {e}")
-                if attempt < len(self.retry_delays) - 1:
-                    logger.info(f"Retrying in {delay} seconds...")
+                if attempt < self.max_retries - 1:
+                    # Honor the server's Retry-After when it sent one
+                    delay = getattr(e, 'delay', None)
+                    if delay is None:
+                        delay = _backoff_delay(attempt)
+                    elif delay > MAX_RETRY_AFTER:
+                        logger.error(f"{feed_url} asked to retry after {delay:.0f} seconds, giving up")
+                        raise
+                    logger.info(f"Retrying in {delay:.1f} seconds...")
                     await asyncio.sleep(delay)
                 else:
                     logger.error(f"All retry attempts failed for {feed_url}")
                     raise
     
-    async def _fetch_and_parse_feed(self, feed_url):
-        """Fetch and parse a feed from its URL."""
+    async def _fetch_and_parse_feed(self, feed_url, etag=None, last_modified=None):
+        """Fetch and parse a feed from its URL.
+
+        With the validators from the previous response, the request is conditional and
+        NOT_MODIFIED is returned if the feed hasn't changed.
+        """
         try:
             # Select a random user agent
-            user_agent = random.choice(USER_AGENTS)
-            
-            headers = {
-                'User-Agent': user_agent,
-                'Accept': 'application/rss+xml, application/xml, text/xml, application/atom+xml, text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Cache-Control': 'max-age=0',
-                'TE': 'Trailers',
-            }
-            
-            async with self.session.get(feed_url, headers=headers, allow_redirects=True) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to fetch feed: {feed_url}, status: {response.status}")
-                    return None
-                
-                content = await response.text()
-                
-                # Special handling for different feed types or platforms
-                if 'openai.com' in feed_url and response.status == 403:
-                    # Try alternative OpenAI feed URL
-                    alternative_url = 'https://openai.com/news/rss.xml'
-                    if feed_url != alternative_url:
-                        logger.info(f"Trying alternative OpenAI feed URL: {alternative_url}")
-                        return await self._fetch_and_parse_feed(alternative_url)
-                
-                # Parse with feedparser
-                feed_data = feedparser.parse(content)
-                
-                if feed_data.bozo and feed_data.get('bozo_exception') is not None:
-                    logger.warning(f"Feed parsing error for {feed_url}: {feed_data.bozo_exception}")
-                    # Try to continue anyway if there are entries
-                    if not feed_data.entries:
-                        raise Exception(f"No entries found in feed with parsing error: {feed_data.bozo_exception}")
-                
-                return feed_data
+            headers = random.choice(FEED_HEADER_VARIANTS)
+            if etag or last_modified:
+                headers = headers.copy()
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            
+            async with self.host_limiters[urlparse(feed_url).netloc]:
+                response = await self.session.get(feed_url, headers=headers)
+            if response.status_code == 304:
+                return NOT_MODIFIED
+            if response.status_code in (429, 503):
+                raise RetryableError(
+                    f"{feed_url} returned {response.status_code}",
+                    delay=_parse_retry_after(response.headers.get('Retry-After'))
+                )
+            if response.status_code != 200:
+                logger.error(f"Failed to fetch feed: {feed_url}, status: {response.status_code}")
+                return None
+            
+            # Keep the raw bytes: feedparser works out the encoding itself, so decoding
+            # to str here (with httpx's charset sniffing) would be a wasted pass and copy
+            content = response.content
+            # feedparser looks headers up by lowercase name, and resolves relative links
+            # against Content-Location; default that to the URL the feed came from
+            response_headers = {name.lower(): value for name, value in response.headers.items()}
+            response_headers.setdefault('content-location', str(response.url))
+            
+            # Special handling for different feed types or platforms
+            if 'openai.com' in feed_url and response.status_code == 403:
+                # Try alternative OpenAI feed URL
+                alternative_url = 'https://openai.com/news/rss.xml'
+                if feed_url != alternative_url:
+                    logger.info(f"Trying alternative OpenAI feed URL: {alternative_url}")
+                    return await self._fetch_and_parse_feed(alternative_url)
+            
+            # Parse in a worker thread so the event loop keeps driving the other feeds'
+            # fetches while this CPU-bound step runs
+            loop = asyncio.get_running_loop()
+            feed_data = await loop.run_in_executor(None, self._parse_feed, content, response_headers)
+            
+            # Validators for the next poll, under the keys feedparser uses for them
+            feed_data['etag'] = response.headers.get('ETag')
+            feed_data['modified'] = response.headers.get('Last-Modified')
+            
+            if feed_data.bozo and feed_data.get('bozo_exception') is not None:
+                logger.warning(f"Feed parsing error for {feed_url}: {feed_data.bozo_exception}")
+                # Try to continue anyway if there are entries
+                if not feed_data.entries:
+                    raise Exception(f"No entries found in feed with parsing error: {feed_data.bozo_exception}")
+            
+            return feed_data
                 
-        except asyncio.TimeoutError:
+        except RetryableError:
+            raise
+        except httpx.TimeoutException:
             logger.error(f"Timeout fetching feed: {feed_url}")
             return None
         except Exception as e:
             logger.error(f"Error fetching feed {feed_url}: {e}")
             return None
     
-    async def _process_entry(self, feed_id, entry):
-        """Process a single feed entry."""
-        guid = entry.get('id', entry.get('link', ''))
+    def _parse_feed(self, content, response_headers):
+        """Parse feed bytes, trying the lxml fast path before feedparser."""
+        # Plain RSS 2.0 and Atom go straight through lxml; anything else, or anything
+        # malformed, is left to feedparser's more forgiving parser
+        feed_data = (
+            self._parse_feed_fast(content, response_headers.get('content-location'))
+            if etree is not None else None
+        )
+        if feed_data is None:
+            feed_data = feedparser.parse(content, response_headers=response_headers)
+        return feed_data
+
+    @staticmethod
+    def _parse_feed_fast(content, base_url=None):
+        """Parse an RSS 2.0 or Atom feed with lxml, or return None to leave it to feedparser.
+
+        Entries carry the same keys feedparser would give for the fields poll_feed reads.
+        Links are resolved against xml:base and base_url, the feed's own URL.
+        """
+        entries = []
+        try:
+            items = etree.iterparse(
+                BytesIO(content), events=('end',), tag=('item', ATOM_NS + 'entry'),
+                resolve_entities=False, no_network=True
+            )
+            for _, element in items:
+                if element.tag == 'item':
+                    guid = element.find('guid')
+                    link = _child_text(element, 'link')
+                    # Like feedparser, a permalink guid stands in for a missing link
+                    if not link and guid is not None and guid.get('isPermaLink', 'true').lower() != 'false':
+                        link = (guid.text or '').strip()
+                    title = _child_text(element, 'title')
+                    # RSS doesn't say whether a title is HTML, so guess as feedparser does
+                    title_is_html = _FeedParserMixin.looks_like_html(title)
+                    entry = {
+                        'id': _child_text(element, 'guid'),
+                        # lxml's .base combines the xml:base of the item and its ancestors
+                        'link': urljoin(urljoin(base_url or '', element.base or ''), link) if link else '',
+                        'summary': _child_text(element, 'description'),
+                        'content': _child_text(element, RSS_CONTENT_ENCODED),
+                        'published': _child_text(element, 'pubDate') or _child_text(element, DC_DATE),
+                    }
+                else:
+                    link = next(
+                        (urljoin(urljoin(base_url or '', link.base or ''), link.get('href', ''))
+                         for link in element.iterfind(ATOM_NS + 'link')
+                         if link.get('rel', 'alternate') == 'alternate' and link.get('href')),
+                        ''
+                    )
+                    title_element = element.find(ATOM_NS + 'title')
+                    title = _child_text(element, ATOM_NS + 'title')
+                    title_is_html = title_element is not None and title_element.get('type') in ('html', 'xhtml')
+                    entry = {
+                        'id': _child_text(element, ATOM_NS + 'id'),
+                        'link': link,
+                        'summary': _child_text(element, ATOM_NS + 'summary'),
+                        'content': _child_text(element, ATOM_NS + 'content'),
+                        'published': _child_text(element, ATOM_NS + 'published'),
+                        'updated': _child_text(element, ATOM_NS + 'updated'),
+                    }
+                # HTML titles are sanitized like summaries and content; plain text ones are already unescaped
+                entry['title'] = _sanitize_html(title, 'utf-8', 'text/html') if title and title_is_html else title
+
+                # Free each item once it's read, so memory stays flat on long feeds
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+                # Like feedparser, leave out what the feed doesn't have
+                entry = {key: value for key, value in entry.items() if value}
+                for key in ('summary', 'content'):
+                    if key in entry:
+                        entry[key] = _sanitize_html(entry[key], 'utf-8', 'text/html')
+                if 'content' in entry:
+                    entry['content'] = [{'value': entry['content']}]
+                for key in ('published', 'updated'):
+                    if key in entry:
+                        parsed = _parse_feed_date(entry[key])
+                        if parsed:
+                            entry[key + '_parsed'] = parsed
+                entries.append(entry)
+        except etree.XMLSyntaxError:
+            return None
+
+        # RSS 1.0, RDF and other dialects have no plain <item>/<entry> elements
+        if not entries:
+            return None
+        return feedparser.FeedParserDict(bozo=False, entries=entries)
+
+    async def _process_entry(self, feed, article_id, entry):
+        """Extract the content for a newly added feed entry.
+
+        Returns the update for db.bulk_update_article_content.
+        """
         link = entry.get('link', '')
         title = entry.get('title', 'No Title')
-        published_date = self._get_published_date(entry)
-        
-        # Add basic article info to database
-        article_id = self.db.add_article(
-            feed_id=feed_id,
-            guid=guid,
-            link=link,
-            title=title,
-            published_date=published_date,
-            status="pending_content"
-        )
-        
-        if article_id is None:
-            # Article already exists
-            return
         
         # Extract content
-        content = await self._extract_content_with_retry(entry, link)
+        content = await self._extract_content_with_retry(entry, link, feed)
         
         if content:
             # Update with content
             status = "pending_llm" if self.config.get('store_content_level') != 'none' else "processed"
-            self.db.execute(
-                "UPDATE articles SET raw_content = ?, processing_status = ? WHERE id = ?",
-                (content, status, article_id)
-            )
-            logger.info(f"Updated article content for: {title}")
-        else:
-            # If we couldn't extract content, mark as error
-            self.db.execute(
-                "UPDATE articles SET processing_status = 'content_extraction_failed' WHERE id = ?",
-                (article_id,)
-            )
-            logger.warning(f"Failed to extract content for: {title}")
+            logger.info(f"Extracted article content for: {title}")
+            return {'id': article_id, 'raw_content': content, 'processing_status': status}
+        
+        # If we couldn't extract content, mark as error
+        logger.warning(f"Failed to extract content for: {title}")
+        return {'id': article_id, 'raw_content': None, 'processing_status': 'content_extraction_failed'}
     
-    async def _extract_content_with_retry(self, entry, link):
+    async def _extract_content_with_retry(self, entry, link, feed=None):
         """Extract content with retries."""
-        for attempt, delay in enumerate(self.retry_delays[:3]):  # Use fewer retries for content extraction
+        for attempt in range(3):  # Use fewer retries for content extraction
             try:
-                content = await self._extract_content(entry, link)
+                content = await self._extract_content(entry, link, feed)
                 if content and len(content) > 200:  # Ensure we got meaningful content
                     return content
                 # If content is too short, we'll retry with a different method
@@ -338,7 +675,7 @@ class FeedReader:
                 logger.warning(f"Content extraction attempt {attempt + 1} failed for {link}: {e}")
             
             if attempt < 2:  # Don't sleep after the last attempt
-                await asyncio.sleep(delay)
+                await asyncio.sleep(_backoff_delay(attempt))
         
         # Fall back to just using the feed summary if we couldn't extract full content
         summary = entry.get('summary', '')
@@ -348,8 +685,13 @@ class FeedReader:
         
         return entry.get('content', [{}])[0].get('value', '')
     
-    async def _extract_content(self, entry, link):
-        """Extract content from a feed entry or its linked page."""
+    async def _extract_content(self, entry, link, feed=None):
+        """Extract content from a feed entry or its linked page.
+
+        With the entry's feed, the page fetch is skipped when the feed's own content has
+        usually been as long as the page's, and feed['content_in_feed_ratio'] is updated
+        after each fetch.
+        """
         # First try to get content from the feed itself
         content = entry.get('content', [{}])[0].get('value', '')
         if not content:
@@ -357,11 +699,28 @@ class FeedReader:
         
         # If content is too short, try to fetch the full article
         if len(content) < 500 and link:
+            ratio = (feed.get('content_in_feed_ratio') or 0.0) if feed else 0.0
+            if content and ratio > CONTENT_IN_FEED_THRESHOLD and random.random() > CONTENT_IN_FEED_PROBE_RATE:
+                return content
+            
+            feed_content = content
+            page_content = ''
             try:
-                content = await self._fetch_article_content(link)
+                page_content = await self._fetch_article_content(link)
             except Exception as e:
                 logger.error(f"Error fetching article content from {link}: {e}")
-                # If we can't fetch the article, use what we have from the feed
+            
+            # If we can't fetch the article, use what we have from the feed; a failed
+            # fetch says nothing about the feed's content, so it leaves the ratio alone
+            if not page_content:
+                return feed_content
+            content = page_content
+            
+            if feed is not None:
+                feed_sufficed = len(content) <= len(feed_content)
+                # Re-read the ratio: the feed's other entries update it while this one fetches
+                ratio = feed.get('content_in_feed_ratio') or 0.0
+                feed['content_in_feed_ratio'] = 0.9 * ratio + 0.1 * feed_sufficed
         
         return content
     
@@ -369,94 +728,92 @@ class FeedReader:
         """Fetch and extract the main content from an article URL."""
         try:
             # Select a random user agent for this request
-            user_agent = random.choice(USER_AGENTS)
-            
-            headers = {
-                'User-Agent': user_agent,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Cache-Control': 'max-age=0',
-                'Referer': 'https://www.google.com/',  # Pretend we came from Google
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'cross-site',
-                'Sec-Fetch-User': '?1',
-                'TE': 'Trailers',
-            }
-            
-            # Add some randomization to seem more human-like
-            if random.random() > 0.5:
-                headers['DNT'] = '1'
+            headers = random.choice(ARTICLE_HEADER_VARIANTS)
             
             # Parse domain for special handling
             domain = urlparse(url).netloc
             
             # Special handling for known problematic sites
             if 'machinelearningmastery.com' in domain:
+                headers = headers.copy()
                 headers['Referer'] = 'https://machinelearningmastery.com/'
                 # Add some cookies that might help
                 headers['Cookie'] = 'wordpress_gdpr_allowed_services=a:1:{i:0;s:9:"wordpress";}; _ga=GA1.2.123456789.1620000000'
             elif 'openai.com' in domain:
+                headers = headers.copy()
                 headers['Referer'] = 'https://openai.com/'
             
-            await asyncio.sleep(random.uniform(1.0, 2.0))  # Random delay before request
+            async with self.host_limiters[domain]:
+                response = await self.session.get(url, headers=headers, timeout=30)
+            if response.status_code != 200:
+                logger.error(f"Failed to fetch article: {url}, status: {response.status_code}")
+                return ""
             
-            async with self.session.get(url, headers=headers, allow_redirects=True, timeout=30) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to fetch article: {url}, status: {response.status}")
-                    return ""
-                
-                html = await response.text()
-                
-                # Parse with BeautifulSoup
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Remove script, style, and navigation elements
-                for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe', 'noscript']):
-                    element.decompose()
-                
-                # Extract main content using multiple strategies
-                main_content = self._extract_content_from_html(soup, url)
-                
-                # Clean up the text
-                main_content = re.sub(r'\s+', ' ', main_content).strip()
-                
-                return main_content
+            # Raw bytes; selectolax and BeautifulSoup detect the charset themselves.
+            # Like feeds, pages are parsed in a worker thread.
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._extract_article_text, response.content, url)
                 
         except Exception as e:
             logger.error(f"Error extracting content from {url}: {e}")
             return ""
     
-    def _extract_content_from_html(self, soup, url):
-        """Extract content using multiple strategies."""
-        domain = urlparse(url).netloc
+    def _extract_article_text(self, html, url):
+        """Parse an article page and return its main text with whitespace collapsed."""
+        if HTMLParser is not None:
+            # Parse and query in C with selectolax
+            tree = HTMLParser(html)
+            tree.strip_tags(NON_CONTENT_TAGS)
+            main_content = self._extract_content_from_tree(tree, url)
+        else:
+            # Parse with BeautifulSoup
+            soup = BeautifulSoup(html, HTML_PARSER)
+            
+            # Remove script, style, and navigation elements
+            for element in soup(NON_CONTENT_TAGS):
+                element.decompose()
+            
+            # Extract main content using multiple strategies
+            main_content = self._extract_content_from_html(soup, url)
         
+        # Clean up the text
+        return ' '.join(main_content.split())
+    
+    def _extract_content_from_tree(self, tree, url):
+        """Extract content from a selectolax tree, with the same strategies as _extract_content_from_html."""
         # Strategy 1: Look for common content containers
-        content_selectors = [
-            'article', '.article', '.post', '.content', 'main', '#content', '#main',
-            '.post-content', '.entry-content', '.article-content', '.post-body',
-            '[itemprop="articleBody"]', '.blog-post', '.blog-content'
-        ]
+        for selector in _content_selectors(urlparse(url).hostname or ''):
+            content_candidates = tree.css(selector)
+            if content_candidates:
+                # Use the largest content container
+                main_content = max((node.text() for node in content_candidates), key=len)
+                if len(main_content) > 200:  # Only use if it has substantial content
+                    return main_content
         
-        # Add domain-specific selectors
-        if 'machinelearningmastery.com' in domain:
-            content_selectors.extend(['.entry', '.post-content', '.entry-content'])
-        elif 'openai.com' in domain:
-            content_selectors.extend(['.post-content', '.research-paper'])
-        elif 'ai.googleblog.com' in domain:
-            content_selectors.extend(['.post-body', '.post'])
-        elif 'arxiv.org' in domain:
-            content_selectors.extend(['#abs', '.abstract'])
+        # Strategy 2: Look for largest <p> tag collection
+        p_text = ' '.join(p.text() for p in tree.css('p'))
+        if len(p_text) > 200:
+            return p_text
+        
+        # Strategy 3: Fall back to body text
+        body_text = tree.body.text() if tree.body else ""
+        
+        # If body text is very large, try to extract only the middle portion
+        if len(body_text) > 10000:
+            start = len(body_text) // 4
+            end = 3 * len(body_text) // 4
+            return body_text[start:end]
         
-        # Try all selectors
-        for selector in content_selectors:
-            content_candidates = soup.select(selector)
+        return body_text
+    
+    def _extract_content_from_html(self, soup, url):
+        """Extract content using multiple strategies."""
+        # Strategy 1: Look for common content containers
+        for selector in _content_selectors(urlparse(url).hostname or ''):
+            content_candidates = COMPILED_SELECTORS[selector].select(soup)
             if content_candidates:
                 # Use the largest content container
-                main_content = max(content_candidates, key=lambda x: len(x.get_text())).get_text()
+                main_content = max((node.get_text() for node in content_candidates), key=len)
                 if len(main_content) > 200:  # Only use if it has substantial content
                     return main_content
         
@@ -487,35 +844,25 @@ class FeedReader:
             if date_tuple:
                 return time.strftime('%Y-%m-%dT%H:%M:%SZ', date_tuple)
         
-        # If no parsed date found, try string fields
+        # If no parsed date found, try string fields: one ISO 8601 or RFC 822 parse each,
+        # rather than raising through a list of strptime formats
         for date_field in ['published', 'updated', 'created']:
             date_str = entry.get(date_field)
             if date_str:
+                date_tuple = _parse_feed_date(date_str)
+                if date_tuple:
+                    return time.strftime('%Y-%m-%dT%H:%M:%SZ', date_tuple)
                 try:
-                    # Try different date formats
-                    for date_format in [
-                        '%a, %d %b %Y %H:%M:%S %z',
-                        '%a, %d %b %Y %H:%M:%S %Z',
-                        '%Y-%m-%dT%H:%M:%SZ',
-                        '%Y-%m-%dT%H:%M:%S%z',
-                        '%Y-%m-%dT%H:%M:%S.%f%z',
-                        '%Y-%m-%d %H:%M:%S',
-                        '%d %b %Y %H:%M:%S %z',
-                        '%d %b %Y'
-                    ]:
-                        try:
-                            dt = datetime.strptime(date_str, date_format)
-                            return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
-                        except ValueError:
-                            continue
-                except (ValueError, TypeError):
+                    # Bare dates like "10 Jun 2025"
+                    return datetime.strptime(date_str, '%d %b %Y').strftime('%Y-%m-%dT%H:%M:%SZ')
+                except ValueError:
                     pass
         
         # Default to current time
         return datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ')
     
     async def close(self):
-        """Close the aiohttp session."""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Close the HTTP client and its connection pool."""
+        if self.session and not self.session.is_closed:
+            await self.session.aclose()
             logger.info("HTTP session closed")
\ No newline at end of file
@@ -0,0 +1,55 @@
+# gunicorn.conf.py - Production server settings
+#
+# Run with: gunicorn app:app
+#
+# The app is loaded once in the master and forked into threaded workers. Every
+# worker runs its own asyncio loop for on-demand jobs, but only one of them
+# (elected with a lock file) runs the periodic feed polling, LLM processing and
+# ArXiv extraction tasks.
+
+import fcntl
+import os
+
+bind = os.environ.get('BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = 8
+worker_class = 'gthread'
+preload_app = True
+timeout = 30
+keepalive = 5
+
+# Tell app.py not to start the background thread while the master imports it
+raw_env = ['APP_WORKER_MAIN=0']
+
+BACKGROUND_LOCK_PATH = os.path.join('instance', 'background.lock')
+
+# Held open for the worker's lifetime; the lock is released when the worker exits
+background_lock_file = None
+
+
+def pre_fork(server, worker):
+    """Close the master's database connection so it isn't shared with the worker."""
+    import app
+    app.db.close()
+
+
+def post_fork(server, worker):
+    """Start the worker's event loop, running the background tasks if this worker wins the lock."""
+    global background_lock_file
+    import app
+
+    lock_file = open(BACKGROUND_LOCK_PATH, 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        background_lock_file = lock_file
+        server.log.info(f"Worker {worker.pid} runs the background tasks")
+    except OSError:
+        lock_file.close()
+
+    app.start_background_thread(with_background_tasks=background_lock_file is not None)
+
+
+def worker_exit(server, worker):
+    """Stop the worker's event loop and close its connections."""
+    import app
+    app.shutdown_handler(None, None)
@@ -2,9 +2,13 @@ import os
 import json
 import asyncio
 import logging
+import re
 import time
-from datetime import datetime
+from collections import deque
+from functools import partial
+from cachetools import TTLCache
 import hashlib
+import random
 
 # Set up logging
 logging.basicConfig(
@@ -13,6 +17,233 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Hash cache keys with BLAKE3 when it's installed, falling back to hashlib's BLAKE2
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+# Serialize cached results, cache keys and batch files with orjson when it's installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Truncate prompts by actual tokens when tiktoken is installed, else by a character estimate
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Bump when the way results are derived from responses changes; changes to the
+# requests themselves already produce new cache keys
+CACHE_SCHEMA_VERSION = 1
+
+# Section names whose presence marks content as a full paper rather than an abstract
+PAPER_SECTIONS_RE = re.compile(r'introduction|methodology|results|conclusion|references', re.IGNORECASE)
+
+# Instructions go in the system message and only the article in the user message, so
+# every request starts with the same text (OpenAI caches repeated prompt prefixes)
+SUMMARY_KEYWORDS_SYSTEM_PROMPT = (
+    "You are a helpful assistant that summarizes AI and machine learning content and extracts its keywords. "
+    "You reply with JSON.\n\n"
+    "Summarize the text you are given, focusing on its key findings or announcements related to AI/ML, "
+    "in approximately 3-5 sentences, and extract the 5 most important keywords or phrases from it "
+    "related to AI/ML.\n\n"
+    'Return JSON: {"summary": "...", "keywords": ["...", "..."]}'
+)
+
+DEEP_SUMMARY_SYSTEM_PROMPT = "You are an expert AI researcher who provides comprehensive analysis of technical papers and articles. Provide structured, detailed summaries that help researchers understand the key contributions and significance of the work. Use clear formatting with headers and bullet points where appropriate."
+
+FULL_PAPER_PROMPT = """Please provide a comprehensive analysis of this research paper. Structure your analysis with these sections:
+
+**🎯 Main Contribution**
+What is the primary contribution, innovation, or finding of this work?
+
+**🔬 Methodology**
+What approaches, methods, or techniques were used? Include key algorithms, datasets, or experimental setup.
+
+**📊 Key Results**
+What were the most important quantitative and qualitative results? Include specific metrics, comparisons, or findings.
+
+**💡 Significance**
+Why is this work important to the field? What problems does it solve or advance?
+
+**⚠️ Limitations**
+What are the acknowledged limitations, assumptions, or areas for improvement?
+
+**🔮 Future Work**
+What future research directions or applications are suggested?
+
+**🏷️ Technical Keywords**
+List 5-7 key technical terms or concepts that researchers would search for.
+
+Provide a thorough but concise analysis that would help researchers quickly understand the paper's value and relevance."""
+
+ABSTRACT_PROMPT = """Please provide a comprehensive analysis and summary of this research paper/article. Include:
+
+1. **Main Contribution**: What is the primary contribution or finding?
+2. **Methodology**: What approach or methods were used?
+3. **Key Results**: What were the most important results or findings?
+4. **Significance**: Why is this work important to the AI/ML field?
+5. **Limitations**: What are the acknowledged limitations or areas for improvement?
+6. **Future Work**: What future research directions are suggested?
+
+Please structure your response clearly with the above sections and provide a thorough but concise analysis."""
+
+FULL_PAPER_SYSTEM_PROMPT = f"{DEEP_SUMMARY_SYSTEM_PROMPT}\n\n{FULL_PAPER_PROMPT}"
+ABSTRACT_SYSTEM_PROMPT = f"{DEEP_SUMMARY_SYSTEM_PROMPT}\n\n{ABSTRACT_PROMPT}"
+
+def _json_dumps(obj, sort_keys=False):
+    """Serialize obj to compact JSON bytes, the same with or without orjson."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False).encode()
+
+def _json_loads(data):
+    """Parse JSON from str or bytes."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Network failures (including timeouts) are worth retrying; OpenAI is an optional import
+try:
+    from openai import APIConnectionError
+    TRANSIENT_ERRORS = (APIConnectionError,)
+except ImportError:
+    TRANSIENT_ERRORS = ()
+
+# HTTP statuses that mean the API is rate limiting or briefly unavailable
+TRANSIENT_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# Attempts per API call; retries wait about 1, 2, 4, 8 seconds (with jitter, at most 60)
+API_MAX_ATTEMPTS = 5
+API_MAX_RETRY_DELAY = 60
+
+# Completion tokens allowed beyond summary_max_tokens for the keywords and the JSON
+# around them; only tokens actually generated are billed
+SUMMARY_KEYWORDS_TOKEN_HEADROOM = 300
+
+# Finished article results are saved together in groups of up to this many
+RESULT_SAVE_BATCH = 20
+
+# A deep-summary backlog larger than the batch_api_threshold setting goes through the
+# OpenAI Batch API (half price, separate quota, results within 24 hours) in batches of
+# up to BATCH_MAX_REQUESTS; finished batches are checked for every BATCH_POLL_INTERVAL seconds
+BATCH_MAX_REQUESTS = 500
+BATCH_POLL_INTERVAL = 300
+BATCH_PENDING_STATUSES = {'validating', 'in_progress', 'finalizing', 'cancelling'}
+
+def _is_transient(error):
+    """Return whether an API error is worth retrying."""
+    return (
+        isinstance(error, TRANSIENT_ERRORS)
+        or getattr(error, 'status_code', None) in TRANSIENT_STATUSES
+        or 'rate limit' in str(error).lower()
+    )
+
+# OpenAI reset headers look like "1s", "6m0s" or "20ms"
+RESET_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+RESET_UNIT_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+def _parse_reset_duration(value):
+    """Parse an x-ratelimit-reset-* header into seconds, or None."""
+    if not value:
+        return None
+    parts = RESET_DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * RESET_UNIT_SECONDS[unit] for amount, unit in parts)
+
+class ApiRateLimiter:
+    """Sliding-window limiter for requests and tokens per minute.
+
+    Callers await wait() with their estimated token count before each request, and
+    pass the response headers to update() so the limiter also backs off when the
+    API reports its quota is used up.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm, tpm):
+        """Initialize the limiter with requests and tokens per minute."""
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = deque()  # (timestamp, tokens) per request in the window
+        self._tokens = 0
+        self._blocked_until = 0.0
+
+    async def wait(self, tokens):
+        """Wait until a request of about `tokens` tokens fits in both limits, then record it."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            while self._requests and self._requests[0][0] <= now - self.WINDOW:
+                self._tokens -= self._requests.popleft()[1]
+
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+            elif self._requests and (len(self._requests) >= self.rpm or self._tokens + tokens > self.tpm):
+                # Wait for the oldest request to leave the window
+                delay = self._requests[0][0] + self.WINDOW - now
+            else:
+                self._requests.append((now, tokens))
+                self._tokens += tokens
+                return
+            await asyncio.sleep(delay)
+
+    def update(self, headers):
+        """Pause new requests until the reset time when the API says a quota is used up."""
+        for kind in ('requests', 'tokens'):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            reset = _parse_reset_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+            if remaining is not None and reset is not None and remaining.isdigit() and int(remaining) == 0:
+                until = asyncio.get_running_loop().time() + reset
+                self._blocked_until = max(self._blocked_until, until)
+
+class AdaptiveSemaphore:
+    """Async context manager admitting up to int(limit) holders at once.
+
+    The limit adapts to the API (additive increase, multiplicative decrease): it grows
+    by 0.5 per call while the mean latency of recent calls is within target_latency,
+    and halves when it isn't or when the API reports overload.
+    """
+
+    def __init__(self, minimum, maximum, target_latency=4.0, window=50):
+        """Initialize the semaphore halfway between minimum and maximum."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.limit = float(max(minimum, (minimum + maximum) // 2))
+        self._latencies = deque(maxlen=window)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+        return False
+
+    def record(self, latency):
+        """Adjust the limit for a successful call that took latency seconds."""
+        self._latencies.append(latency)
+        if sum(self._latencies) / len(self._latencies) <= self.target_latency:
+            self.limit = min(self.maximum, self.limit + 0.5)
+        # Judge a decrease on a few samples, and only once per set of them
+        elif len(self._latencies) >= 10:
+            self.backoff()
+
+    def backoff(self):
+        """Halve the limit, e.g. after a 429 or 5xx."""
+        self.limit = max(self.minimum, self.limit * 0.5)
+        self._latencies.clear()
+
 class LLMProcessor:
     def __init__(self, database, config):
         """Initialize the LLM processor with database and config objects."""
@@ -21,20 +252,45 @@ class LLMProcessor:
         self.api_key = config.api_key
         self.model = config.get('openai_model', 'gpt-4o')
         self.summary_max_tokens = config.get('summary_max_tokens', 150)
-
-        # Create cache directory
-        self.cache_dir = os.path.join('instance', 'llm_cache')
-        os.makedirs(self.cache_dir, exist_ok=True)
+        # Articles taken per scan; their API calls run concurrently, between
+        # llm_min_concurrency and llm_max_concurrency at a time depending on how the API
+        # is keeping up (the semaphore's condition binds to the loop on first use)
+        self.batch_size = config.get('llm_batch_size', 100)
+        self.api_semaphore = AdaptiveSemaphore(
+            config.get('llm_min_concurrency', 2), config.get('llm_max_concurrency', 20)
+        )
+        # Keep under the account's rate limits up front instead of retrying after 429s
+        self.rate_limiter = ApiRateLimiter(config.get('llm_rpm', 500), config.get('llm_tpm', 30000))
+        self.use_batch_api = config.get('use_batch_api', True)
+        self.batch_api_threshold = config.get('batch_api_threshold', 50)
+        self._last_batch_check = None
+        # Cached responses older than this are fetched again
+        self.cache_ttl_days = config.get('llm_cache_ttl_days', 30)
+        # Recent cache entries in memory, in front of the llm_cache table
+        self._memory_cache = TTLCache(maxsize=10000, ttl=3600)
+        self.encoding = self._get_encoding()
 
         # Initialize OpenAI client - with proper error handling
         # Import OpenAI here to handle import errors gracefully
         try:
+            import httpx
             from openai import AsyncOpenAI
 
             if self.api_key:
                 os.environ["OPENAI_API_KEY"] = self.api_key  # Set environment variable
                 try:
-                    self.client = AsyncOpenAI()  # Use environment variable for authentication
+                    # One HTTP/2 connection pool for every call: concurrent requests are multiplexed
+                    # over a few kept-alive connections instead of each opening its own
+                    max_concurrency = config.get('llm_max_concurrency', 20)
+                    request_timeout = config.get('llm_request_timeout', 60)
+                    http_client = httpx.AsyncClient(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+                        timeout=httpx.Timeout(request_timeout, connect=10)
+                    )
+                    # Use environment variable for authentication; _create_completion does its own retries.
+                    # A call that hangs times out (and is retried) instead of holding its slot for minutes
+                    self.client = AsyncOpenAI(max_retries=0, timeout=request_timeout, http_client=http_client)
                     logger.info("OpenAI client initialized successfully")
                 except Exception as e:
                     logger.error(f"Error initializing OpenAI client: {e}")
@@ -50,9 +306,16 @@ class LLMProcessor:
 
         # Processing state
         self.processing = False
+        # Set to wake the idle processing loop; created inside the running loop
+        self._kick = None
 
     async def start_processing(self):
-        """Start processing articles that need LLM processing."""
+        """Start processing articles that need LLM processing.
+
+        This loop feeds pending articles and deep summaries into a queue, skipping those
+        already queued or in progress, while workers take them off it. New work is
+        fetched as soon as there's room for it instead of after a whole round finishes.
+        """
         if not self.api_key or not self.client:
             logger.error("OpenAI API key not set or client initialization failed. LLM processing disabled.")
             return
@@ -62,51 +325,78 @@ class LLMProcessor:
             return
 
         self.processing = True
+        self._kick = asyncio.Event()
+        # Bounded, so fetching waits while the workers are behind
+        work_queue = asyncio.Queue(maxsize=self.batch_size)
+        # (kind, article ID) of work queued, in progress or with results not yet saved
+        self._in_flight = set()
+        self._article_results = []
+        # Articles queued or being processed, so the last one to finish saves the results
+        self._articles_outstanding = 0
+        # api_semaphore decides how many of the workers' API calls actually run at once
+        workers = [
+            asyncio.create_task(self._process_queue(work_queue))
+            for _ in range(self.config.get('llm_max_concurrency', 20))
+        ]
 
         try:
             while self.processing:
-                # Process regular articles (existing functionality)
-                cursor = self.db.execute(
-                    "SELECT id, title, raw_content FROM articles WHERE processing_status = 'pending_llm' LIMIT 5"
-                )
-                regular_articles = cursor.fetchall()
-
-                # Process deep summaries
-                deep_summary_articles = self.db.get_articles_for_deep_summary(limit=5)
-
-                if not regular_articles and not deep_summary_articles:
-                    logger.info("No pending articles for LLM processing")
-                    await asyncio.sleep(60)
+                # Any wake-up requested before this scan is covered by it
+                self._kick.clear()
+
+                # Summaries are saved through the write queue; apply them before
+                # looking for pending articles so none is picked up twice. Waiting for
+                # the writer blocks, so it happens in a worker thread
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.db.flush_writes)
+
+                # Process deep summaries, handing a large backlog to the Batch API
+                # instead of the synchronous loop
+                deep_summary_limit = self.batch_size
+                if self.use_batch_api:
+                    await self._check_deep_summary_batches()
+                    if self.db.count_articles_for_deep_summary() > self.batch_api_threshold:
+                        try:
+                            await self._submit_deep_summary_batch([
+                                article for article in self.db.get_articles_for_deep_summary(
+                                    limit=BATCH_MAX_REQUESTS + len(self._in_flight)
+                                )
+                                if ('deep_summary', article['id']) not in self._in_flight
+                            ][:BATCH_MAX_REQUESTS])
+                            deep_summary_limit = 0
+                        except Exception as e:
+                            logger.error(f"Error submitting deep summary batch, processing directly: {e}")
+
+                # Regular articles and deep summaries in one query; in-flight ones are
+                # still pending, so fetch enough rows to get past them
+                pending_work = [
+                    item for item in self.db.get_pending_llm_work(
+                        self.batch_size + len(self._in_flight),
+                        deep_summary_limit + len(self._in_flight) if deep_summary_limit else 0
+                    )
+                    if (item['kind'], item['id']) not in self._in_flight
+                ]
+
+                if not pending_work:
+                    if not self._in_flight:
+                        logger.info("No pending articles for LLM processing")
+                    # Nothing to queue; save any results still waiting before sleeping
+                    await self._save_article_results()
+                    # Sleep until kick() signals new work (the feed reader calls it after
+                    # storing articles); the timeout is only a safety net
+                    try:
+                        await asyncio.wait_for(self._kick.wait(), timeout=60)
+                    except asyncio.TimeoutError:
+                        pass
                     continue
 
-                # Process regular articles
-                if regular_articles:
-                    tasks = []
-                    for article in regular_articles:
-                        task = asyncio.create_task(self.process_article(article))
-                        tasks.append(task)
-
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                    for result in results:
-                        if isinstance(result, Exception):
-                            logger.error(f"Error in regular LLM processing: {result}")
-
-                # Process deep summaries
-                if deep_summary_articles:
-                    tasks = []
-                    for article in deep_summary_articles:
-                        task = asyncio.create_task(self.process_deep_summary(article))
-                        tasks.append(task)
-
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                    for result in results:
-                        if isinstance(result, Exception):
-                            logger.error(f"Error in deep summary processing: {result}")
-
-                # Brief pause to avoid tight loop
-                await asyncio.sleep(2)
+                # Queue regular articles and deep summaries together; this waits whenever
+                # the queue is full
+                for item in pending_work:
+                    self._in_flight.add((item['kind'], item['id']))
+                    if item['kind'] == 'article':
+                        self._articles_outstanding += 1
+                    await work_queue.put((item['kind'], item))
 
         except asyncio.CancelledError:
             logger.info("LLM processing task cancelled")
@@ -115,17 +405,79 @@ class LLMProcessor:
             logger.error(f"Error in LLM processing loop: {e}")
             self.processing = False
             raise
+        finally:
+            for worker in workers:
+                worker.cancel()
+            # Don't drop results that finished before the stop
+            await self._save_article_results()
+
+    async def _process_queue(self, work_queue):
+        """Worker: process queued articles and deep summaries until cancelled."""
+        while True:
+            kind, article = await work_queue.get()
+            try:
+                if kind == 'article':
+                    try:
+                        result = await self.process_article(article)
+                    finally:
+                        self._articles_outstanding -= 1
+                    if result is not None:
+                        self._article_results.append(result)
+                    else:
+                        self._in_flight.discard((kind, article['id']))
+                    # Save results in groups; the last queued article to finish saves
+                    # whatever is left, even if deep summaries are still queued
+                    if len(self._article_results) >= RESULT_SAVE_BATCH or self._articles_outstanding == 0:
+                        await self._save_article_results()
+                else:
+                    try:
+                        await self.process_deep_summary(article)
+                    finally:
+                        self._in_flight.discard((kind, article['id']))
+            except Exception as e:
+                kind_name = "regular LLM processing" if kind == 'article' else "deep summary processing"
+                logger.error(f"Error in {kind_name}: {e}")
+            finally:
+                work_queue.task_done()
+
+    async def _save_article_results(self):
+        """Save the collected article results in one transaction, then release their articles."""
+        results, self._article_results = self._article_results, []
+        if not results:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.db.bulk_save_llm_results, results)
+        finally:
+            # Saved articles are no longer pending; unsaved ones are retried on a later scan
+            for result in results:
+                self._in_flight.discard(('article', result['id']))
+
+    def kick(self):
+        """Wake the processing loop so pending articles are picked up immediately."""
+        if self._kick:
+            self._kick.set()
 
     def stop_processing(self):
         """Stop the LLM processing loop."""
         self.processing = False
         logger.info("LLM processing stopped")
 
+    async def close(self):
+        """Close the OpenAI client and its connection pool."""
+        if self.client:
+            await self.client.close()
+            logger.info("OpenAI client closed")
+
     async def process_article(self, article):
-        """Process a single article with LLM for summary and keywords."""
+        """Process a single article with LLM for summary and keywords.
+
+        Returns:
+            Dict for bulk_save_llm_results, or None if the article couldn't be processed
+        """
         if not self.client:
             logger.error("OpenAI client not available, cannot process article")
-            return
+            return None
 
         article_id = article['id']
         title = article['title']
@@ -133,161 +485,170 @@ class LLMProcessor:
 
         if not content or len(content) < 100:
             logger.warning(f"Article content too short for processing: {article_id}")
-            self.db.execute(
-                "UPDATE articles SET processing_status = 'insufficient_content' WHERE id = ?",
-                (article_id,)
-            )
-            return
+            return {'id': article_id, 'processing_status': 'insufficient_content'}
 
         try:
-            # Generate summary
-            summary = await self._generate_summary(title, content)
-
-            # Extract keywords
-            keywords = await self._extract_keywords(title, content)
-
-            # Update article with summary
-            self.db.update_article_summary(article_id, summary, self.model)
-
-            # Add keywords
-            if keywords:
-                self.db.add_keywords_to_article(article_id, keywords)
-
+            # Generate summary and keywords in one request
+            summary, keywords = await self._generate_summary_and_keywords(title, content)
             logger.info(f"Successfully processed article: {title}")
+            return {
+                'id': article_id, 'processing_status': 'processed',
+                'summary': summary, 'keywords': keywords, 'model': self.model
+            }
 
         except Exception as e:
             logger.error(f"Error processing article {article_id}: {e}")
-            self.db.execute(
-                "UPDATE articles SET processing_status = 'llm_error' WHERE id = ?",
-                (article_id,)
-            )
-            raise
+            return {'id': article_id, 'processing_status': 'llm_error'}
 
-    async def _generate_summary(self, title, content):
-        """Generate a summary of the article content using LLM."""
+    async def _generate_summary_and_keywords(self, title, content):
+        """Generate a summary and keywords for the article content with a single LLM call."""
         if not self.client:
-            return "LLM processing unavailable"
+            return "LLM processing unavailable", ["LLM unavailable"]
 
         # Prepare text for summarization
         text_to_summarize = f"Title: {title}\n\nContent: {self._truncate_text(content, 6000)}"
 
-        # Check cache first
-        cache_key = self._get_cache_key(text_to_summarize, "summary")
-        cached_result = self._check_cache(cache_key)
-        if cached_result:
-            logger.info("Using cached summary")
-            return cached_result
-
-        # Create prompt for summarization
-        prompt = f"Summarize the following text, focusing on its key findings or announcements related to AI/ML, in approximately 3-5 sentences:\n\n{text_to_summarize}"
-
-        # Call OpenAI API
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that summarizes AI and machine learning content."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.summary_max_tokens,
-                temperature=0.3
-            )
-
-            summary = response.choices[0].message.content.strip()
-
-            # Cache the result
-            self._cache_result(cache_key, summary)
-
-            return summary
-
-        except Exception as e:
-            logger.error(f"Error generating summary: {e}")
-            # Implement exponential backoff retry logic here if needed
-            return f"Error generating summary: {str(e)[:100]}..."
-
-    async def _extract_keywords(self, title, content):
-        """Extract keywords from the article content using LLM."""
-        if not self.client:
-            return ["LLM unavailable"]
-
-        # Prepare text for keyword extraction
-        text_for_keywords = f"Title: {title}\n\nContent: {self._truncate_text(content, 4000)}"
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SUMMARY_KEYWORDS_SYSTEM_PROMPT},
+                {"role": "user", "content": text_to_summarize}
+            ],
+            "max_tokens": self.summary_max_tokens + SUMMARY_KEYWORDS_TOKEN_HEADROOM,
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
+        }
 
         # Check cache first
-        cache_key = self._get_cache_key(text_for_keywords, "keywords")
-        cached_result = self._check_cache(cache_key)
+        cache_key = self._get_cache_key(request, "summary_keywords")
+        cached_result = await self._check_cache(cache_key)
         if cached_result:
-            logger.info("Using cached keywords")
-            return cached_result.split(', ')
-
-        # Create prompt for keyword extraction
-        prompt = f"Extract the 5 most important keywords or phrases from the following text related to AI/ML. Return only a comma-separated list of keywords:\n\n{text_for_keywords}"
-
-        # Call OpenAI API
+            logger.info("Using cached summary and keywords")
+            cached = _json_loads(cached_result['result'])
+            return cached['summary'], cached['keywords']
+
+        # Call OpenAI API; errors propagate so the article is marked llm_error, not
+        # stored (or cached) with an error message as its summary
+        response = await self._create_completion(**request)
+
+        # A reply cut off at max_tokens is incomplete JSON
+        choice = response.choices[0]
+        if choice.finish_reason == 'length':
+            raise ValueError("Summary response was cut off at max_tokens")
+
+        result = _json_loads(choice.message.content)
+        if not isinstance(result, dict):
+            raise ValueError("Summary response is not a JSON object")
+        summary = str(result.get('summary', '')).strip()
+        if not summary:
+            raise ValueError("Summary response has no summary")
+
+        # Clean up the response and extract keywords
+        keywords = result.get('keywords') or []
+        if not isinstance(keywords, list):
+            keywords = [keywords]
+        keywords = [str(k).strip() for k in keywords]
+        keywords = [k for k in keywords if k]
+
+        # Cache the result
+        self._cache_result(cache_key, _json_dumps({'summary': summary, 'keywords': keywords}).decode(), response.usage)
+
+        return summary, keywords
+
+    async def _create_completion(self, **kwargs):
+        """Call the chat completions API within the rate limits and a free api_semaphore slot.
+
+        Transient errors (rate limits, 5xx, network) are retried with jittered exponential
+        backoff. Each call's latency, or overload error, feeds back into the semaphore's limit.
+        """
+        # Rough approximation: 1 token ≈ 4 characters, plus the whole completion budget
+        tokens = sum(len(message['content']) for message in kwargs['messages']) // 4 + kwargs.get('max_tokens', 0)
+        for attempt in range(API_MAX_ATTEMPTS):
+            try:
+                async with self.api_semaphore:
+                    await self.rate_limiter.wait(tokens)
+                    start = time.monotonic()
+                    try:
+                        raw_response = await self.client.chat.completions.with_raw_response.create(**kwargs)
+                    except Exception as e:
+                        # Rate limited or overloaded: fewer calls in flight
+                        if _is_transient(e):
+                            self.api_semaphore.backoff()
+                        raise
+                    self.api_semaphore.record(time.monotonic() - start)
+                    self.rate_limiter.update(raw_response.headers)
+                    return raw_response.parse()
+            except Exception as e:
+                if not _is_transient(e) or attempt == API_MAX_ATTEMPTS - 1:
+                    raise
+                # Sleep outside the semaphore so other calls can use the slot
+                delay = min(API_MAX_RETRY_DELAY, 2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"OpenAI call attempt {attempt + 1} failed ({e}), retrying in {delay:.1f} seconds")
+                await asyncio.sleep(delay)
+
+    def _get_encoding(self):
+        """Return the tiktoken encoding for the model, or None without tiktoken."""
+        if tiktoken is None:
+            return None
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts keywords from AI and machine learning content."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.3
-            )
-
-            keywords_text = response.choices[0].message.content.strip()
-
-            # Clean up the response and extract keywords
-            keywords = [k.strip() for k in keywords_text.split(',')]
-            keywords = [k for k in keywords if k]
-
-            # Cache the result
-            self._cache_result(cache_key, ', '.join(keywords))
-
-            return keywords
-
+            return tiktoken.encoding_for_model(self.model)
+        except KeyError:
+            # Models tiktoken doesn't know yet
+            return tiktoken.get_encoding("o200k_base")
         except Exception as e:
-            logger.error(f"Error extracting keywords: {e}")
-            # Implement exponential backoff retry logic here if needed
-            return ["Error extracting keywords"]
+            logger.warning(f"Could not load tiktoken encoding, truncating by characters: {e}")
+            return None
 
     def _truncate_text(self, text, max_tokens):
-        """Truncate text to approximately max_tokens to fit within model context."""
+        """Truncate text to max_tokens to fit within model context."""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens]) + "..."
+
         # Rough approximation: 1 token ≈ 4 characters for English text
         max_chars = max_tokens * 4
         if len(text) <= max_chars:
             return text
         return text[:max_chars] + "..."
 
-    def _get_cache_key(self, text, operation):
-        """Generate a cache key for the given text and operation."""
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        return f"{operation}_{self.model}_{text_hash}.json"
-
-    def _check_cache(self, cache_key):
-        """Check if result is in cache."""
-        cache_path = os.path.join(self.cache_dir, cache_key)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'r') as f:
-                    cache_data = json.load(f)
-                    # Check if cache is still valid (e.g., not expired)
-                    return cache_data.get('result')
-            except Exception as e:
-                logger.error(f"Error reading cache: {e}")
-        return None
-
-    def _cache_result(self, cache_key, result):
-        """Cache the result for future use."""
-        cache_path = os.path.join(self.cache_dir, cache_key)
-        try:
-            with open(cache_path, 'w') as f:
-                json.dump({
-                    'result': result,
-                    'timestamp': datetime.now().isoformat()
-                }, f)
-        except Exception as e:
-            logger.error(f"Error writing to cache: {e}")
+    def _get_cache_key(self, request, operation):
+        """Generate a cache key for the given completion request and operation."""
+        # The whole request is hashed (prompt wording, input text, model and settings),
+        # so editing a prompt template invalidates its cached results
+        data = f"{CACHE_SCHEMA_VERSION}|".encode() + _json_dumps(request, sort_keys=True)
+        # 128-bit digests; BLAKE3 hashes the chunks of long texts in parallel with SIMD
+        if blake3 is not None:
+            text_hash = blake3(data).hexdigest(16)
+        else:
+            text_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        return f"{operation}_{self.model}_{text_hash}"
+
+    async def _check_cache(self, cache_key):
+        """Check if a response is in cache; returns a dict with its result and token usage, or None."""
+        cached = self._memory_cache.get(cache_key)
+        if cached is None:
+            # A primary-key lookup in the llm_cache table, skipping expired entries;
+            # run in a worker thread so a slow read doesn't stall the event loop
+            loop = asyncio.get_running_loop()
+            cached = await loop.run_in_executor(None, partial(
+                self.db.get_llm_cache, cache_key, max_age_days=self.cache_ttl_days
+            ))
+            if cached is not None:
+                self._memory_cache[cache_key] = cached
+        return cached
+
+    def _cache_result(self, cache_key, result, usage=None):
+        """Cache the result, with the response's token usage, for future use."""
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
+        self._memory_cache[cache_key] = {
+            'result': result, 'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens, 'model': self.model
+        }
+        # Queued for the database's background writer, so this doesn't block the loop
+        self.db.set_llm_cache(cache_key, result, prompt_tokens, completion_tokens, self.model)
 
     async def process_deep_summary(self, article):
         """Process a single article for deep summary generation."""
@@ -314,14 +675,15 @@ class LLMProcessor:
             self.db.update_deep_summary(article_id, f"Error: {str(e)[:100]}", status='failed')
             raise
 
-    async def _generate_deep_summary(self, title, full_content):
-        """Generate a comprehensive summary from full article content."""
-        if not self.client:
-            return "LLM processing unavailable"
+    def _build_deep_summary_request(self, title, full_content):
+        """Build the chat completion request for a deep summary.
 
+        Returns:
+            Tuple of the cache key, the prompt type and the request's keyword arguments
+        """
         # Prepare text for deep summarization - use more content for HTML papers
         # Check if this looks like full HTML content vs just abstract
-        is_full_paper = len(full_content) > 2000 and any(section in full_content.lower() for section in ['introduction', 'methodology', 'results', 'conclusion', 'references'])
+        is_full_paper = len(full_content) > 2000 and PAPER_SECTIONS_RE.search(full_content) is not None
 
         if is_full_paper:
             # For full papers, use more content but still truncate if very long
@@ -332,79 +694,50 @@ class LLMProcessor:
             text_to_summarize = f"Title: {title}\n\nContent: {self._truncate_text(full_content, 12000)}"
             prompt_type = "abstract"
 
-        # Check cache first
-        cache_key = self._get_cache_key(text_to_summarize, f"deep_summary_{prompt_type}")
-        cached_result = self._check_cache(cache_key)
-        if cached_result:
-            logger.info("Using cached deep summary")
-            return cached_result
-
         # Create appropriate prompt based on content type
-        if prompt_type == "full_paper":
-            prompt = f"""Please provide a comprehensive analysis of this research paper. Structure your analysis with these sections:
-
-**🎯 Main Contribution**
-What is the primary contribution, innovation, or finding of this work?
-
-**🔬 Methodology**
-What approaches, methods, or techniques were used? Include key algorithms, datasets, or experimental setup.
-
-**📊 Key Results**
-What were the most important quantitative and qualitative results? Include specific metrics, comparisons, or findings.
+        system_prompt = FULL_PAPER_SYSTEM_PROMPT if prompt_type == "full_paper" else ABSTRACT_SYSTEM_PROMPT
+
+        # Higher token limit for deep summary
+        max_tokens = 1000 if prompt_type == "full_paper" else 800
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": text_to_summarize}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.3
+        }
+        cache_key = self._get_cache_key(request, f"deep_summary_{prompt_type}")
+        return cache_key, prompt_type, request
+
+    def _add_content_indicator(self, deep_summary, prompt_type):
+        """Note at the end of a deep summary what content it was based on."""
+        content_indicator = "\n\n---\n*Analysis based on full paper content*" if prompt_type == "full_paper" else "\n\n---\n*Analysis based on abstract and metadata*"
+        return deep_summary + content_indicator
 
-**💡 Significance**
-Why is this work important to the field? What problems does it solve or advance?
-
-**⚠️ Limitations**
-What are the acknowledged limitations, assumptions, or areas for improvement?
-
-**🔮 Future Work**
-What future research directions or applications are suggested?
-
-**🏷️ Technical Keywords**
-List 5-7 key technical terms or concepts that researchers would search for.
-
-Paper to analyze:
-{text_to_summarize}
-
-Provide a thorough but concise analysis that would help researchers quickly understand the paper's value and relevance."""
-        else:
-            prompt = f"""Please provide a comprehensive analysis and summary of this research paper/article. Include:
-
-1. **Main Contribution**: What is the primary contribution or finding?
-2. **Methodology**: What approach or methods were used?
-3. **Key Results**: What were the most important results or findings?
-4. **Significance**: Why is this work important to the AI/ML field?
-5. **Limitations**: What are the acknowledged limitations or areas for improvement?
-6. **Future Work**: What future research directions are suggested?
+    async def _generate_deep_summary(self, title, full_content):
+        """Generate a comprehensive summary from full article content."""
+        if not self.client:
+            return "LLM processing unavailable"
 
-Article to analyze:
-{text_to_summarize}
+        cache_key, prompt_type, request = self._build_deep_summary_request(title, full_content)
 
-Please structure your response clearly with the above sections and provide a thorough but concise analysis."""
+        # Check cache first
+        cached_result = await self._check_cache(cache_key)
+        if cached_result:
+            logger.info("Using cached deep summary")
+            return cached_result['result']
 
-        # Call OpenAI API with higher token limit for deep summary
+        # Call OpenAI API
         try:
-            max_tokens = 1000 if prompt_type == "full_paper" else 800
-
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert AI researcher who provides comprehensive analysis of technical papers and articles. Provide structured, detailed summaries that help researchers understand the key contributions and significance of the work. Use clear formatting with headers and bullet points where appropriate."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.3
-            )
-
-            deep_summary = response.choices[0].message.content.strip()
+            response = await self._create_completion(**request)
 
             # Add content type indicator
-            content_indicator = "\n\n---\n*Analysis based on full paper content*" if prompt_type == "full_paper" else "\n\n---\n*Analysis based on abstract and metadata*"
-            deep_summary += content_indicator
+            deep_summary = self._add_content_indicator(response.choices[0].message.content.strip(), prompt_type)
 
             # Cache the result
-            self._cache_result(cache_key, deep_summary)
+            self._cache_result(cache_key, deep_summary, response.usage)
 
             return deep_summary
 
@@ -412,6 +745,78 @@ Please structure your response clearly with the above sections and provide a tho
             logger.error(f"Error generating deep summary: {e}")
             return f"Error generating deep summary: {str(e)[:100]}..."
 
+    async def _submit_deep_summary_batch(self, articles):
+        """Submit deep summaries for the articles as one OpenAI batch; returns its ID, or None if none was needed."""
+        lines = []
+        article_ids = []
+        for article in articles:
+            full_content = article['full_content']
+            if not full_content or len(full_content) < 200:
+                logger.warning(f"Full content too short for deep summary: {article['id']}")
+                self.db.update_deep_summary(article['id'], "Content too short for detailed analysis", status='failed')
+                continue
+
+            cache_key, prompt_type, request = self._build_deep_summary_request(article['title'], full_content)
+            cached_result = await self._check_cache(cache_key)
+            if cached_result:
+                self.db.update_deep_summary(article['id'], cached_result['result'], status='completed')
+                continue
+
+            # The prompt type rides along in custom_id, for the result's content indicator
+            lines.append(_json_dumps({
+                "custom_id": f"{article['id']}:{prompt_type}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": request
+            }))
+            article_ids.append(article['id'])
+
+        if not lines:
+            return None
+
+        batch_file = await self.client.files.create(
+            file=("deep_summaries.jsonl", b"\n".join(lines)), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        self.db.mark_deep_summary_batch(article_ids, batch.id)
+        logger.info(f"Submitted {len(article_ids)} deep summaries in OpenAI batch {batch.id}")
+        return batch.id
+
+    async def _check_deep_summary_batches(self):
+        """Store the results of finished deep summary batches, at most every BATCH_POLL_INTERVAL seconds."""
+        now = time.monotonic()
+        if self._last_batch_check is not None and now - self._last_batch_check < BATCH_POLL_INTERVAL:
+            return
+        self._last_batch_check = now
+
+        for batch_id in self.db.get_deep_summary_batches():
+            try:
+                batch = await self.client.batches.retrieve(batch_id)
+                if batch.status in BATCH_PENDING_STATUSES:
+                    continue
+
+                if batch.output_file_id:
+                    output = await self.client.files.content(batch.output_file_id)
+                    for line in output.text.splitlines():
+                        result = _json_loads(line)
+                        article_id, prompt_type = result['custom_id'].split(':')
+                        response = result.get('response') or {}
+                        if response.get('status_code') == 200:
+                            content = response['body']['choices'][0]['message']['content'].strip()
+                            self.db.update_deep_summary(int(article_id), self._add_content_indicator(content, prompt_type))
+                        else:
+                            error = result.get('error') or response.get('body', {}).get('error')
+                            self.db.update_deep_summary(int(article_id), f"Error: {str(error)[:100]}", status='failed')
+
+                # Whatever the batch didn't finish (it failed, expired or was cancelled)
+                # goes back to the regular queue
+                self.db.release_deep_summary_batch(batch_id)
+                logger.info(f"Finished OpenAI batch {batch_id} with status {batch.status}")
+            except Exception as e:
+                logger.error(f"Error checking deep summary batch {batch_id}: {e}")
+
     async def generate_deep_summary_for_article(self, article_id):
         """Manually trigger deep summary generation for a specific article."""
         if not self.client:
@@ -0,0 +1,21 @@
+import asyncio
+
+class RateLimiter:
+    """Async context manager that spaces entries evenly at up to `rate` per second."""
+    
+    def __init__(self, rate):
+        """Initialize the limiter with a rate in requests per second."""
+        self.rate = max(float(rate), 0.01)
+        self.interval = 1.0 / self.rate
+        self._next_time = 0.0
+    
+    async def __aenter__(self):
+        # Reserve the next slot before sleeping so concurrent callers queue up behind it
+        now = asyncio.get_running_loop().time()
+        wait = self._next_time - now
+        self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False